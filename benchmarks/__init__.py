@@ -0,0 +1,47 @@
+"""
+Бенчмарки проекта.
+
+Запуск из корня репозитория, например:
+
+    python -m benchmarks.bench_seating
+"""
+
+import contextlib
+import os
+import time
+
+
+def setup_django(settings_module="workspace1.settings"):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    """Временная тестовая база с применёнными миграциями"""
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def timer(label, results=None):
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:10.1f} ms")
+    if results is not None:
+        results[label] = elapsed
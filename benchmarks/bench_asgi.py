@@ -0,0 +1,212 @@
+"""
+Бенчмарк пропускной способности и задержек: WSGI (gunicorn, gthread)
+против ASGI (uvicorn, асинхронные представления) при высокой конкуренции.
+
+    python -m benchmarks.bench_asgi [--employees 5000] [--concurrency 64]
+
+Нужны gunicorn и uvicorn (pip install gunicorn uvicorn). Обе конфигурации
+запускаются одним процессом на временной копии базы с DEBUG = False.
+Запросы идут с сессией пользователя — API доступно только после входа.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+PATHS = [
+    "/",
+    "/employees/",
+    "/api/employees/?fields=id,last_name,position,skills&limit=50",
+]
+SETTINGS = """\
+from workspace1.settings import *
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+DATABASES["default"]["NAME"] = {db!r}
+QUERY_BUDGET_ENFORCE = False
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def populate(count):
+    """Заполняет базу и возвращает cookie сессии пользователя"""
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client
+
+    from employees.counters import rebuild_counters
+    from employees.models import Employee, EmployeeSkill, Skill
+    from employees.search import rebuild_index
+
+    call_command("migrate", verbosity=0)
+    skills = Skill.objects.bulk_create(Skill(name=f"Навык {i}") for i in range(20))
+    employees = Employee.objects.bulk_create(
+        (
+            Employee(
+                last_name=f"Фамилия{i}",
+                first_name="Имя",
+                gender="M",
+                email=f"user{i}@example.com",
+                position="Аналитик",
+            )
+            for i in range(count)
+        ),
+        batch_size=2000,
+    )
+    EmployeeSkill.objects.bulk_create(
+        (
+            EmployeeSkill(
+                employee=employee, skill=skills[(employee.pk + n) % 20], level=2
+            )
+            for employee in employees
+            for n in range(3)
+        ),
+        batch_size=2000,
+    )
+    rebuild_counters()
+    rebuild_index()
+    client = Client()
+    client.force_login(get_user_model().objects.create_user("bench"))
+    session = client.cookies[settings.SESSION_COOKIE_NAME]
+    return f"{session.key}={session.value}"
+
+
+async def fetch(port, path, cookie):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: localhost\r\nCookie: {cookie}\r\n"
+        "Connection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    writer.close()
+    return int(status)
+
+
+async def load(port, requests, concurrency, cookie):
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(PATHS[i % len(PATHS)])
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                status = await fetch(port, path, cookie)
+            except OSError:
+                status = 0
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+def wait_for(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Сервер на порту {port} не запустился")
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(label, command, env, port, args, cookie):
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        # Прогрев: кеши фрагментов, индекс навыков, шаблоны
+        asyncio.run(load(port, len(PATHS) * 10, 4, cookie))
+        elapsed, latencies, errors = asyncio.run(
+            load(port, args.requests, args.concurrency, cookie)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+    print(
+        f"{label:<8} {args.requests / elapsed:8.0f} rps  "
+        f"p50 {percentile(latencies, 50) * 1000:7.1f} ms  "
+        f"p99 {percentile(latencies, 99) * 1000:7.1f} ms  "
+        f"errors {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    for module in ("gunicorn", "uvicorn"):
+        if shutil.which(module) is None:
+            sys.exit(f"Не найден {module}: pip install gunicorn uvicorn")
+
+    workdir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(workdir, "bench_settings.py"), "w") as f:
+            f.write(SETTINGS.format(db=os.path.join(workdir, "db.sqlite3")))
+        sys.path.insert(0, workdir)
+        os.environ["DJANGO_SETTINGS_MODULE"] = "bench_settings"
+        import django
+
+        django.setup()
+        cookie = populate(args.employees)
+
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join([workdir, os.getcwd()]),
+        )
+        port = free_port()
+        run(
+            "wsgi",
+            ["gunicorn", "workspace1.wsgi:application", "-b", f"127.0.0.1:{port}"]
+            + ["-k", "gthread", "-w", "1", "--threads", str(args.threads)]
+            + ["--log-level", "warning"],
+            dict(env, EMPLOYEE_ASYNC_VIEWS="0"),
+            port,
+            args,
+            cookie,
+        )
+        port = free_port()
+        run(
+            "asgi",
+            ["uvicorn", "workspace1.asgi:application", "--port", str(port)]
+            + ["--log-level", "warning", "--no-access-log"],
+            env,
+            port,
+            args,
+            cookie,
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
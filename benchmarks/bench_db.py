@@ -0,0 +1,173 @@
+"""
+Нагрузочный тест SQLite при одновременных чтении и записи: профиль
+development (журнал отката, без PRAGMA) против production (WAL, PRAGMA,
+чтение через реплику), см. workspace1/db.py.
+
+    python -m benchmarks.bench_db [--readers 8] [--writers 2] [--seconds 10]
+
+Каждый профиль запускается в отдельном процессе на своей временной базе.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SETTINGS = """\
+from workspace1.settings import *
+from workspace1.db import databases, sqlite_pragmas
+
+DATABASES = databases({profile!r}, {db!r})
+SQLITE_PRAGMAS = sqlite_pragmas({profile!r})
+DATABASE_ROUTERS = (
+    ["workspace1.db.PrimaryReplicaRouter"] if {profile!r} == "production" else []
+)
+"""
+
+
+def populate(count):
+    from django.core.management import call_command
+
+    from employees.models import Employee
+
+    call_command("migrate", verbosity=0)
+    Employee.objects.bulk_create(
+        (
+            Employee(
+                last_name=f"Фамилия{i}",
+                first_name="Имя",
+                gender="M",
+                email=f"user{i}@example.com",
+                position="Аналитик",
+            )
+            for i in range(count)
+        ),
+        batch_size=2000,
+    )
+
+
+def stress(readers, writers, seconds, employees):
+    from django.db import OperationalError, connections, transaction
+
+    from employees.models import Employee
+
+    stats = {"read": [], "write": [], "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader(n):
+        latencies = []
+        offset = n * 97
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                list(
+                    Employee.objects.order_by("last_name", "first_name", "id")[
+                        offset % employees : offset % employees + 20
+                    ]
+                )
+                Employee.objects.filter(position="Аналитик").count()
+            except OperationalError:
+                with lock:
+                    stats["errors"] += 1
+            latencies.append(time.perf_counter() - start)
+            offset += 20
+        connections.close_all()
+        with lock:
+            stats["read"].extend(latencies)
+
+    def writer(n):
+        latencies = []
+        pk = n
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    Employee.objects.filter(pk=pk % employees + 1).update(
+                        description=f"обновление {pk}"
+                    )
+            except OperationalError:
+                with lock:
+                    stats["errors"] += 1
+            latencies.append(time.perf_counter() - start)
+            pk += 7
+        connections.close_all()
+        with lock:
+            stats["write"].extend(latencies)
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = {"errors": stats["errors"]}
+    for kind in ("read", "write"):
+        latencies = sorted(stats[kind])
+        result[kind] = {
+            "ops": len(latencies) / seconds,
+            "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+            "p99_ms": (
+                latencies[int(len(latencies) * 0.99)] * 1000 if latencies else None
+            ),
+        }
+    return result
+
+
+def worker(args):
+    import django
+
+    django.setup()
+    populate(args.employees)
+    print(json.dumps(stress(args.readers, args.writers, args.seconds, args.employees)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--employees", type=int, default=20000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    for profile in ("development", "production"):
+        with tempfile.TemporaryDirectory() as workdir:
+            with open(os.path.join(workdir, "bench_db_settings.py"), "w") as f:
+                f.write(
+                    SETTINGS.format(
+                        profile=profile, db=os.path.join(workdir, "db.sqlite3")
+                    )
+                )
+            env = dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE="bench_db_settings",
+                PYTHONPATH=os.pathsep.join([workdir, os.getcwd()]),
+            )
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_db", "--worker"]
+                + sys.argv[1:],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+        for kind in ("read", "write"):
+            data = result[kind]
+            print(
+                f"{profile:<12} {kind:<6} {data['ops']:8.0f} ops/s  "
+                f"p50 {data['p50_ms'] or 0:7.2f} ms  p99 {data['p99_ms'] or 0:8.2f} ms"
+            )
+        print(f"{profile:<12} errors {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Бенчмарк потокового импорта сотрудников с навыками.
+
+    python -m benchmarks.bench_import [--rows 100000] [--batch-size 1000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+
+from benchmarks import setup_django, test_database, timer
+
+POSITIONS = ["Тестировщик", "Backend разработчик", "Аналитик", "Менеджер"]
+SKILLS = ["Python", "Django", "SQL", "Docker", "Git", "Linux", "JavaScript"]
+
+
+def write_csv(path, rows, desks, rng):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["last_name", "first_name", "gender", "email", "position"]
+            + ["hire_date", "table_number", "skills"]
+        )
+        for i in range(rows):
+            # Тестировщики и разработчики по разные стороны, чтобы строки
+            # проходили проверку соседства
+            table = i + 1 if i < desks else ""
+            position = POSITIONS[0] if i < desks // 2 else rng.choice(POSITIONS[1:])
+            skills = ";".join(
+                f"{name}:{rng.randint(1, 4)}"
+                for name in rng.sample(SKILLS, rng.randint(1, 3))
+            )
+            writer.writerow(
+                [f"Фамилия{i}", f"Имя{i}", "M", f"user{i}@example.com", position]
+                + [f"20{rng.randint(10, 24)}-01-15", table, skills]
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--desks", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from employees.importing import import_employees, read_records
+    from workstations.layout import rebuild_neighbours
+    from workstations.models import Workstation
+
+    rng = random.Random(0)
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_csv(path, args.rows, args.desks, rng)
+        with test_database():
+            Workstation.objects.bulk_create(
+                Workstation(name=f"Стол {i}", table_number=str(i), table_index=i)
+                for i in range(1, args.desks + 1)
+            )
+            rebuild_neighbours()
+            with timer(f"import {args.rows} employees"):
+                report = import_employees(
+                    read_records(path), batch_size=args.batch_size
+                )
+            print(report)
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Бенчмарк раздачи медиафайлов: django.views.static.serve (его подключает
+django.conf.urls.static) против employees.media.serve_media — полный
+файл, диапазон Range, повторный запрос с валидатором и передача файла
+nginx через X-Accel-Redirect.
+
+    python -m benchmarks.bench_media [--size-mb 20] [--repeat 20]
+
+Представления вызываются напрямую через RequestFactory, тело ответа
+вычитывается целиком, как это делал бы WSGI-сервер без sendfile.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks import setup_django
+
+
+def consume(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def measure(view, request, repeat):
+    timings, sent = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = view(request)
+        sent = consume(response)
+        response.close()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], response.status_code, sent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import RequestFactory, override_settings
+    from django.views.static import serve
+
+    from employees.media import serve_media
+
+    factory = RequestFactory()
+    with tempfile.TemporaryDirectory() as media_root, override_settings(
+        MEDIA_ROOT=media_root
+    ):
+        files = {
+            "photo.jpg": os.urandom(200 * 1024),
+            "original.jpg": os.urandom(args.size_mb * 1024 * 1024),
+        }
+        for name, content in files.items():
+            with open(os.path.join(media_root, name), "wb") as f:
+                f.write(content)
+        probe = serve_media(factory.get("/"), "photo.jpg")
+        cases = [
+            ("фото 200 КБ", "photo.jpg", {}, {}, ""),
+            (f"оригинал {args.size_mb} МБ", "original.jpg", {}, {}, ""),
+            ("Range 1 МБ", "original.jpg", {"Range": "bytes=0-1048575"}, {}, ""),
+            (
+                "повторный запрос",
+                "photo.jpg",
+                {"If-None-Match": probe["ETag"]},
+                {"If-Modified-Since": probe["Last-Modified"]},
+                "",
+            ),
+            (
+                f"X-Accel-Redirect {args.size_mb} МБ",
+                "original.jpg",
+                {},
+                {},
+                "x-accel-redirect",
+            ),
+        ]
+        print(f"{'':<26}{'static.serve':>28}{'serve_media':>28}")
+        for label, name, headers, static_headers, sendfile in cases:
+            static = measure(
+                lambda request: serve(request, name, document_root=media_root),
+                # static.serve проверяет только If-Modified-Since
+                factory.get("/", headers={**headers, **static_headers}),
+                args.repeat,
+            )
+            with override_settings(MEDIA_SENDFILE=sendfile):
+                media = measure(
+                    lambda request: serve_media(request, name),
+                    factory.get("/", headers=headers),
+                    args.repeat,
+                )
+            print(
+                f"{label:<26}"
+                + "".join(
+                    f"{seconds * 1000:9.2f} ms {status} {sent / 1024:9.0f} КБ"
+                    for seconds, status, sent in (static, media)
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Бенчмарк полнотекстового поиска: FTS5 против icontains.
+
+    python -m benchmarks.bench_search [--employees 100000]
+"""
+
+import argparse
+import random
+
+from benchmarks import setup_django, test_database, timer
+
+LAST_NAMES = ["Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Фёдоров"]
+FIRST_NAMES = ["Александр", "Мария", "Анна", "Дмитрий", "Олег", "Елена"]
+POSITIONS = ["Тестировщик", "Backend разработчик", "Аналитик", "Менеджер"]
+SKILLS = ["Python", "Django", "SQL", "Docker", "Kubernetes", "Linux", "Go"]
+QUERIES = ["иванов", "фед", "разраб python", "kubern", "анна аналитик", "zzz"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from employees.models import Employee, EmployeeSkill, Skill
+    from employees.search import rebuild_index, search_employees
+
+    rng = random.Random(0)
+    with test_database():
+        skills = Skill.objects.bulk_create(Skill(name=name) for name in SKILLS)
+        employees = Employee.objects.bulk_create(
+            (
+                Employee(
+                    last_name=f"{rng.choice(LAST_NAMES)}{i}",
+                    first_name=rng.choice(FIRST_NAMES),
+                    gender="M",
+                    email=f"user{i}@example.com",
+                    position=rng.choice(POSITIONS),
+                    description="Сотрудник отдела разработки",
+                )
+                for i in range(args.employees)
+            ),
+            batch_size=5000,
+        )
+        EmployeeSkill.objects.bulk_create(
+            (
+                EmployeeSkill(employee=employee, skill=skill, level=2)
+                for employee in employees
+                for skill in rng.sample(skills, 2)
+            ),
+            batch_size=5000,
+        )
+        with timer(f"rebuild index ({args.employees})"):
+            rebuild_index()
+
+        for query in QUERIES:
+            results = search_employees(query)
+            with timer(f"fts {query!r} x{args.repeat}"):
+                for _ in range(args.repeat):
+                    results._count = None
+                    results.count()
+                    results[:10]
+            fallback = results._fallback()
+            with timer(f"icontains {query!r} x{args.repeat}"):
+                for _ in range(args.repeat):
+                    fallback.count()
+                    list(fallback.order_by("last_name", "first_name", "id")[:10])
+            print(f"{'':<4}hits: {results.count()}")
+
+
+if __name__ == "__main__":
+    main()
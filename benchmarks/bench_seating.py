@@ -0,0 +1,82 @@
+"""
+Бенчмарк массовой рассадки на 10 000 столов.
+
+    python -m benchmarks.bench_seating [--desks 10000]
+"""
+
+import argparse
+import random
+
+from benchmarks import setup_django, test_database, timer
+
+
+def make_people(count, rng):
+    from employees.models import Employee
+
+    roles = [Employee.ROLE_TESTER, Employee.ROLE_DEVELOPER, Employee.ROLE_OTHER]
+    return [(i, rng.choices(roles, weights=[3, 5, 2])[0]) for i in range(count)]
+
+
+def bench_solver(desks, rng):
+    from employees.seating import SeatingSolver
+
+    people = make_people(int(desks * 0.9), rng)
+    # Ряд столов: соседи — столы с номером ±1
+    neighbours = {
+        i: [n for n in (i - 1, i + 1) if 0 <= n < desks] for i in range(desks)
+    }
+    solver = SeatingSolver(range(desks), people, neighbours)
+    with timer(f"solver: {desks} desks, {len(people)} people"):
+        assignment = solver.solve()
+    assert len(assignment) == len(people)
+
+
+def bench_database(desks, rng):
+    from employees.models import Employee, classify_position
+    from employees.seating import reseat
+    from workstations.layout import rebuild_neighbours
+    from workstations.models import Workstation
+
+    positions = ["Тестировщик", "Backend разработчик", "Аналитик"]
+    Workstation.objects.bulk_create(
+        Workstation(
+            name=f"Стол {i}", table_number=str(i), table_index=i, location="Этаж 1"
+        )
+        for i in range(1, desks + 1)
+    )
+    rebuild_neighbours()
+    employees = []
+    for i in range(int(desks * 0.9)):
+        position = rng.choices(positions, weights=[3, 5, 2])[0]
+        employees.append(
+            Employee(
+                first_name=f"Имя{i}",
+                last_name=f"Фамилия{i}",
+                gender="M",
+                email=f"user{i}@example.com",
+                position=position,
+                role=classify_position(position),
+            )
+        )
+    Employee.objects.bulk_create(employees, batch_size=1000)
+
+    with timer(f"reseat (plan + bulk_update): {desks} desks"):
+        assignment = reseat(Employee.objects.all(), Workstation.objects.all())
+    assert len(assignment) == len(employees)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--desks", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    rng = random.Random(args.seed)
+    bench_solver(args.desks, rng)
+    with test_database():
+        bench_database(args.desks, rng)
+
+
+if __name__ == "__main__":
+    main()
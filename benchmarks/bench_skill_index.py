@@ -0,0 +1,98 @@
+"""
+Бенчмарк индекса навыков против запросов ORM с соединением на каждый навык.
+
+    python -m benchmarks.bench_skill_index [--employees 100000]
+"""
+
+import argparse
+import random
+
+from benchmarks import setup_django, test_database, timer
+
+SKILLS = [f"Навык {i}" for i in range(40)] + ["Python", "Django", "Go", "SQL"]
+QUERIES = [
+    ({"Python": 3, "Django": 2}, {}, 1),
+    ({"Python": 2, "Django": 2, "SQL": 1}, {}, 1),
+    ({}, {"Go": 3, "Python": 4, "SQL": 4}, 1),
+    ({"Django": 1}, {"Go": 1, "Python": 1, "SQL": 1, "Навык 1": 1}, 2),
+]
+
+
+def orm_ids(all_of, any_of, min_match):
+    from django.db.models import Count, Q
+
+    from employees.models import Employee, EmployeeSkill
+
+    queryset = Employee.objects.all()
+    for name, level in all_of.items():
+        queryset = queryset.filter(
+            employeeskill__skill__name__iexact=name, employeeskill__level__gte=level
+        )
+    if any_of:
+        condition = Q()
+        for name, level in any_of.items():
+            condition |= Q(skill__name__iexact=name, level__gte=level)
+        matched = (
+            EmployeeSkill.objects.filter(condition)
+            .values("employee")
+            .annotate(matched=Count("skill", distinct=True))
+            .filter(matched__gte=min_match)
+            .values("employee")
+        )
+        queryset = queryset.filter(pk__in=matched)
+    return sorted(queryset.values_list("id", flat=True).distinct())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--skills-per-employee", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from employees.models import Employee, EmployeeSkill, Skill
+    from employees.skill_index import find_employee_ids, get_index
+
+    rng = random.Random(0)
+    with test_database():
+        skills = Skill.objects.bulk_create(Skill(name=name) for name in SKILLS)
+        employees = Employee.objects.bulk_create(
+            (
+                Employee(
+                    last_name=f"Фамилия{i}",
+                    first_name="Имя",
+                    gender="M",
+                    email=f"user{i}@example.com",
+                    position="Разработчик",
+                )
+                for i in range(args.employees)
+            ),
+            batch_size=5000,
+        )
+        EmployeeSkill.objects.bulk_create(
+            (
+                EmployeeSkill(employee=employee, skill=skill, level=rng.randint(1, 4))
+                for employee in employees
+                for skill in rng.sample(skills, args.skills_per_employee)
+            ),
+            batch_size=5000,
+        )
+        with timer("build index"):
+            get_index()
+
+        for all_of, any_of, min_match in QUERIES:
+            label = f"{all_of} {any_of} min={min_match}"
+            print(label)
+            with timer(f"  index x{args.repeat}"):
+                for _ in range(args.repeat):
+                    ids = find_employee_ids(all_of, any_of, min_match)
+            with timer(f"  orm x{args.repeat}"):
+                for _ in range(args.repeat):
+                    expected = orm_ids(all_of, any_of, min_match)
+            assert ids == expected, (len(ids), len(expected))
+            print(f"  hits: {len(ids)}")
+
+
+if __name__ == "__main__":
+    main()
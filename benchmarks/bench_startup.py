@@ -0,0 +1,119 @@
+"""
+Запуск процесса по профилям настроек (DJANGO_PROFILE): время импорта
+(django.setup, middleware, urlconf) и задержка первого и второго запросов
+WSGI-приложения в новом процессе.
+
+    python -m benchmarks.bench_startup [--runs 5] [--employees 1000]
+        [--paths /,/employees/]
+
+База и медиафайлы создаются один раз во временном каталоге (generate_data),
+для production выполняется collectstatic. Каждый прогон — отдельный
+процесс; печатаются медианы.
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROFILES = ["development", "production"]
+
+
+def request(application, path):
+    from wsgiref.util import setup_testing_defaults
+
+    environ = {"PATH_INFO": path}
+    setup_testing_defaults(environ)
+    environ["wsgi.errors"] = io.StringIO()
+    statuses = []
+    start = time.perf_counter()
+    body = b"".join(
+        application(
+            environ, lambda status, headers, exc_info=None: statuses.append(status)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    assert statuses[0].startswith("200"), (path, statuses[0], body[:500])
+    return elapsed
+
+
+def worker(paths):
+    start = time.perf_counter()
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+
+    application = get_wsgi_application()
+    get_resolver().url_patterns
+    result = {"import": time.perf_counter() - start}
+    for path in paths:
+        result[f"first {path}"] = request(application, path)
+        result[f"second {path}"] = request(application, path)
+    print(json.dumps(result))
+
+
+def run(profile, env, paths):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--worker"]
+        + ["--paths", ",".join(paths)],
+        env=dict(env, DJANGO_PROFILE=profile),
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--paths", default="/,/employees/")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    paths = args.paths.split(",")
+    if args.worker:
+        return worker(paths)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE="workspace1.settings",
+            DJANGO_SQLITE_PATH=os.path.join(workdir, "db.sqlite3"),
+            DJANGO_MEDIA_ROOT=os.path.join(workdir, "media"),
+            DJANGO_STATIC_ROOT=os.path.join(workdir, "static"),
+            DJANGO_SECRET_KEY="bench-startup",
+            DJANGO_ALLOWED_HOSTS="127.0.0.1",
+            EMPLOYEE_ASYNC_VIEWS="",
+        )
+        manage = [sys.executable, "manage.py"]
+        setup = dict(env, DJANGO_PROFILE="development")
+        subprocess.run(manage + ["migrate", "-v0"], env=setup, check=True)
+        subprocess.run(
+            manage + ["generate_data", "--employees", str(args.employees), "-v0"],
+            env=setup,
+            check=True,
+        )
+        subprocess.run(
+            manage + ["collectstatic", "--noinput", "-v0"],
+            env=dict(env, DJANGO_PROFILE="production"),
+            check=True,
+        )
+
+        for profile in PROFILES:
+            runs = [run(profile, env, paths) for _ in range(args.runs)]
+            print(profile)
+            for key in runs[0]:
+                median = statistics.median(result[key] for result in runs)
+                print(f"  {key:<28} {median * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
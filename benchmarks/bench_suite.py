@@ -0,0 +1,231 @@
+"""
+Сквозной нагрузочный набор: главная, список, карточка сотрудника, списки
+и форма сотрудника в админке и сохранение сотрудника на синтетических данных
+нескольких размеров (команда generate_data).
+
+    python -m benchmarks.bench_suite [--sizes 1000,100000,1000000]
+        [--repeat 50] [--output results.json] [--compare previous.json]
+
+Для каждого сценария — задержка p50/p99, число SQL-запросов и пиковая
+память Python (tracemalloc) одного запроса. Каждый размер запускается в
+отдельном процессе на своей временной базе с DEBUG = False. Результаты
+сохраняются в JSON; --compare печатает изменение относительно прошлого
+прогона.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SETTINGS = """\
+from workspace1.settings import *
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+DATABASES["default"]["NAME"] = {db!r}
+MEDIA_ROOT = {media!r}
+QUERY_BUDGET_ENFORCE = False
+"""
+SCENARIOS = [
+    "home",
+    "list",
+    "list_deep",
+    "detail",
+    "admin_changelist",
+    "admin_change",
+    "admin_skills",
+    "admin_images",
+    "admin_workstations",
+    "save",
+]
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def scenarios(size, rng):
+    """{имя: функция одного прохода}"""
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    from employees.models import Employee
+
+    user = User.objects.create_superuser("bench", "bench@example.com", "bench")
+    client = Client()
+    client.force_login(user)
+    ids = list(Employee.objects.order_by("?").values_list("id", flat=True)[:1000])
+
+    def get(path):
+        def run():
+            response = client.get(path() if callable(path) else path)
+            assert response.status_code == 200, response.status_code
+
+        return run
+
+    def save():
+        employee = Employee.objects.get(pk=rng.choice(ids))
+        employee.description = f"Изменено {time.perf_counter()}"
+        employee.save()
+
+    return {
+        "home": get("/"),
+        "list": get("/employees/"),
+        "list_deep": get(lambda: f"/employees/?page={max(1, size // 10 // 2)}"),
+        "detail": get(lambda: f"/employees/{rng.choice(ids)}/"),
+        "admin_changelist": get("/admin/employees/employee/"),
+        "admin_change": get(
+            lambda: f"/admin/employees/employee/{rng.choice(ids)}/change/"
+        ),
+        "admin_skills": get("/admin/employees/employeeskill/"),
+        "admin_images": get("/admin/employees/employeeimage/"),
+        "admin_workstations": get("/admin/workstations/workstation/"),
+        "save": save,
+    }
+
+
+def measure(run, repeat):
+    from employees.budgets import count_queries
+
+    for _ in range(3):
+        run()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    with count_queries() as counter:
+        run()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "queries": counter.count,
+        "peak_kb": peak / 1024,
+    }
+
+
+def worker(args):
+    import django
+
+    django.setup()
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+    start = time.perf_counter()
+    call_command("generate_data", employees=args.size, verbosity=0)
+    result = {
+        "size": args.size,
+        "generate_s": time.perf_counter() - start,
+        "scenarios": {},
+    }
+    rng = random.Random(0)
+    for name, run in scenarios(args.size, rng).items():
+        if args.only and name not in args.only:
+            continue
+        result["scenarios"][name] = measure(run, args.repeat)
+    print(json.dumps(result))
+
+
+def run_size(size, argv):
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, "bench_suite_settings.py"), "w") as f:
+            f.write(
+                SETTINGS.format(
+                    db=os.path.join(workdir, "db.sqlite3"),
+                    media=os.path.join(workdir, "media"),
+                )
+            )
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE="bench_suite_settings",
+            PYTHONPATH=os.pathsep.join([workdir, os.getcwd()]),
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_suite", "--worker"]
+            + ["--size", str(size)]
+            + argv,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(result, previous=None):
+    print(f"size {result['size']}: данные за {result['generate_s']:.1f} s")
+    for name, data in result["scenarios"].items():
+        line = (
+            f"  {name:<18} p50 {data['p50_ms']:8.2f} ms  p99 {data['p99_ms']:8.2f} ms"
+            f"  queries {data['queries']:3d}  peak {data['peak_kb']:9.1f} KB"
+        )
+        old = (previous or {}).get(name)
+        if old:
+            line += f"  p50 {(data['p50_ms'] / old['p50_ms'] - 1) * 100:+6.1f}%"
+            if data["queries"] != old["queries"]:
+                line += f"  queries {old['queries']} -> {data['queries']}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument(
+        "--only", type=lambda value: value.split(","), help=", ".join(SCENARIOS)
+    )
+    parser.add_argument("--output", help="Файл для результатов в JSON")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = {
+                result["size"]: result["scenarios"] for result in json.load(f)["runs"]
+            }
+
+    argv = ["--repeat", str(args.repeat)]
+    if args.only:
+        argv += ["--only", ",".join(args.only)]
+    runs = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        result = run_size(size, argv)
+        report(result, previous.get(size))
+        runs.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "runs": runs,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Рендеринг страниц сотрудников шаблонами Django и Jinja2: 100 карточек
+(employees/_employee_card.html, как при промахе кеша фрагментов) и
+страница списка из 100 готовых карточек с пагинацией.
+
+    python -m benchmarks.bench_templates [--cards 100] [--repeat 50]
+
+Данные создаёт generate_data во временной базе, галерея и навыки
+загружаются один раз — измеряется только рендеринг. Без пакета jinja2
+печатаются только результаты Django.
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks import setup_django, test_database, timer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.management import call_command
+    from django.core.paginator import Paginator
+    from django.db.models import prefetch_related_objects
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory, override_settings
+    from django.utils.safestring import mark_safe
+
+    from employees.views import (
+        employee_prefetch,
+        list_context,
+        list_options,
+        list_queryset,
+        tenure_histogram,
+    )
+
+    engines = ["django"]
+    templates = [settings.TEMPLATES[0]]
+    try:
+        import jinja2  # noqa: F401
+    except ImportError:
+        print("jinja2 не установлен, сравнение только с Django")
+    else:
+        engines.append("jinja2")
+        templates.append(
+            {
+                "BACKEND": "django.template.backends.jinja2.Jinja2",
+                "NAME": "jinja2",
+                "DIRS": [os.path.join(settings.BASE_DIR, "jinja2")],
+                "APP_DIRS": False,
+                "OPTIONS": {"environment": "employees.components.environment"},
+            }
+        )
+
+    with tempfile.TemporaryDirectory() as media_root, override_settings(
+        MEDIA_ROOT=media_root, TEMPLATES=templates
+    ), test_database():
+        call_command(
+            "generate_data",
+            employees=args.cards * args.pages,
+            max_images=1,
+            verbosity=0,
+        )
+        request = RequestFactory().get("/employees/", {"page": args.pages // 2})
+        request.user = AnonymousUser()
+        options = list_options(request.GET)
+        paginator = Paginator(
+            list_queryset(options).order_by("last_name", "first_name", "id"),
+            args.cards,
+        )
+        page = paginator.page(args.pages // 2)
+        employees = list(page.object_list)
+        prefetch_related_objects(employees, *employee_prefetch())
+        base_context = {
+            "employees": employees,
+            "page_obj": page,
+            "paginator": paginator,
+            "is_paginated": True,
+            "cursor_pagination": False,
+            **list_context(request, options, tenure_histogram()),
+        }
+
+        for engine in engines:
+            using = None if engine == "django" else engine
+
+            def render_cards():
+                return [
+                    mark_safe(
+                        render_to_string(
+                            "employees/_employee_card.html",
+                            {"employee": employee},
+                            using=using,
+                        )
+                    )
+                    for employee in employees
+                ]
+
+            cards = render_cards()
+            with timer(f"{engine}: {args.cards} карточек x{args.repeat}"):
+                for _ in range(args.repeat):
+                    render_cards()
+            context = dict(base_context, cards=cards)
+            render_to_string(
+                "employees/employee_list.html", context, request, using=using
+            )
+            with timer(f"{engine}: страница списка x{args.repeat}"):
+                for _ in range(args.repeat):
+                    render_to_string(
+                        "employees/employee_list.html", context, request, using=using
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,108 @@
-from django.contrib import admin
-from .models import Employee, Skill, EmployeeSkill, EmployeeImage
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
+
+from workstations.models import Workstation
+
+from . import bulk
+from .models import (
+    TENURE_BUCKETS,
+    Employee,
+    EmployeeImage,
+    EmployeeSkill,
+    Skill,
+    tenure_label,
+)
+from .pagination import EstimatedCountPaginator
+from .search import search_available, search_employees
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Список для таблиц на миллионы строк: число строк оценивается
+    (EstimatedCountPaginator), второй COUNT(*) для «показать все» не
+    выполняется.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+def action_options(modeladmin, request):
+    """Проверенные дополнительные поля формы действий (action_form)"""
+    form = modeladmin.action_form(request.POST)
+    form.fields["action"].choices = modeladmin.get_action_choices(request)
+    form.is_valid()
+    return getattr(form, "cleaned_data", {})
+
+
+def location_choices():
+    locations = (
+        Workstation.objects.filter(is_active=True)
+        .order_by("location")
+        .values_list("location", flat=True)
+        .distinct()
+    )
+    return [("", "---------"), *((location, location) for location in locations)]
+
+
+class TenureListFilter(admin.SimpleListFilter):
+    """Интервалы стажа TENURE_BUCKETS; условие по индексу hire_date"""
+
+    title = "Стаж"
+    parameter_name = "tenure"
+
+    def lookups(self, request, model_admin):
+        edges = [0, *TENURE_BUCKETS, None]
+        return [
+            (f"{low}-{'' if high is None else high}", tenure_label(low, high))
+            for low, high in zip(edges, edges[1:])
+        ]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            low, high = (
+                int(value) if value else None for value in self.value().split("-")
+            )
+        except ValueError:
+            return queryset.none()
+        return queryset.tenure_between(low, high)
+
+
+class EmployeeActionForm(ActionForm):
+    location = forms.ChoiceField(label="Местоположение", required=False)
+    skill = forms.ModelChoiceField(
+        Skill.objects.order_by("name"), label="Навык", required=False
+    )
+    level = forms.TypedChoiceField(
+        label="Уровень",
+        coerce=int,
+        required=False,
+        choices=EmployeeSkill.LEVEL_CHOICES,
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Один запрос на форму, а не на каждый проход по вариантам
+        self.fields["location"].choices = location_choices()
+
+
+def search_by_employee(queryset, search_term, field="employee"):
+    """Поиск по сотруднику через полнотекстовый индекс"""
+    results = search_employees(search_term)
+    return queryset.filter(**{f"{field}__in": results.id_subquery()})
 
 
 class EmployeeSkillInline(admin.TabularInline):
     model = EmployeeSkill
     extra = 1
+    autocomplete_fields = ["skill"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("employee", "skill")
 
 
 class EmployeeImageInline(admin.TabularInline):
@@ -13,12 +111,31 @@ class EmployeeImageInline(admin.TabularInline):
     fields = ["image", "order", "created_at"]
     readonly_fields = ["created_at"]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("employee")
+
 
 @admin.register(Employee)
-class EmployeeAdmin(admin.ModelAdmin):
-    list_display = ("last_name", "first_name", "position", "workstation", "email")
-    list_filter = ("position", "gender")
+class EmployeeAdmin(LargeTableAdmin):
+    list_display = (
+        "last_name",
+        "first_name",
+        "position",
+        "workstation",
+        "email",
+        "tenure_days",
+    )
+    list_select_related = ("workstation",)
+    # Фильтр по тексту должности — SELECT DISTINCT по всей таблице,
+    # категория должности доступна через role
+    list_filter = ("role", "gender", TenureListFilter)
     search_fields = ("last_name", "first_name", "email")
+    # Совпадает с индексом employee_name_keyset_idx: сортировка без
+    # временного B-дерева и без добавления -pk
+    ordering = ("last_name", "first_name", "id")
+    autocomplete_fields = ["workstation"]
+    action_form = EmployeeActionForm
+    actions = ["move_to_location", "grant_skill"]
     inlines = [
         EmployeeSkillInline,
         EmployeeImageInline,
@@ -36,6 +153,53 @@ class EmployeeAdmin(admin.ModelAdmin):
         ("Дополнительно", {"fields": ("description",), "classes": ("collapse",)}),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_tenure()
+
+    @admin.display(description="Стаж, дней", ordering="-hire_date")
+    def tenure_days(self, obj):
+        return obj.tenure.days
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по полнотекстовому индексу вместо icontains по search_fields
+        if not search_term or not search_available():
+            return super().get_search_results(request, queryset, search_term)
+        return search_by_employee(queryset, search_term, field="pk"), False
+
+    @admin.action(
+        description="Пересадить в выбранное местоположение", permissions=["change"]
+    )
+    def move_to_location(self, request, queryset):
+        location = action_options(self, request).get("location")
+        if not location:
+            self.message_user(request, "Выберите местоположение", messages.ERROR)
+            return
+        try:
+            assignment = bulk.move_employees(queryset, location)
+        except ValidationError as e:
+            self.message_user(request, "; ".join(e.messages), messages.ERROR)
+            return
+        self.message_user(
+            request,
+            f"Пересажено сотрудников: {len(assignment)} ({location})",
+            messages.SUCCESS,
+        )
+
+    @admin.action(
+        description="Выдать навык или повысить уровень", permissions=["change"]
+    )
+    def grant_skill(self, request, queryset):
+        options = action_options(self, request)
+        if not options.get("skill") or not options.get("level"):
+            self.message_user(request, "Выберите навык и уровень", messages.ERROR)
+            return
+        granted, raised = bulk.grant_skill(queryset, options["skill"], options["level"])
+        self.message_user(
+            request,
+            f"Навык «{options['skill']}»: выдан {granted}, повышен уровень {raised}",
+            messages.SUCCESS,
+        )
+
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
@@ -44,14 +208,31 @@ class SkillAdmin(admin.ModelAdmin):
 
 
 @admin.register(EmployeeSkill)
-class EmployeeSkillAdmin(admin.ModelAdmin):
+class EmployeeSkillAdmin(LargeTableAdmin):
     list_display = ("employee", "skill", "level")
+    list_select_related = ("employee", "skill")
     list_filter = ("skill", "level")
+    search_fields = ("employee__last_name", "employee__first_name", "skill__name")
+    # Новые записи первыми: обход первичного ключа без сортировки
+    ordering = ("-pk",)
+    autocomplete_fields = ["employee", "skill"]
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search_available():
+            return super().get_search_results(request, queryset, search_term)
+        return search_by_employee(queryset, search_term), False
 
 
 @admin.register(EmployeeImage)
-class EmployeeImageAdmin(admin.ModelAdmin):
+class EmployeeImageAdmin(LargeTableAdmin):
     list_display = ("employee", "order", "created_at")
+    list_select_related = ("employee",)
     list_filter = ("created_at",)
     search_fields = ("employee__first_name", "employee__last_name")
-    ordering = ["employee", "order"]
+    ordering = ("-pk",)
+    autocomplete_fields = ["employee"]
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search_available():
+            return super().get_search_results(request, queryset, search_term)
+        return search_by_employee(queryset, search_term), False
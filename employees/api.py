@@ -0,0 +1,311 @@
+"""
+JSON API только для чтения: сотрудники, рабочие места, навыки.
+
+?fields=a,b,c выбирает поля ответа; из базы загружаются только нужные
+колонки (.only()), связи — только запрошенные. ETag строится по
+max(updated_at) и числу строк выборки одним агрегирующим запросом,
+поэтому повторный опрос без изменений стоит один запрос и получает
+304 Not Modified. Удаление строки меняет число строк и ETag; Last-Modified
+не отдаётся: по одному времени удаление не заметить, и If-Modified-Since
+вернул бы 304 на устаревшие данные.
+
+API доступно только вошедшим пользователям; поля из staff_fields
+(служебные данные рабочих мест) — только сотрудникам с is_staff.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
+from django.views import View
+
+from workstations.models import Workstation
+
+from .budgets import QueryBudgetMixin
+from .models import Employee, Skill
+from .pagination import InvalidCursor, KeysetPaginator
+from .views import employee_prefetch
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Relation:
+    """Связанное поле ответа: нужные колонки, select/prefetch и значение"""
+
+    def __init__(self, value, only=(), select=(), prefetch=()):
+        self.value = value
+        self.only = only
+        self.select = select
+        self.prefetch = prefetch
+
+
+def employee_prefetch_for(lookup):
+    return [p for p in employee_prefetch() if p.prefetch_to == lookup]
+
+
+class ApiView(QueryBudgetMixin, View):
+    model = None
+    # Имя поля ответа -> поле модели
+    fields = {}
+    related = {}
+    # Поля, доступные только пользователям с is_staff
+    staff_fields = ()
+    default_fields = ()
+    ordering = ["id"]
+    default_limit = 20
+    max_limit = 100
+    # состояние выборки, страница, два prefetch
+    query_budget = 4
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            self.check_access(request.user)
+        except ApiError as e:
+            return self.error(e)
+        return super().dispatch(request, *args, **kwargs)
+
+    def check_access(self, user):
+        if not user.is_authenticated:
+            raise ApiError("Требуется вход", 401)
+        self.user = user
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def filter_queryset(self, queryset):
+        since = self.request.GET.get("updated_since")
+        if since:
+            value = parse_datetime(since)
+            if value is None:
+                raise ApiError(f"Некорректная дата updated_since: {since}")
+            queryset = queryset.filter(updated_at__gt=value)
+        return queryset
+
+    def selected_fields(self):
+        param = self.request.GET.get("fields")
+        if not param:
+            return list(self.default_fields)
+        names = [name.strip() for name in param.split(",") if name.strip()]
+        unknown = [
+            name
+            for name in names
+            if name not in self.fields and name not in self.related
+        ]
+        if unknown:
+            raise ApiError(f"Неизвестные поля: {', '.join(unknown)}")
+        if not self.user.is_staff:
+            denied = [name for name in names if name in self.staff_fields]
+            if denied:
+                raise ApiError(f"Недостаточно прав для полей: {', '.join(denied)}", 403)
+        return names
+
+    def load(self, queryset, names):
+        columns = {"id", *self.ordering}
+        for name in names:
+            if name in self.fields:
+                columns.add(self.fields[name])
+            else:
+                relation = self.related[name]
+                columns.update(relation.only)
+                queryset = queryset.select_related(*relation.select)
+                queryset = queryset.prefetch_related(*relation.prefetch)
+        return queryset.only(*columns)
+
+    def serialize(self, obj, names):
+        return {
+            name: (
+                getattr(obj, self.fields[name])
+                if name in self.fields
+                else self.related[name].value(obj)
+            )
+            for name in names
+        }
+
+    def state(self, queryset):
+        """(max(updated_at), число строк) выборки одним запросом"""
+        rows = queryset.order_by().aggregate(
+            last_modified=Max("updated_at"), count=Count("pk")
+        )
+        return rows["last_modified"], rows["count"]
+
+    def etag(self, last_modified, count):
+        stamp = last_modified.isoformat() if last_modified else ""
+        digest = hashlib.md5(
+            f"{stamp}:{count}:{self.request.get_full_path()}".encode()
+        ).hexdigest()
+        return quote_etag(digest)
+
+    def get(self, request, pk=None):
+        try:
+            names = self.selected_fields()
+            queryset = self.filter_queryset(self.get_queryset())
+            if pk is not None:
+                queryset = queryset.filter(pk=pk)
+            last_modified, count = self.state(queryset)
+            if pk is not None and not count:
+                raise Http404
+            etag = self.etag(last_modified, count)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                queryset = self.load(queryset, names)
+                if pk is not None:
+                    data = self.serialize(queryset.get(), names)
+                else:
+                    data = self.page(queryset, names, count)
+                response = JsonResponse(data, json_dumps_params={"ensure_ascii": False})
+        except ApiError as e:
+            return self.error(e)
+        return self.finalize(response, etag)
+
+    def error(self, error):
+        return JsonResponse(
+            {"error": str(error)},
+            status=error.status,
+            json_dumps_params={"ensure_ascii": False},
+        )
+
+    def finalize(self, response, etag):
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
+
+    def page_limit(self):
+        try:
+            limit = int(self.request.GET.get("limit") or self.default_limit)
+        except ValueError:
+            raise ApiError("Некорректный limit")
+        return max(1, min(limit, self.max_limit))
+
+    def page(self, queryset, names, count):
+        paginator = KeysetPaginator(queryset, self.page_limit(), ordering=self.ordering)
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise ApiError("Некорректный курсор")
+        return self.page_data(page, names, count)
+
+    def page_data(self, page, names, count):
+        return {
+            "count": count,
+            "next": self.cursor_url(page.next_cursor),
+            "previous": self.cursor_url(page.previous_cursor),
+            "results": [self.serialize(obj, names) for obj in page],
+        }
+
+    def cursor_url(self, cursor):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params["cursor"] = cursor
+        return f"{self.request.path}?{params.urlencode()}"
+
+
+def employee_workstation(employee):
+    workstation = employee.workstation
+    if workstation is None:
+        return None
+    return {
+        "id": workstation.pk,
+        "table_number": workstation.table_number,
+        "location": workstation.location,
+    }
+
+
+def employee_skills(employee):
+    return [
+        {"name": employee_skill.skill.name, "level": employee_skill.level}
+        for employee_skill in employee.employeeskill_set.all()
+    ]
+
+
+def employee_images(employee):
+    return [image.image.url for image in employee.images.all() if image.image]
+
+
+class EmployeeApiView(ApiView):
+    model = Employee
+    fields = {
+        name: name
+        for name in [
+            "id",
+            "last_name",
+            "first_name",
+            "middle_name",
+            "gender",
+            "email",
+            "position",
+            "role",
+            "hire_date",
+            "description",
+            "updated_at",
+        ]
+    }
+    related = {
+        "workstation": Relation(
+            employee_workstation,
+            only=[
+                "workstation",
+                "workstation__table_number",
+                "workstation__location",
+            ],
+            select=["workstation"],
+        ),
+        "skills": Relation(
+            employee_skills, prefetch=employee_prefetch_for("employeeskill_set")
+        ),
+        "images": Relation(employee_images, prefetch=employee_prefetch_for("images")),
+    }
+    default_fields = ["id", "last_name", "first_name", "position", "workstation"]
+    ordering = ["last_name", "first_name", "id"]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        params = self.request.GET
+        if params.get("location"):
+            queryset = queryset.filter(workstation__location=params["location"])
+        if params.get("role"):
+            queryset = queryset.filter(role=params["role"])
+        return queryset
+
+
+class WorkstationApiView(ApiView):
+    model = Workstation
+    fields = {
+        name: name
+        for name in [
+            "id",
+            "name",
+            "table_number",
+            "location",
+            "is_active",
+            "description",
+            "equipment",
+            "ip_address",
+            "notes",
+            "updated_at",
+        ]
+    }
+    staff_fields = ["equipment", "ip_address", "notes"]
+    default_fields = ["id", "table_number", "name", "location", "is_active"]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        params = self.request.GET
+        if params.get("location"):
+            queryset = queryset.filter(location=params["location"])
+        if params.get("is_active") in ("0", "1"):
+            queryset = queryset.filter(is_active=params["is_active"] == "1")
+        return queryset
+
+
+class SkillApiView(ApiView):
+    model = Skill
+    fields = {name: name for name in ["id", "name", "description", "updated_at"]}
+    default_fields = ["id", "name"]
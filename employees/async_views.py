@@ -0,0 +1,218 @@
+"""
+Асинхронные версии страниц и JSON API на async ORM.
+
+Подключаются в urls.py при EMPLOYEE_ASYNC_VIEWS = True (так запускает
+workspace1/asgi.py), под WSGI работают синхронные представления из
+views.py и api.py. Шаблоны рендерит TemplateResponse вне цикла событий,
+поэтому ленивый request.user в base.html допустим. Бюджет запросов
+(budgets.py) к ним не применяется: async ORM выполняет запросы в
+отдельном потоке со своим соединением.
+"""
+
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from .api import ApiError, EmployeeApiView, SkillApiView, WorkstationApiView
+from .components import template_engine
+from .counters import TOTAL, acounter_value, adirectory_summary
+from .fragments import arender_fragments
+from .models import Employee
+from .pagination import InvalidCursor, KeysetPaginator
+from .views import (
+    LIST_ORDERINGS,
+    TENURE_HISTOGRAM_TIMEOUT,
+    EmployeeDetailView,
+    EmployeeListView,
+    HomeView,
+    employee_prefetch,
+    list_context,
+    list_options,
+    list_queryset,
+    summary_context,
+    tenure_histogram_key,
+)
+
+
+class AsyncHomeView(View):
+    template_name = HomeView.template_name
+
+    async def get(self, request):
+        # Запросы по очереди: async ORM выполняет их в одном потоке
+        # (thread_sensitive), asyncio.gather не дал бы параллельности
+        queryset = Employee.objects.select_related("workstation").order_by(
+            "-hire_date"
+        )[:4]
+        employees = await aslist(queryset)
+        summary = await adirectory_summary()
+        context = {
+            "employees": employees,
+            "cards": await arender_fragments(
+                "home_card",
+                "employees/_home_card.html",
+                employees,
+                prefetch=employee_prefetch(),
+            ),
+            **summary_context(summary),
+        }
+        return TemplateResponse(
+            request, self.template_name, context, using=template_engine()
+        )
+
+
+class AsyncEmployeeListView(View):
+    template_name = EmployeeListView.template_name
+    paginate_by = EmployeeListView.paginate_by
+
+    async def get(self, request):
+        options = list_options(request.GET)
+        ordering = LIST_ORDERINGS[options["sort"]]
+        queryset = list_queryset(options).order_by(*ordering)
+        context = {
+            "cursor_pagination": "page" not in request.GET,
+            **list_context(request, options, await atenure_histogram()),
+        }
+        if context["cursor_pagination"]:
+            paginator = KeysetPaginator(queryset, self.paginate_by, ordering=ordering)
+            try:
+                page = await paginator.apage(request.GET.get("cursor"))
+            except InvalidCursor:
+                raise Http404("Некорректный курсор страницы")
+            employees = page.object_list
+            if not context["filtered"]:
+                context["total_count"] = await acounter_value(TOTAL)
+        else:
+            paginator = Paginator(queryset, self.paginate_by)
+            try:
+                number = int(request.GET.get("page") or 1)
+                count = await queryset.acount()
+                # Paginator.page() без синхронного COUNT(*)
+                paginator.count = count
+                page = paginator.page(number)
+            except (ValueError, InvalidPage):
+                raise Http404("Некорректный номер страницы")
+            employees = await aslist(page.object_list)
+            page.object_list = employees
+
+        context.update(
+            {
+                "paginator": paginator,
+                "page_obj": page,
+                "is_paginated": page.has_other_pages(),
+                "employees": employees,
+                "cards": await arender_fragments(
+                    "card",
+                    "employees/_employee_card.html",
+                    employees,
+                    prefetch=employee_prefetch(),
+                ),
+            }
+        )
+        return TemplateResponse(
+            request, self.template_name, context, using=template_engine()
+        )
+
+
+class AsyncEmployeeDetailView(View):
+    template_name = EmployeeDetailView.template_name
+
+    async def get(self, request, pk):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), "/admin/login/")
+        try:
+            employee = await Employee.objects.select_related("workstation").aget(pk=pk)
+        except Employee.DoesNotExist:
+            raise Http404("Сотрудник не найден")
+        context = {
+            "employee": employee,
+            "object": employee,
+            "detail_fragment": (
+                await arender_fragments(
+                    "detail",
+                    "employees/_employee_detail.html",
+                    [employee],
+                    prefetch=employee_prefetch(),
+                )
+            )[0],
+        }
+        return TemplateResponse(
+            request, self.template_name, context, using=template_engine()
+        )
+
+
+class AsyncApiMixin:
+    """Асинхронный get() для представлений api.py"""
+
+    query_budget = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        # request.user в асинхронном коде не загрузить, пользователь — из auser()
+        try:
+            self.check_access(await request.auser())
+        except ApiError as e:
+            return self.error(e)
+        return await View.dispatch(self, request, *args, **kwargs)
+
+    async def get(self, request, pk=None):
+        try:
+            names = self.selected_fields()
+            queryset = self.filter_queryset(self.get_queryset())
+            if pk is not None:
+                queryset = queryset.filter(pk=pk)
+            state = await queryset.order_by().aaggregate(
+                last_modified=Max("updated_at"), count=Count("pk")
+            )
+            last_modified, count = state["last_modified"], state["count"]
+            if pk is not None and not count:
+                raise Http404
+            etag = self.etag(last_modified, count)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                queryset = self.load(queryset, names)
+                if pk is not None:
+                    data = self.serialize(await queryset.aget(), names)
+                else:
+                    data = await self.apage(queryset, names, count)
+                response = JsonResponse(data, json_dumps_params={"ensure_ascii": False})
+        except ApiError as e:
+            return self.error(e)
+        return self.finalize(response, etag)
+
+    async def apage(self, queryset, names, count):
+        paginator = KeysetPaginator(queryset, self.page_limit(), ordering=self.ordering)
+        try:
+            page = await paginator.apage(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise ApiError("Некорректный курсор")
+        return self.page_data(page, names, count)
+
+
+class AsyncEmployeeApiView(AsyncApiMixin, EmployeeApiView):
+    pass
+
+
+class AsyncWorkstationApiView(AsyncApiMixin, WorkstationApiView):
+    pass
+
+
+class AsyncSkillApiView(AsyncApiMixin, SkillApiView):
+    pass
+
+
+async def atenure_histogram():
+    key = tenure_histogram_key()
+    histogram = await cache.aget(key)
+    if histogram is None:
+        histogram = await Employee.objects.atenure_histogram()
+        await cache.aset(key, histogram, TENURE_HISTOGRAM_TIMEOUT)
+    return histogram
+
+
+async def aslist(queryset):
+    return [obj async for obj in queryset]
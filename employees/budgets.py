@@ -0,0 +1,130 @@
+"""
+Бюджеты запросов к базе для представлений.
+
+Представление объявляет максимальное число запросов (QueryBudgetMixin.
+query_budget или декоратор query_budget); запросы считаются обёрткой
+connection.execute_wrapper во время обработки и рендеринга ответа. При
+превышении бюджета QUERY_BUDGET_ENFORCE = True вызывает исключение
+QueryBudgetExceeded (тесты, разработка), иначе пишется предупреждение в лог.
+"""
+
+import contextlib
+import functools
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    def __init__(self, keep_sql=False):
+        self.count = 0
+        self.duration = 0.0
+        # Текст запросов нужен только отчёту о превышении бюджета
+        self.queries = [] if keep_sql else None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        if self.queries is not None:
+            self.queries.append(sql)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def count_queries(using=None, keep_sql=False):
+    """
+    Считает запросы к базе using или ко всем базам (основной и реплике);
+    keep_sql=True сохраняет и их текст в counter.queries.
+    """
+    counter = QueryCounter(keep_sql)
+    aliases = [using] if using else list(connections)
+    with contextlib.ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(counter))
+        yield counter
+
+
+def budget_reported():
+    """Попадёт ли превышение бюджета в исключение или в лог"""
+    return getattr(settings, "QUERY_BUDGET_ENFORCE", False) or logger.isEnabledFor(
+        logging.WARNING
+    )
+
+
+def check_budget(name, counter, budget):
+    if counter.count <= budget:
+        return
+    message = f"{name}: {counter.count} запросов при бюджете {budget}:\n" + "\n".join(
+        counter.queries or ()
+    )
+    if getattr(settings, "QUERY_BUDGET_ENFORCE", False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def run_with_budget(name, budget, request, handler):
+    # Сессия и пользователь загружаются для любой страницы и в бюджет
+    # представления не входят
+    user = getattr(request, "user", None)
+    if user is not None:
+        user.is_authenticated
+    with count_queries(keep_sql=budget_reported()) as counter:
+        response = handler()
+        # TemplateResponse рендерится лениво — шаблон тоже входит в бюджет
+        if callable(getattr(response, "render", None)) and not getattr(
+            response, "is_rendered", True
+        ):
+            response.render()
+    check_budget(name, counter, budget)
+    return response
+
+
+class QueryBudgetMixin:
+    """Ограничивает число запросов представления значением query_budget"""
+
+    query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.query_budget is None:
+            return super().dispatch(request, *args, **kwargs)
+        return run_with_budget(
+            type(self).__name__,
+            self.query_budget,
+            request,
+            lambda: super(QueryBudgetMixin, self).dispatch(request, *args, **kwargs),
+        )
+
+
+def query_budget(budget):
+    """Декоратор бюджета запросов для функциональных представлений"""
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return run_with_budget(
+                view.__name__, budget, request, lambda: view(request, *args, **kwargs)
+            )
+
+        wrapper.query_budget = budget
+        return wrapper
+
+    return decorator
+
+
+def get_query_budget(view):
+    """Бюджет представления, полученного из resolve(url).func"""
+    view_class = getattr(view, "view_class", None)
+    if view_class is not None:
+        return getattr(view_class, "query_budget", None)
+    return getattr(view, "query_budget", None)
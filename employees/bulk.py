@@ -0,0 +1,110 @@
+"""
+Массовые операции над сотрудниками и рабочими местами (действия админки).
+
+Каждая операция — несколько UPDATE/bulk_create в одной транзакции
+независимо от числа выбранных строк; сигналы не срабатывают, поэтому
+версии кеша, счётчики, поисковый индекс и индекс навыков обновляются
+здесь же. Правило соседства проверяется один раз для всего набора
+(seating.py), а не для каждого сотрудника.
+"""
+
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from workstations.models import Workstation
+
+from . import skill_index
+from .counters import FREE, OCCUPIED, apply_deltas, location_key
+from .models import Employee, EmployeeSkill
+from .search import index_employees
+from .seating import reseat
+from .signals import bump_cache_version
+
+
+def move_employees(employees, location):
+    """
+    Пересаживает employees за свободные активные столы местоположения
+    location. Возвращает {id сотрудника: id стола}; ValidationError, если
+    столов не хватает или рассадка нарушает правило соседства.
+    """
+    return reseat(
+        employees.order_by("pk"), Workstation.objects.filter(location=location)
+    )
+
+
+def grant_skill(employees, skill, level):
+    """
+    Выдаёт навык skill уровня level сотрудникам employees; у кого навык
+    уже есть, уровень только повышается. Возвращает (выдано, повышено).
+    """
+    ids = employees.order_by().values("pk")
+    holders = EmployeeSkill.objects.filter(skill=skill)
+    with transaction.atomic():
+        # Выборка может зависеть от поискового индекса, поэтому id
+        # получателей считаются до его обновления
+        missing = Employee.objects.filter(pk__in=ids).exclude(
+            pk__in=holders.values("employee_id")
+        )
+        new_ids = list(missing.values_list("pk", flat=True))
+        lower = holders.filter(employee__in=ids, level__lt=level)
+        raised = lower.count()
+        # Подзапросом, пока состав получателей не изменился: список id
+        # в pk__in упирается в лимит переменных SQLite
+        bump_cache_version(
+            Employee.objects.filter(
+                Q(pk__in=missing.values("pk")) | Q(pk__in=lower.values("employee_id"))
+            )
+        )
+        lower.update(level=level)
+
+        # INSERT ... SELECT: bulk_create на SQLite режется на пакеты по
+        # лимиту параметров запроса и на 100 тыс. строк в 15 раз медленнее
+        sql, params = missing.values("pk").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {EmployeeSkill._meta.db_table} "
+                "(employee_id, skill_id, level) "
+                f"SELECT id, %s, %s FROM {Employee._meta.db_table} WHERE id IN ({sql})",
+                [skill.pk, level, *params],
+            )
+
+        # В поисковом индексе только названия навыков, уровни не нужны
+        index_employees(new_ids)
+        skill_index.invalidate()
+    return len(new_ids), raised
+
+
+def deactivate_workstations(workstations):
+    """
+    Отключает рабочие места и освобождает их: сотрудники остаются без
+    стола. Граф соседства не меняется — неактивные столы просто не
+    участвуют в рассадке. Возвращает (отключено столов, освобождено
+    сотрудников).
+    """
+    selected = Workstation.objects.filter(pk__in=workstations.order_by().values("pk"))
+    occupants = Employee.objects.filter(workstation__in=selected.values("pk"))
+    occupied = occupants.order_by().values("workstation")
+    with transaction.atomic():
+        deltas = Counter()
+        for location, count in (
+            occupants.order_by()
+            .values_list("workstation__location")
+            .annotate(n=Count("id"))
+        ):
+            deltas[location_key(location)] -= count
+            deltas[location_key(None)] += count
+        deltas[OCCUPIED] -= selected.filter(pk__in=occupied).count()
+        deltas[FREE] -= selected.filter(is_active=True).exclude(pk__in=occupied).count()
+
+        now = timezone.now()
+        unseated = occupants.update(
+            workstation=None, cache_version=F("cache_version") + 1, updated_at=now
+        )
+        deactivated = selected.filter(is_active=True).update(
+            is_active=False, updated_at=now
+        )
+        apply_deltas(deltas)
+    return deactivated, unseated
@@ -0,0 +1,123 @@
+"""
+Компоненты страниц сотрудников: пагинация и карточка.
+
+Всё, что зависит от данных, вычисляется здесь, в Python: окно пагинации —
+не больше 2 * radius + 1 номеров вокруг текущей страницы независимо от их
+общего числа, у карточки — ссылка, фото и первые навыки. Шаблоны только
+выводят готовые значения. Функции используют теги шаблонов Django
+(templatetags/employee_tags.py) и окружение Jinja2 (environment) — второй
+движок для страниц сотрудников, включается EMPLOYEE_TEMPLATE_ENGINE.
+"""
+
+from django.conf import settings
+from django.urls import reverse
+
+from .pagination import KeysetPage
+
+CARD_LAYOUTS = {
+    # Список сотрудников
+    False: {
+        "column": "col-md-6 col-lg-4",
+        "card_style": "cursor: pointer; height: 100%;",
+        "image_height": 250,
+        "image_style": "height: 250px; object-fit: cover;",
+        "sizes": "(min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw",
+        "skill_count": 3,
+        "show_levels": True,
+        "show_email": True,
+    },
+    # Главная страница
+    True: {
+        "column": "col-md-3",
+        "card_style": "cursor: pointer;",
+        "image_height": 200,
+        "image_style": "height: 200px; object-fit: cover;",
+        "sizes": "(min-width: 768px) 25vw, 100vw",
+        "skill_count": 2,
+        "show_levels": False,
+        "show_email": False,
+    },
+}
+
+
+def template_engine():
+    """Имя движка для страниц сотрудников; None — движок по умолчанию"""
+    if getattr(settings, "EMPLOYEE_TEMPLATE_ENGINE", "django") == "jinja2":
+        return "jinja2"
+    return None
+
+
+def page_links(page, query_string="", radius=2):
+    """
+    Ссылки пагинации страницы Page или KeysetPage; None, если страница одна.
+
+    Для нумерованной пагинации — первая, предыдущая, следующая, последняя
+    и окно номеров; для курсорной — первая, предыдущая и следующая.
+    """
+    if page is None or not page.has_other_pages():
+        return None
+    prefix = f"?{query_string}&" if query_string else "?"
+    has_previous, has_next = page.has_previous(), page.has_next()
+    if isinstance(page, KeysetPage):
+        return {
+            "numbered": False,
+            "first": f"?{query_string}" if has_previous else None,
+            "previous": (
+                f"{prefix}cursor={page.previous_cursor}" if has_previous else None
+            ),
+            "next": f"{prefix}cursor={page.next_cursor}" if has_next else None,
+            "last": None,
+            "pages": [],
+        }
+
+    number, num_pages = page.number, page.paginator.num_pages
+    return {
+        "numbered": True,
+        "first": f"{prefix}page=1" if has_previous else None,
+        "previous": f"{prefix}page={number - 1}" if has_previous else None,
+        "next": f"{prefix}page={number + 1}" if has_next else None,
+        "last": f"{prefix}page={num_pages}" if has_next else None,
+        "pages": [
+            (n, f"{prefix}page={n}", n == number)
+            for n in range(max(1, number - radius), min(num_pages, number + radius) + 1)
+        ],
+        "number": number,
+        "num_pages": num_pages,
+    }
+
+
+def card_context(employee, compact=False):
+    """Контекст карточки сотрудника; галерея и навыки — из prefetch"""
+    layout = CARD_LAYOUTS[compact]
+    images = employee.images.all()
+    skills = list(employee.employeeskill_set.all())
+    return {
+        "employee": employee,
+        "url": reverse("employees:employee_detail", args=[employee.pk]),
+        "image": images[0] if images else None,
+        "alt": f"{employee.first_name} {employee.last_name}",
+        "skills": [
+            (item.skill.name, item.get_level_display())
+            for item in skills[: layout["skill_count"]]
+        ],
+        "more_skills": len(skills) > layout["skill_count"],
+        **layout,
+    }
+
+
+def environment(**options):
+    """Окружение Jinja2: url(), фильтр date и компоненты этого модуля"""
+    from django.utils.dateformat import format as date_format
+
+    from jinja2 import Environment
+
+    env = Environment(**options)
+    env.globals.update(
+        {
+            "url": lambda name, *args: reverse(name, args=args),
+            "page_links": page_links,
+            "card_context": card_context,
+        }
+    )
+    env.filters["date"] = lambda value, fmt: date_format(value, fmt) if value else ""
+    return env
@@ -0,0 +1,313 @@
+"""
+Счётчики справочника, поддерживаемые инкрементально.
+
+Численность сотрудников (всего, по местоположению, по роли) и число занятых
+и свободных рабочих мест хранятся в DirectoryCounter и обновляются
+сигналами при сохранении и удалении (signals.py), поэтому страницам не нужен
+COUNT(*) по таблицам. Массовые операции без сигналов вызывают
+rebuild_counters(); расхождения исправляет команда reconcile_counters.
+"""
+
+from collections import Counter
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+# Префиксы счётчиков справочника; остальные записи DirectoryCounter
+# (например, поколение индекса навыков) rebuild_counters не трогает
+PREFIXES = ("employees:", "workstations:")
+TOTAL = "employees:total"
+OCCUPIED = "workstations:occupied"
+FREE = "workstations:free"
+
+
+def location_key(location):
+    return f"employees:location:{location or ''}"
+
+
+def role_key(role):
+    return f"employees:role:{role}"
+
+
+def apply_deltas(deltas):
+    """Прибавляет к счётчикам значения из словаря {имя: приращение}"""
+    DirectoryCounter = apps.get_model("employees", "DirectoryCounter")
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        if DirectoryCounter.objects.filter(name=name).update(value=F("value") + delta):
+            continue
+        try:
+            with transaction.atomic():
+                DirectoryCounter.objects.create(name=name, value=delta)
+        except IntegrityError:
+            DirectoryCounter.objects.filter(name=name).update(value=F("value") + delta)
+
+
+def read_counters(prefix=None):
+    """Словарь {имя: значение}, при prefix — только счётчики с этим префиксом"""
+    DirectoryCounter = apps.get_model("employees", "DirectoryCounter")
+    queryset = DirectoryCounter.objects.all()
+    if prefix:
+        queryset = queryset.filter(name__startswith=prefix)
+    return dict(queryset.values_list("name", "value"))
+
+
+async def aread_counters():
+    DirectoryCounter = apps.get_model("employees", "DirectoryCounter")
+    return {
+        name: value
+        async for name, value in DirectoryCounter.objects.values_list("name", "value")
+    }
+
+
+def counter_value(name):
+    DirectoryCounter = apps.get_model("employees", "DirectoryCounter")
+    value = (
+        DirectoryCounter.objects.filter(name=name)
+        .values_list("value", flat=True)
+        .first()
+    )
+    return value or 0
+
+
+async def acounter_value(name):
+    DirectoryCounter = apps.get_model("employees", "DirectoryCounter")
+    value = (
+        await DirectoryCounter.objects.filter(name=name)
+        .values_list("value", flat=True)
+        .afirst()
+    )
+    return value or 0
+
+
+def _workstations(*pks):
+    Workstation = apps.get_model("workstations", "Workstation")
+    pks = [pk for pk in pks if pk]
+    if not pks:
+        return {}
+    return {
+        pk: (location, is_active)
+        for pk, location, is_active in Workstation.objects.filter(
+            pk__in=pks
+        ).values_list("pk", "location", "is_active")
+    }
+
+
+def _has_other_occupants(workstation_id, employee_id):
+    Employee = apps.get_model("employees", "Employee")
+    return (
+        Employee.objects.filter(workstation_id=workstation_id)
+        .exclude(pk=employee_id)
+        .exists()
+    )
+
+
+def employee_saved(employee, created):
+    """Изменения счётчиков после сохранения сотрудника"""
+    old = None if created else getattr(employee, "_counter_state", None)
+    new = (employee.role, employee.workstation_id)
+    employee._counter_state = new
+    if old == new or (old is None and not created):
+        return
+
+    old_role, old_workstation = old or (None, None)
+    workstations = _workstations(old_workstation, new[1])
+    deltas = Counter()
+    if created:
+        deltas[TOTAL] += 1
+    else:
+        deltas[role_key(old_role)] -= 1
+        deltas[location_key(workstations.get(old_workstation, ("",))[0])] -= 1
+    deltas[role_key(new[0])] += 1
+    deltas[location_key(workstations.get(new[1], ("",))[0])] += 1
+
+    if old_workstation != new[1]:
+        if old_workstation and not _has_other_occupants(old_workstation, employee.pk):
+            deltas[OCCUPIED] -= 1
+            if workstations.get(old_workstation, (None, False))[1]:
+                deltas[FREE] += 1
+        if new[1] and not _has_other_occupants(new[1], employee.pk):
+            deltas[OCCUPIED] += 1
+            if workstations.get(new[1], (None, False))[1]:
+                deltas[FREE] -= 1
+    apply_deltas(deltas)
+
+
+def employee_deleted(employee):
+    """Изменения счётчиков после удаления сотрудника"""
+    workstation_id = employee.workstation_id
+    workstations = _workstations(workstation_id)
+    deltas = Counter(
+        {
+            TOTAL: -1,
+            role_key(employee.role): -1,
+            location_key(workstations.get(workstation_id, ("",))[0]): -1,
+        }
+    )
+    if workstation_id and not _has_other_occupants(workstation_id, employee.pk):
+        deltas[OCCUPIED] -= 1
+        if workstations.get(workstation_id, (None, False))[1]:
+            deltas[FREE] += 1
+    apply_deltas(deltas)
+
+
+def workstation_saved(workstation, created):
+    """Изменения счётчиков после сохранения рабочего места"""
+    old = None if created else getattr(workstation, "_counter_state", None)
+    new = (workstation.location, workstation.is_active)
+    workstation._counter_state = new
+    if created:
+        apply_deltas({FREE: int(workstation.is_active)})
+        return
+    if old is None or old == new:
+        return
+
+    occupants = workstation.employee_set.count()
+    deltas = Counter()
+    if old[0] != new[0] and occupants:
+        deltas[location_key(old[0])] -= occupants
+        deltas[location_key(new[0])] += occupants
+    if old[1] != new[1] and not occupants:
+        deltas[FREE] += 1 if new[1] else -1
+    apply_deltas(deltas)
+
+
+def workstation_deleting(workstation):
+    """Изменения счётчиков перед удалением рабочего места (сотрудники
+    остаются без места)"""
+    location, is_active = getattr(
+        workstation, "_counter_state", (workstation.location, workstation.is_active)
+    )
+    occupants = workstation.employee_set.count()
+    if occupants:
+        apply_deltas(
+            {
+                location_key(location): -occupants,
+                location_key(""): occupants,
+                OCCUPIED: -1,
+            }
+        )
+    elif is_active:
+        apply_deltas({FREE: -1})
+
+
+def seating_deltas(seats, assignment):
+    """
+    Изменения счётчиков при записи рассадки; считаются до неё.
+
+    seats — текущие места {id сотрудника: id стола или None}, assignment —
+    новые места тех же сотрудников.
+    """
+    Employee = apps.get_model("employees", "Employee")
+    moves = {
+        pk: (seats.get(pk), desk)
+        for pk, desk in assignment.items()
+        if seats.get(pk) != desk
+    }
+    desks = {desk for move in moves.values() for desk in move if desk}
+    workstations = _workstations(*desks)
+    deltas = Counter()
+    for old, new in moves.values():
+        deltas[location_key(workstations.get(old, ("",))[0])] -= 1
+        deltas[location_key(workstations.get(new, ("",))[0])] += 1
+
+    occupants = Counter()
+    staying = set()
+    for pk, desk in Employee.objects.filter(workstation__in=desks).values_list(
+        "pk", "workstation_id"
+    ):
+        occupants[desk] += 1
+        if pk not in moves:
+            staying.add(desk)
+    occupied_after = staying | {new for _, new in moves.values() if new}
+    for desk in desks:
+        change = (desk in occupied_after) - bool(occupants[desk])
+        deltas[OCCUPIED] += change
+        if workstations[desk][1]:
+            deltas[FREE] -= change
+    return deltas
+
+
+def directory_summary():
+    """Сводка для главной страницы и дашбордов одним запросом"""
+    return summarize(read_counters())
+
+
+async def adirectory_summary():
+    return summarize(await aread_counters())
+
+
+def summarize(counters):
+    summary = {
+        "total": counters.get(TOTAL, 0),
+        "occupied": counters.get(OCCUPIED, 0),
+        "free": counters.get(FREE, 0),
+        "locations": {},
+        "roles": {},
+    }
+    for name, value in counters.items():
+        if name.startswith("employees:location:") and value:
+            summary["locations"][name.split(":", 2)[2]] = value
+        elif name.startswith("employees:role:") and value:
+            summary["roles"][name.split(":", 2)[2]] = value
+    return summary
+
+
+def compute_counters(registry=apps):
+    """Точные значения счётчиков, посчитанные по таблицам (GROUP BY)"""
+    Employee = registry.get_model("employees", "Employee")
+    Workstation = registry.get_model("workstations", "Workstation")
+
+    counters = Counter()
+    counters[TOTAL] = Employee.objects.count()
+    for role, count in (
+        Employee.objects.order_by().values_list("role").annotate(n=Count("id"))
+    ):
+        counters[role_key(role)] = count
+    for location, count in (
+        Employee.objects.order_by()
+        .values_list("workstation__location")
+        .annotate(n=Count("id"))
+    ):
+        counters[location_key(location)] = count
+
+    occupied = (
+        Employee.objects.filter(workstation__isnull=False)
+        .order_by()
+        .values("workstation")
+    )
+    counters[OCCUPIED] = Workstation.objects.filter(pk__in=occupied).count()
+    counters[FREE] = (
+        Workstation.objects.filter(is_active=True).exclude(pk__in=occupied).count()
+    )
+    return counters
+
+
+@transaction.atomic
+def rebuild_counters(registry=apps):
+    """
+    Пересчитывает счётчики и исправляет расхождения.
+
+    Возвращает словарь {имя: (было, стало)} изменившихся счётчиков.
+    """
+    DirectoryCounter = registry.get_model("employees", "DirectoryCounter")
+    expected = compute_counters(registry)
+    current = {
+        name: value
+        for name, value in DirectoryCounter.objects.values_list("name", "value")
+        if name.startswith(PREFIXES)
+    }
+    drift = {}
+    for name in set(expected) | set(current):
+        value = expected.get(name, 0)
+        if current.get(name) != value:
+            drift[name] = (current.get(name), value)
+    DirectoryCounter.objects.bulk_create(
+        [DirectoryCounter(name=name, value=new) for name, (_, new) in drift.items()],
+        update_conflicts=True,
+        unique_fields=["name"],
+        update_fields=["value"],
+    )
+    return drift
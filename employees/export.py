@@ -0,0 +1,127 @@
+"""
+Потоковая выгрузка справочника сотрудников в CSV или NDJSON.
+
+Строки читаются через QuerySet.iterator(chunk_size=...), prefetch
+изображений и навыков выполняется на каждую пачку, поэтому потребление
+памяти не зависит от размера справочника.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+CSV_COLUMNS = [
+    "id",
+    "last_name",
+    "first_name",
+    "middle_name",
+    "gender",
+    "email",
+    "position",
+    "hire_date",
+    "table_number",
+    "location",
+    "skills",
+    "image_url",
+]
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def filter_employees(queryset, location=None, position=None, skills=()):
+    """Фильтры выгрузки: местоположение, должность, навыки (все указанные)"""
+    if location:
+        queryset = queryset.filter(workstation__location=location)
+    if position:
+        queryset = queryset.filter(position__icontains=position)
+    for skill in skills:
+        queryset = queryset.filter(employeeskill__skill__name__iexact=skill)
+    return queryset
+
+
+def employee_record(employee, build_url=None):
+    """Словарь выгрузки для сотрудника с заранее загруженными связями"""
+    images = employee.images.all()
+    image_url = images[0].image.url if images else ""
+    if image_url and build_url:
+        image_url = build_url(image_url)
+    workstation = employee.workstation
+    return {
+        "id": employee.pk,
+        "last_name": employee.last_name,
+        "first_name": employee.first_name,
+        "middle_name": employee.middle_name or "",
+        "gender": employee.gender,
+        "email": employee.email,
+        "position": employee.position,
+        "hire_date": employee.hire_date.isoformat() if employee.hire_date else "",
+        "table_number": workstation.table_number if workstation else "",
+        "location": workstation.location if workstation else "",
+        "skills": [
+            {
+                "name": employee_skill.skill.name,
+                "level": employee_skill.level,
+                "level_display": employee_skill.get_level_display(),
+            }
+            for employee_skill in employee.employeeskill_set.all()
+        ],
+        "image_url": image_url,
+    }
+
+
+def iter_records(queryset, chunk_size=2000, build_url=None):
+    for employee in queryset.iterator(chunk_size=chunk_size):
+        yield employee_record(employee, build_url)
+
+
+def csv_lines(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for record in records:
+        record["skills"] = ";".join(
+            f"{skill['name']}:{skill['level_display']}" for skill in record["skills"]
+        )
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def encode(lines, buffer_size=64 * 1024):
+    """Склеивает строки в блоки байтов размером около buffer_size"""
+    chunk, size = [], 0
+    for line in lines:
+        data = line.encode("utf-8")
+        chunk.append(data)
+        size += len(data)
+        if size >= buffer_size:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def gzip_chunks(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(queryset, fmt="csv", compress=False, chunk_size=2000, build_url=None):
+    """Генератор блоков байтов выгрузки в формате fmt ("csv" или "ndjson")"""
+    records = iter_records(queryset, chunk_size=chunk_size, build_url=build_url)
+    lines = csv_lines(records) if fmt == "csv" else ndjson_lines(records)
+    chunks = encode(lines)
+    return gzip_chunks(chunks) if compress else chunks
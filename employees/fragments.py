@@ -0,0 +1,102 @@
+"""
+Кеш HTML-фрагментов карточек сотрудников.
+
+Ключ фрагмента содержит Employee.cache_version, который увеличивается
+сигналами при изменении сотрудника и связанных с ним данных (signals.py).
+Поэтому ключи всех фрагментов страницы известны заранее и читаются одним
+get_many, а устаревшие фрагменты просто перестают запрашиваться.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import aprefetch_related_objects, prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from .components import template_engine
+
+FRAGMENT_TIMEOUT = 24 * 60 * 60
+
+
+def fragment_cache():
+    return caches[getattr(settings, "EMPLOYEE_FRAGMENT_CACHE_ALIAS", "default")]
+
+
+def fragment_key(kind, employee):
+    # Дата в ключе: фрагменты показывают стаж в днях; движок — чтобы после
+    # переключения EMPLOYEE_TEMPLATE_ENGINE не отдавать чужую разметку
+    return (
+        f"employees:fragment:{kind}:{template_engine() or 'django'}:{employee.pk}:"
+        f"{employee.cache_version}:{timezone.localdate().isoformat()}"
+    )
+
+
+def render_fragments(kind, template_name, employees, prefetch=(), context_for=None):
+    """
+    HTML фрагментов template_name для employees в том же порядке.
+
+    Отсутствующие в кеше фрагменты рендерятся; prefetch выполняется только
+    для них. context_for(employee) дополняет контекст шаблона.
+    """
+    employees = list(employees)
+    keys = fragment_keys(kind, employees)
+    fragments = fragment_cache().get_many(keys.values())
+    missing = missing_fragments(employees, keys, fragments)
+    if missing:
+        if prefetch:
+            prefetch_related_objects(missing, *prefetch)
+        rendered = render_missing(template_name, missing, keys, context_for)
+        fragment_cache().set_many(rendered, FRAGMENT_TIMEOUT)
+        fragments.update(rendered)
+    return [mark_safe(fragments[keys[employee.pk]]) for employee in employees]
+
+
+async def arender_fragments(
+    kind, template_name, employees, prefetch=(), context_for=None
+):
+    """
+    Асинхронный render_fragments: кеш через aget_many/aset_many, prefetch
+    через async ORM, рендеринг шаблонов — в потоке sync_to_async
+    """
+    employees = list(employees)
+    keys = fragment_keys(kind, employees)
+    fragments = await fragment_cache().aget_many(keys.values())
+    missing = missing_fragments(employees, keys, fragments)
+    if missing:
+        if prefetch:
+            await aprefetch_related_objects(missing, *prefetch)
+        rendered = await sync_to_async(render_missing)(
+            template_name, missing, keys, context_for
+        )
+        await fragment_cache().aset_many(rendered, FRAGMENT_TIMEOUT)
+        fragments.update(rendered)
+    return [mark_safe(fragments[keys[employee.pk]]) for employee in employees]
+
+
+def fragment_keys(kind, employees):
+    return {employee.pk: fragment_key(kind, employee) for employee in employees}
+
+
+def missing_fragments(employees, keys, fragments):
+    """Сотрудники, фрагментов которых нет в кеше"""
+    return [employee for employee in employees if keys[employee.pk] not in fragments]
+
+
+def render_missing(template_name, employees, keys, context_for=None):
+    """Фрагменты employees по ключам кеша"""
+    rendered = {}
+    using = template_engine()
+    for employee in employees:
+        context = {"employee": employee}
+        if context_for:
+            context.update(context_for(employee))
+        rendered[keys[employee.pk]] = render_to_string(
+            template_name, context, using=using
+        )
+    return rendered
+
+
+def delete_fragments(employee, kinds=("card", "home_card", "detail")):
+    fragment_cache().delete_many([fragment_key(kind, employee) for kind in kinds])
@@ -0,0 +1,100 @@
+"""
+Генерация уменьшенных копий и WebP-версий фотографий сотрудников.
+
+Модуль не зависит от Django: функции выполняются в дочерних процессах
+ProcessPoolExecutor и работают только с путями файловой системы.
+"""
+
+import hashlib
+import os
+import posixpath
+
+from PIL import Image, ImageOps
+
+# Ширины копий: 200 — галерея, 400 — карточки, 800 — экраны высокой плотности
+VARIANT_WIDTHS = (200, 400, 800)
+VARIANTS_DIR = "variants"
+
+
+def variant_name(name, width, ext):
+    """Относительный путь копии: variants/<путь оригинала>_<ширина>.<ext>"""
+    stem = posixpath.splitext(name.replace(os.sep, "/"))[0]
+    return posixpath.join(VARIANTS_DIR, f"{stem}_{width}.{ext}")
+
+
+def content_version(path, chunk_size=64 * 1024):
+    """Короткий хеш содержимого файла — версия в URL (?v=)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def has_alpha(image):
+    return image.mode in ("RGBA", "LA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+
+
+def generate_variants(media_root, name, widths=VARIANT_WIDTHS, quality=82):
+    """
+    Создаёт копии изображения MEDIA_ROOT/name для каждой ширины из widths
+    в исходном формате (JPEG или PNG при прозрачности) и в WebP.
+
+    Возвращает словарь для EmployeeImage.variants и размеры оригинала.
+    """
+    with Image.open(os.path.join(media_root, name)) as original:
+        image = ImageOps.exif_transpose(original)
+        width, height = image.size
+        alpha = has_alpha(image)
+        image = image.convert("RGBA" if alpha else "RGB")
+
+        sizes = []
+        for target in sorted(set(min(w, width) for w in widths)):
+            copy = image
+            if target < width:
+                copy = image.resize(
+                    (target, max(1, round(height * target / width))),
+                    Image.LANCZOS,
+                )
+
+            fallback = variant_name(name, target, "png" if alpha else "jpg")
+            webp = variant_name(name, target, "webp")
+            for rel in (fallback, webp):
+                os.makedirs(
+                    os.path.dirname(os.path.join(media_root, rel)), exist_ok=True
+                )
+            if alpha:
+                copy.save(os.path.join(media_root, fallback), "PNG", optimize=True)
+            else:
+                copy.save(
+                    os.path.join(media_root, fallback),
+                    "JPEG",
+                    quality=quality,
+                    optimize=True,
+                    progressive=True,
+                )
+            copy.save(os.path.join(media_root, webp), "WEBP", quality=quality)
+            sizes.append(
+                {
+                    "width": copy.width,
+                    "height": copy.height,
+                    "src": fallback,
+                    "webp": webp,
+                    # Версии для URL считаются здесь, чтобы srcset не читал файлы
+                    "src_version": content_version(os.path.join(media_root, fallback)),
+                    "webp_version": content_version(os.path.join(media_root, webp)),
+                }
+            )
+
+    return {"source": name, "sizes": sizes}, width, height
+
+
+def remove_variants(media_root, variants):
+    """Удаляет файлы копий, перечисленные в variants"""
+    for size in (variants or {}).get("sizes", []):
+        for key in ("src", "webp"):
+            path = os.path.join(media_root, size[key])
+            if os.path.isfile(path):
+                os.remove(path)
@@ -0,0 +1,526 @@
+"""
+Потоковый импорт сотрудников, навыков, рабочих мест и планов этажей из
+CSV/JSONL (планы — также из текстовой сетки).
+
+Файл читается генератором, строки проверяются пачками (batch_size) без
+запросов на каждую строку: рабочие места, навыки и занятость столов
+держатся в памяти, правило соседства тестировщиков и разработчиков
+проверяется по карте занятых столов и графу соседства. Запись — bulk_create/bulk_update
+в транзакции на каждую пачку.
+"""
+
+import csv
+import json
+import math
+import os
+from collections import defaultdict
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from workstations.layout import adjacency_conflicts, neighbour_map, rebuild_neighbours
+from workstations.models import FloorPlan, Workstation
+
+from . import skill_index
+from .counters import rebuild_counters
+from .models import Employee, EmployeeSkill, Skill, classify_position, conflicting_role
+from .search import index_employees
+
+EMPLOYEE_FIELDS = [
+    "last_name",
+    "first_name",
+    "middle_name",
+    "gender",
+    "email",
+    "position",
+    "hire_date",
+    "description",
+]
+WORKSTATION_FIELDS = [
+    "name",
+    "description",
+    "location",
+    "is_active",
+    "equipment",
+    "ip_address",
+    "notes",
+]
+LEVELS = {label.lower(): value for value, label in EmployeeSkill.LEVEL_CHOICES}
+
+
+class ImportReport:
+    """Итоги импорта: счётчики и ошибки по номерам строк"""
+
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.skills_linked = 0
+        self.errors = []
+        self.warnings = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    def __str__(self):
+        return (
+            f"обработано {self.processed}, создано {self.created}, "
+            f"обновлено {self.updated}, навыков {self.skills_linked}, "
+            f"ошибок {len(self.errors)}"
+        )
+
+
+def read_records(path, fmt=None):
+    """Генератор пар (номер строки, словарь) из CSV, JSONL или сетки плана"""
+    if fmt is None:
+        fmt = {".csv": "csv", ".txt": "grid"}.get(
+            os.path.splitext(str(path).lower())[1], "jsonl"
+        )
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if fmt == "grid":
+            yield from read_grid(f)
+        elif fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_num, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_num, json.loads(line)
+                except ValueError as e:
+                    yield line_num, {"__error__": f"Некорректный JSON: {e}"}
+
+
+def read_grid(lines):
+    """
+    План этажа в виде сетки: строка файла — ряд столов (y), ячейки через
+    пробелы — номера столов по x, «.» — пустое место, «#» — комментарий.
+    """
+    y = 0
+    for line_num, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].rstrip()
+        if not line.strip():
+            continue
+        for x, cell in enumerate(line.split()):
+            if cell != ".":
+                yield line_num, {"table_number": cell, "x": x, "y": y}
+        y += 1
+
+
+def batches(records, batch_size):
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        yield batch
+
+
+def error_message(error):
+    if isinstance(error, ValidationError):
+        if hasattr(error, "error_dict"):
+            return "; ".join(
+                f"{field}: {' '.join(messages)}"
+                for field, messages in error.message_dict.items()
+            )
+        return "; ".join(error.messages)
+    return str(error)
+
+
+def parse_level(value):
+    if isinstance(value, int):
+        level = value
+    else:
+        value = str(value).strip()
+        level = int(value) if value.isdigit() else LEVELS.get(value.lower())
+    if level not in dict(EmployeeSkill.LEVEL_CHOICES):
+        raise ValidationError(f"Неизвестный уровень навыка: {value}")
+    return level
+
+
+def parse_skills(value):
+    """
+    Навыки строки: "Python:3;Django:Средний" в CSV,
+    {"Python": 3} или [{"name": "Python", "level": 3}] в JSONL.
+    """
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = [(item["name"], item["level"]) for item in value]
+    else:
+        items = [part.rsplit(":", 1) for part in str(value).split(";") if part.strip()]
+    skills = {}
+    for item in items:
+        if len(item) != 2:
+            raise ValidationError(f"Некорректный навык: {':'.join(item)}")
+        name, level = item
+        skills[name.strip()] = parse_level(level)
+    return skills
+
+
+class SeatMap:
+    """Рабочие места, граф соседства и роли сотрудников за столами"""
+
+    def __init__(self):
+        self.by_number = {}
+        self.number_of = {}
+        for pk, table_number in Workstation.objects.values_list("id", "table_number"):
+            self.by_number[table_number] = pk
+            self.number_of[pk] = table_number
+        self.neighbours = neighbour_map()
+
+        self.roles = defaultdict(lambda: defaultdict(int))
+        for workstation_id, role in (
+            Employee.objects.filter(workstation__isnull=False)
+            .exclude(role=Employee.ROLE_OTHER)
+            .order_by()
+            .values_list("workstation_id", "role")
+        ):
+            self.roles[workstation_id][role] += 1
+
+    def add(self, workstation_id, role):
+        if workstation_id is not None and role != Employee.ROLE_OTHER:
+            self.roles[workstation_id][role] += 1
+
+    def remove(self, workstation_id, role):
+        if workstation_id is not None and role != Employee.ROLE_OTHER:
+            self.roles[workstation_id][role] -= 1
+
+    def conflict(self, workstation_id, role):
+        """id соседнего стола, за которым сидит сотрудник несовместимой роли"""
+        opposite = conflicting_role(role)
+        if opposite is None or workstation_id is None:
+            return None
+        for neighbour in self.neighbours.get(workstation_id, ()):
+            if self.roles.get(neighbour, {}).get(opposite):
+                return neighbour
+        return None
+
+
+def import_employees(records, batch_size=1000, progress=None):
+    """
+    Импортирует сотрудников и их навыки из пар (номер строки, словарь).
+
+    Сотрудник ищется по email: существующие обновляются, новые создаются.
+    Рабочее место задаётся колонкой table_number, навыки — колонкой skills.
+    Недостающие навыки создаются. Возвращает ImportReport.
+    """
+    report = ImportReport()
+    seats = SeatMap()
+    skill_ids = dict(Skill.objects.values_list("name", "id"))
+    seen_emails = set()
+
+    for batch in batches(records, batch_size):
+        emails = [(row.get("email") or "").strip() for _, row in batch]
+        existing = {
+            employee.email: employee
+            for employee in Employee.objects.filter(email__in=emails)
+        }
+
+        to_create, to_update, links, queued = [], [], [], []
+        for line, row in batch:
+            report.processed += 1
+            try:
+                if "__error__" in row:
+                    raise ValidationError(row["__error__"])
+                email = (row.get("email") or "").strip()
+                if email in seen_emails:
+                    raise ValidationError(f"Повторяющийся email в файле: {email}")
+
+                employee = existing.get(email) or Employee()
+                for field in EMPLOYEE_FIELDS:
+                    value = row.get(field)
+                    if isinstance(value, str):
+                        value = value.strip()
+                    if value not in (None, ""):
+                        setattr(employee, field, value)
+                employee.clean_fields(exclude=["workstation", "role"])
+                skills = parse_skills(row.get("skills"))
+
+                table_number = (row.get("table_number") or "").strip()
+                workstation_id = None
+                if table_number:
+                    workstation_id = seats.by_number.get(table_number)
+                    if workstation_id is None:
+                        raise ValidationError(
+                            f"Рабочее место {table_number} не найдено"
+                        )
+                elif "table_number" not in row:
+                    # Колонки нет — рабочее место не меняется
+                    workstation_id = employee.workstation_id
+
+                old_workstation_id, old_role = employee.workstation_id, employee.role
+                role = classify_position(employee.position)
+                if employee.pk:
+                    seats.remove(old_workstation_id, old_role)
+                neighbour = seats.conflict(workstation_id, role)
+                if neighbour is not None:
+                    if employee.pk:
+                        seats.add(old_workstation_id, old_role)
+                    raise ValidationError(
+                        "Тестировщики и разработчики не могут сидеть за соседними "
+                        f"столами. Стол {seats.number_of[workstation_id]} "
+                        f"соседствует со столом {seats.number_of[neighbour]}"
+                    )
+                seats.add(workstation_id, role)
+            except (ValidationError, KeyError, TypeError, ValueError) as e:
+                report.add_error(line, error_message(e))
+                continue
+
+            employee.role = role
+            employee.workstation_id = workstation_id
+            if employee.pk:
+                employee.cache_version = F("cache_version") + 1
+                # bulk_update не заполняет auto_now
+                employee.updated_at = timezone.now()
+            seen_emails.add(email)
+            (to_update if employee.pk else to_create).append(employee)
+            links.append((employee, skills))
+            queued.append(line)
+
+        try:
+            with transaction.atomic():
+                missing = {
+                    name for _, skills in links for name in skills
+                } - skill_ids.keys()
+                if missing:
+                    Skill.objects.bulk_create([Skill(name=name) for name in missing])
+                    skill_ids.update(
+                        Skill.objects.filter(name__in=missing).values_list("name", "id")
+                    )
+
+                Employee.objects.bulk_create(to_create)
+                Employee.objects.bulk_update(
+                    to_update,
+                    EMPLOYEE_FIELDS
+                    + ["role", "workstation", "cache_version", "updated_at"],
+                )
+                employee_skills = [
+                    EmployeeSkill(
+                        employee_id=employee.pk, skill_id=skill_ids[name], level=level
+                    )
+                    for employee, skills in links
+                    for name, level in skills.items()
+                ]
+                EmployeeSkill.objects.bulk_create(
+                    employee_skills,
+                    update_conflicts=True,
+                    unique_fields=["employee", "skill"],
+                    update_fields=["level"],
+                )
+                # bulk-операции не вызывают сигналы поискового индекса
+                index_employees(employee.pk for employee, _ in links)
+        except DatabaseError as e:
+            # Строки с собственной ошибкой уже в отчёте — только записываемые
+            for line in queued:
+                report.add_error(line, f"Ошибка записи пачки: {e}")
+            # Состояние карты мест больше не соответствует базе
+            seats = SeatMap()
+            seen_emails.difference_update(employee.email for employee, _ in links)
+        else:
+            report.created += len(to_create)
+            report.updated += len(to_update)
+            report.skills_linked += len(employee_skills)
+
+        if progress:
+            progress(report)
+
+    # bulk_create/bulk_update не вызывают сигналы счётчиков и индекса навыков
+    rebuild_counters()
+    skill_index.invalidate()
+    return report
+
+
+def import_skills(records, batch_size=1000, progress=None):
+    """Импортирует навыки (name, description), существующие ищутся по имени"""
+    report = ImportReport()
+    for batch in batches(records, batch_size):
+        names = [(row.get("name") or "").strip() for _, row in batch]
+        existing = {skill.name: skill for skill in Skill.objects.filter(name__in=names)}
+        to_create, to_update = {}, {}
+        for line, row in batch:
+            report.processed += 1
+            name = (row.get("name") or "").strip()
+            if not name:
+                report.add_error(line, "Не указано название навыка")
+                continue
+            skill = existing.setdefault(name, Skill(name=name))
+            if row.get("description"):
+                skill.description = row["description"]
+            skill.updated_at = timezone.now()
+            (to_update if skill.pk else to_create)[name] = skill
+
+        with transaction.atomic():
+            Skill.objects.bulk_create(to_create.values())
+            Skill.objects.bulk_update(to_update.values(), ["description", "updated_at"])
+        report.created += len(to_create)
+        report.updated += len(to_update)
+        if progress:
+            progress(report)
+    return report
+
+
+def import_workstations(records, batch_size=1000, progress=None):
+    """Импортирует рабочие места, существующие ищутся по table_number"""
+    report = ImportReport()
+    locations = set()
+    for batch in batches(records, batch_size):
+        numbers = [(row.get("table_number") or "").strip() for _, row in batch]
+        existing = {
+            workstation.table_number: workstation
+            for workstation in Workstation.objects.filter(table_number__in=numbers)
+        }
+        locations.update(workstation.location for workstation in existing.values())
+        to_create, to_update = [], []
+        new_numbers = set()
+        for line, row in batch:
+            report.processed += 1
+            try:
+                if "__error__" in row:
+                    raise ValidationError(row["__error__"])
+                table_number = (row.get("table_number") or "").strip()
+                workstation = existing.get(table_number) or Workstation(
+                    table_number=table_number
+                )
+                is_new = workstation.pk is None
+                for field in WORKSTATION_FIELDS:
+                    value = row.get(field)
+                    if value not in (None, ""):
+                        setattr(workstation, field, value)
+                workstation.table_index = Workstation.parse_table_index(table_number)
+                workstation.updated_at = timezone.now()
+                workstation.clean_fields()
+                if is_new and table_number in new_numbers:
+                    raise ValidationError(f"Повторяющийся номер стола: {table_number}")
+            except ValidationError as e:
+                report.add_error(line, error_message(e))
+                continue
+            if is_new:
+                new_numbers.add(table_number)
+            locations.add(workstation.location)
+            (to_create if is_new else to_update).append(workstation)
+
+        with transaction.atomic():
+            Workstation.objects.bulk_create(to_create)
+            Workstation.objects.bulk_update(
+                to_update, WORKSTATION_FIELDS + ["table_index", "updated_at"]
+            )
+        report.created += len(to_create)
+        report.updated += len(to_update)
+        if progress:
+            progress(report)
+
+    # bulk-операции не вызывают сигналы графа соседства и счётчиков
+    rebuild_neighbours(locations)
+    rebuild_counters()
+    return report
+
+
+def import_floor_plan(
+    records, name, location=None, neighbour_distance=None, batch_size=1000
+):
+    """
+    Импортирует план этажа name из записей (table_number, x, y).
+
+    Отсутствующие столы создаются в местоположении плана, столы плана,
+    которых нет в файле, отвязываются от него. Граф соседства
+    пересчитывается для затронутых местоположений; пары столов, где после
+    импорта рядом сидят тестировщик и разработчик, попадают в
+    report.warnings. Возвращает ImportReport.
+    """
+    plan = FloorPlan.objects.filter(name=name).first()
+    if plan is None:
+        if not location:
+            raise ValidationError(f"Для нового плана {name} нужно местоположение")
+        plan = FloorPlan.objects.create(
+            name=name, location=location, neighbour_distance=neighbour_distance or 1
+        )
+    else:
+        changes = {}
+        if location:
+            changes["location"] = location
+        if neighbour_distance:
+            changes["neighbour_distance"] = neighbour_distance
+        if changes:
+            FloorPlan.objects.filter(pk=plan.pk).update(**changes)
+            for field, value in changes.items():
+                setattr(plan, field, value)
+
+    report = ImportReport()
+    previous = set(plan.workstations.values_list("id", flat=True))
+    locations = {plan.location}
+    placed, seen = set(), set()
+    for batch in batches(records, batch_size):
+        numbers = [str(row.get("table_number") or "").strip() for _, row in batch]
+        existing = {
+            workstation.table_number: workstation
+            for workstation in Workstation.objects.filter(table_number__in=numbers)
+        }
+        to_create, to_update = [], []
+        for line, row in batch:
+            report.processed += 1
+            try:
+                if "__error__" in row:
+                    raise ValidationError(row["__error__"])
+                table_number = str(row.get("table_number") or "").strip()
+                if not table_number:
+                    raise ValidationError("Не указан номер стола")
+                if table_number in seen:
+                    raise ValidationError(f"Повторяющийся номер стола: {table_number}")
+                x, y = float(row["x"]), float(row["y"])
+                if not (math.isfinite(x) and math.isfinite(y)):
+                    raise ValidationError("Координаты должны быть числами")
+            except (ValidationError, KeyError, TypeError, ValueError) as e:
+                report.add_error(line, error_message(e))
+                continue
+
+            seen.add(table_number)
+            workstation = existing.get(table_number)
+            if workstation is None:
+                workstation = Workstation(
+                    table_number=table_number,
+                    table_index=Workstation.parse_table_index(table_number),
+                    name=row.get("name") or f"Стол {table_number}",
+                )
+            else:
+                locations.add(workstation.location)
+            workstation.location = plan.location
+            workstation.floor_plan_id = plan.pk
+            workstation.x, workstation.y = x, y
+            workstation.updated_at = timezone.now()
+            (to_update if workstation.pk else to_create).append(workstation)
+
+        with transaction.atomic():
+            Workstation.objects.bulk_create(to_create)
+            Workstation.objects.bulk_update(
+                to_update, ["location", "floor_plan", "x", "y", "updated_at"]
+            )
+        placed.update(workstation.pk for workstation in to_create + to_update)
+        report.created += len(to_create)
+        report.updated += len(to_update)
+
+    removed = list(previous - placed)
+    for offset in range(0, len(removed), batch_size):
+        Workstation.objects.filter(pk__in=removed[offset : offset + batch_size]).update(
+            floor_plan=None, x=None, y=None, updated_at=timezone.now()
+        )
+
+    rebuild_neighbours(locations)
+    rebuild_counters()
+    conflicts = adjacency_conflicts(plan.workstations.all())
+    numbers = dict(
+        Workstation.objects.filter(
+            pk__in={pk for pair in conflicts for pk in pair}
+        ).values_list("id", "table_number")
+    )
+    report.warnings = [
+        f"За соседними столами {numbers[a]} и {numbers[b]} сидят тестировщик "
+        "и разработчик"
+        for a, b in conflicts
+    ]
+    return report
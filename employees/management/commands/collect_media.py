@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from employees.storage import collect_orphans
+from employees.uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет файлы фотографий, на которые не осталось ссылок, "
+        "и брошенные загрузки"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace",
+            type=int,
+            help="Сколько секунд файл должен пробыть без ссылок "
+            "(по умолчанию EMPLOYEE_MEDIA_DELETE_GRACE_SECONDS)",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--upload-age",
+            type=int,
+            help="Через сколько секунд без изменений удалять незавершённые "
+            "загрузки (по умолчанию EMPLOYEE_UPLOAD_EXPIRE_SECONDS)",
+        )
+
+    def handle(self, *args, **options):
+        grace = options["grace"]
+        removed = collect_orphans(
+            grace=timedelta(seconds=grace) if grace is not None else None,
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Удалено файлов: {removed}"))
+        age = options["upload_age"]
+        expired = expire_uploads(timedelta(seconds=age) if age is not None else None)
+        self.stdout.write(self.style.SUCCESS(f"Удалено загрузок: {expired}"))
@@ -0,0 +1,53 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from employees.export import CONTENT_TYPES, export_chunks, filter_employees
+from employees.views import employee_queryset
+
+
+class Command(BaseCommand):
+    help = "Потоковая выгрузка справочника сотрудников в CSV или NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=sorted(CONTENT_TYPES), default="csv", dest="fmt"
+        )
+        parser.add_argument("--gzip", action="store_true", help="Сжать gzip")
+        parser.add_argument(
+            "--output", "-o", help="Файл выгрузки (по умолчанию — stdout)"
+        )
+        parser.add_argument("--location", help="Фильтр по местоположению")
+        parser.add_argument("--position", help="Фильтр по должности")
+        parser.add_argument(
+            "--skill", action="append", default=[], help="Фильтр по навыку"
+        )
+        parser.add_argument(
+            "--base-url", default="", help="Префикс для ссылок на изображения"
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        queryset = filter_employees(
+            employee_queryset().select_related("workstation"),
+            location=options["location"],
+            position=options["position"],
+            skills=options["skill"],
+        )
+        base_url = options["base_url"].rstrip("/")
+        chunks = export_chunks(
+            queryset,
+            fmt=options["fmt"],
+            compress=options["gzip"],
+            chunk_size=options["chunk_size"],
+            build_url=(lambda url: base_url + url) if base_url else None,
+        )
+
+        if options["output"]:
+            with open(options["output"], "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
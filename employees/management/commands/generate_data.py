@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.synthetic import LOCATIONS, PHOTO_COLOURS, SKILLS, Generator
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует синтетический справочник заданного размера: рабочие места, "
+        "сотрудников, навыки и фотографии с соблюдением правила соседства"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=1000)
+        parser.add_argument(
+            "--workstations",
+            type=int,
+            help="Число рабочих мест (по умолчанию — по числу сотрудников)",
+        )
+        parser.add_argument(
+            "--locations", type=int, default=4, help=f"От 1 до {len(LOCATIONS)}"
+        )
+        parser.add_argument("--skills", type=int, default=len(SKILLS))
+        parser.add_argument(
+            "--max-skills", type=int, default=6, help="Навыков у сотрудника, не более"
+        )
+        parser.add_argument(
+            "--max-images",
+            type=int,
+            default=2,
+            help="Фотографий у сотрудника, не более",
+        )
+        parser.add_argument(
+            "--photos",
+            type=int,
+            default=len(PHOTO_COLOURS),
+            help="Число различных файлов фотографий",
+        )
+        parser.add_argument(
+            "--occupancy", type=float, default=0.9, help="Доля сотрудников со столом"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["employees"] < 0 or options["batch_size"] < 1:
+            raise CommandError("Ожидаются положительные --employees и --batch-size")
+        if not 0 <= options["occupancy"] <= 1:
+            raise CommandError("--occupancy должен быть от 0 до 1")
+
+        progress = None
+        if options["verbosity"] > 1:
+            progress = lambda message: self.stdout.write(f"... {message}")
+        created = Generator(
+            employees=options["employees"],
+            workstations=options["workstations"],
+            locations=options["locations"],
+            skills=options["skills"],
+            max_skills=options["max_skills"],
+            max_images=options["max_images"],
+            photos=options["photos"],
+            occupancy=options["occupancy"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            progress=progress,
+        ).generate()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Создано: "
+                + ", ".join(f"{name} {count}" for name, count in created.items())
+            )
+        )
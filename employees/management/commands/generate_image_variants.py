@@ -0,0 +1,108 @@
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from employees.imaging import generate_variants
+from employees.models import Employee, EmployeeImage
+from employees.signals import bump_cache_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт уменьшенные копии и WebP-версии для существующих фотографий "
+        "сотрудников в media/employees/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Пересоздать все копии"
+        )
+        parser.add_argument("--workers", type=int, default=4, help="Число процессов")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        self.batch_size = max(1, options["batch_size"])
+        self.pending, self.pending_names = [], []
+        self.files, self.rows, self.failed = 0, 0, 0
+
+        # Файл с одинаковым содержимым у многих строк (ContentAddressedStorage)
+        # обрабатывается один раз; в работе не больше двух задач на процесс
+        in_flight = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for name, pks in self.stale_groups(options["force"]):
+                if len(in_flight) >= workers * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self.collect(done, in_flight)
+                future = pool.submit(generate_variants, settings.MEDIA_ROOT, name)
+                in_flight[future] = (name, pks)
+            self.collect(list(in_flight), in_flight)
+        self.flush()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово: файлов {self.files}, изображений {self.rows}, "
+                f"ошибок: {self.failed}"
+            )
+        )
+
+    def stale_groups(self, force):
+        """
+        (имя файла, [pk строк без актуальных копий]) порциями по batch_size
+        имён, чтобы не читать всю таблицу в память.
+        """
+        last = ""
+        while True:
+            names = list(
+                EmployeeImage.objects.filter(image__gt=last)
+                .order_by("image")
+                .values_list("image", flat=True)
+                .distinct()[: self.batch_size]
+            )
+            if not names:
+                return
+            last = names[-1]
+            groups = defaultdict(list)
+            for pk, name, variants in (
+                EmployeeImage.objects.filter(image__in=names)
+                .order_by("pk")
+                .values_list("pk", "image", "variants")
+            ):
+                if force or (variants or {}).get("source") != name:
+                    groups[name].append(pk)
+            yield from groups.items()
+
+    def collect(self, futures, in_flight):
+        for future in futures:
+            name, pks = in_flight.pop(future)
+            try:
+                variants, width, height = future.result()
+            except Exception as e:
+                self.failed += 1
+                self.stderr.write(f"{name}: {e}")
+                continue
+            self.files += 1
+            self.pending_names.append(name)
+            self.pending.extend(
+                EmployeeImage(pk=pk, variants=variants, width=width, height=height)
+                for pk in pks
+            )
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        EmployeeImage.objects.bulk_update(
+            self.pending, ["variants", "width", "height"], batch_size=self.batch_size
+        )
+        # bulk_update не вызывает сигналы: фрагменты владельцев устаревают.
+        # Фильтр по именам файлов: строк с одним файлом может быть сколько угодно
+        bump_cache_version(
+            Employee.objects.filter(images__image__in=self.pending_names)
+        )
+        self.rows += len(self.pending)
+        self.pending.clear()
+        self.pending_names.clear()
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.importing import (
+    import_employees,
+    import_skills,
+    import_workstations,
+    read_records,
+)
+
+IMPORTERS = {
+    "employees": import_employees,
+    "skills": import_skills,
+    "workstations": import_workstations,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковый импорт сотрудников, навыков или рабочих мест из CSV/JSONL "
+        "с пакетной проверкой и записью"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу CSV или JSONL")
+        parser.add_argument(
+            "--kind",
+            choices=sorted(IMPORTERS),
+            default="employees",
+            help="Тип записей в файле",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Формат файла (по умолчанию — по расширению)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Размер пачки записи"
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size должен быть положительным")
+        try:
+            records = read_records(options["path"], options["format"])
+            progress = None
+            if options["verbosity"] > 0:
+                progress = lambda report: self.stdout.write(f"... {report}")
+            report = IMPORTERS[options["kind"]](
+                records, batch_size=options["batch_size"], progress=progress
+            )
+        except OSError as e:
+            raise CommandError(f"Не удалось прочитать файл: {e}")
+
+        for line, message in report.errors:
+            self.stderr.write(f"Строка {line}: {message}")
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(f"Импорт завершён: {report}"))
@@ -0,0 +1,55 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.importing import error_message, import_floor_plan, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует план этажа (номер стола и координаты x, y) из CSV/JSONL "
+        "или текстовой сетки и пересчитывает граф соседства рабочих мест"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="CSV/JSONL с колонками table_number, x, y или .txt-сетка номеров",
+        )
+        parser.add_argument("--plan", required=True, help="Название плана этажа")
+        parser.add_argument(
+            "--location", help="Местоположение (обязательно для нового плана)"
+        )
+        parser.add_argument(
+            "--distance",
+            type=float,
+            help="Радиус соседства в единицах координат (по умолчанию 1)",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl", "grid"],
+            help="Формат файла (по умолчанию — по расширению)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["distance"] is not None and options["distance"] <= 0:
+            raise CommandError("--distance должен быть положительным")
+        try:
+            report = import_floor_plan(
+                read_records(options["path"], options["format"]),
+                options["plan"],
+                location=options["location"],
+                neighbour_distance=options["distance"],
+                batch_size=options["batch_size"],
+            )
+        except OSError as e:
+            raise CommandError(f"Не удалось прочитать файл: {e}")
+        except ValidationError as e:
+            raise CommandError(error_message(e))
+
+        for line, message in report.errors:
+            self.stderr.write(f"Строка {line}: {message}")
+        for message in report.warnings:
+            self.stderr.write(self.style.WARNING(message))
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(f"Импорт плана завершён: {report}"))
@@ -0,0 +1,64 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.models import Employee
+from employees.seating import reseat
+from workstations.models import Workstation
+
+
+class Command(BaseCommand):
+    help = (
+        "Рассаживает сотрудников по рабочим местам с учётом правила соседства "
+        "тестировщиков и разработчиков и записывает результат одной транзакцией"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--location", help="Местоположение рабочих мест для рассадки"
+        )
+        parser.add_argument(
+            "--employees",
+            help="Id сотрудников через запятую "
+            "(по умолчанию — сотрудники, сидящие за выбранными столами)",
+        )
+        parser.add_argument(
+            "--unseated",
+            action="store_true",
+            help="Добавить к рассадке сотрудников без рабочего места",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Только рассчитать рассадку"
+        )
+
+    def handle(self, *args, **options):
+        workstations = Workstation.objects.all()
+        if options["location"]:
+            workstations = workstations.filter(location=options["location"])
+
+        if options["employees"]:
+            try:
+                ids = [int(pk) for pk in options["employees"].split(",") if pk]
+            except ValueError:
+                raise CommandError("--employees: ожидаются числовые id")
+            employees = Employee.objects.filter(pk__in=ids)
+        else:
+            employees = Employee.objects.filter(workstation__in=workstations)
+        if options["unseated"]:
+            employees = employees | Employee.objects.filter(workstation__isnull=True)
+
+        try:
+            assignment = reseat(
+                employees.order_by("pk"), workstations, dry_run=options["dry_run"]
+            )
+        except ValidationError as e:
+            raise CommandError("; ".join(e.messages))
+
+        if options["verbosity"] > 1:
+            tables = dict(workstations.values_list("id", "table_number"))
+            for employee_id, workstation_id in sorted(assignment.items()):
+                self.stdout.write(f"{employee_id} -> {tables[workstation_id]}")
+
+        action = "Рассчитана" if options["dry_run"] else "Применена"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} рассадка {len(assignment)} сотрудников")
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from employees.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = "Перестраивает полнотекстовый индекс сотрудников (SQLite FTS5)"
+
+    def handle(self, *args, **options):
+        if not search_available():
+            self.stdout.write("Полнотекстовый индекс поддерживается только SQLite")
+            return
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано сотрудников: {count}"))
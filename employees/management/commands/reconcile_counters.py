@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from employees.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает счётчики справочника и исправляет расхождения"
+
+    def handle(self, *args, **options):
+        drift = rebuild_counters()
+        for name, (old, new) in sorted(drift.items()):
+            self.stdout.write(f"{name}: {old} -> {new}")
+        self.stdout.write(self.style.SUCCESS(f"Исправлено счётчиков: {len(drift)}"))
@@ -0,0 +1,124 @@
+from collections import Counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from employees.models import Employee, EmployeeImage, MediaFile
+from employees.signals import bump_cache_version
+from employees.storage import (
+    content_hash,
+    employee_media_storage,
+    hashed_name,
+    is_hashed_name,
+    remove_file,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит существующие фотографии в хранилище с адресацией по "
+        "содержимому, объединяет дубликаты и пересчитывает ссылки. Копии "
+        "перенесённых фотографий затем создаются заново командой "
+        "generate_image_variants (кроме --skip-variants)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Только показать изменения"
+        )
+        parser.add_argument(
+            "--skip-variants",
+            action="store_true",
+            help="Не создавать копии; потом нужен generate_image_variants",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Число процессов для копий"
+        )
+
+    def handle(self, *args, **options):
+        storage = employee_media_storage()
+        dry_run = options["dry_run"]
+        names = (
+            EmployeeImage.objects.exclude(image="")
+            .order_by()
+            .values_list("image", flat=True)
+            .distinct()
+        )
+
+        moved, missing, freed = 0, 0, 0
+        for name in list(names):
+            if is_hashed_name(name):
+                continue
+            if not storage.exists(name):
+                missing += 1
+                self.stderr.write(f"Файл не найден: {name}")
+                continue
+            with storage.open(name) as f:
+                new_name = hashed_name(content_hash(f), name)
+            if dry_run:
+                self.stdout.write(f"{name} -> {new_name}")
+                continue
+
+            if storage.exists(new_name):
+                freed += storage.size(name)
+            else:
+                with storage.open(name) as f:
+                    # save() вернёт то же имя: оно вычисляется из содержимого
+                    storage.save(name, f)
+            with transaction.atomic():
+                EmployeeImage.objects.filter(image=name).update(
+                    image=new_name, variants={}
+                )
+                # update() не вызывает сигналы — кеш карточек и API
+                bump_cache_version(Employee.objects.filter(images__image=new_name))
+            remove_file(storage, name)
+            moved += 1
+
+        if not dry_run:
+            self.recount()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Перенесено: {moved}, не найдено: {missing}, "
+                f"освобождено байт: {freed}"
+            )
+        )
+        if dry_run or not moved:
+            return
+        # Копии старых имён удалены вместе с файлами, variants сброшены
+        if options["skip_variants"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Перенесённые фотографии без копий: запустите "
+                    "generate_image_variants"
+                )
+            )
+        else:
+            call_command(
+                "generate_image_variants",
+                workers=options["workers"],
+                stdout=self.stdout,
+                stderr=self.stderr,
+            )
+
+    @transaction.atomic
+    def recount(self):
+        """Пересчитывает MediaFile.refs по фактическим ссылкам"""
+        refs = Counter(
+            EmployeeImage.objects.exclude(image="")
+            .order_by()
+            .values_list("image", flat=True)
+        )
+        for media_file in MediaFile.objects.all():
+            count = refs.pop(media_file.name, 0)
+            orphaned_at = None
+            if count <= 0:
+                orphaned_at = media_file.orphaned_at or timezone.now()
+            if (media_file.refs, media_file.orphaned_at) != (count, orphaned_at):
+                MediaFile.objects.filter(pk=media_file.pk).update(
+                    refs=count, orphaned_at=orphaned_at
+                )
+        MediaFile.objects.bulk_create(
+            MediaFile(name=name, refs=count) for name, count in refs.items()
+        )
@@ -0,0 +1,169 @@
+"""
+Раздача медиафайлов (MEDIA_ROOT).
+
+serve_media проверяет путь и права, а сам файл отдаёт фронтовой сервер:
+при MEDIA_SENDFILE = "x-accel-redirect" — nginx через internal-location
+MEDIA_ACCEL_PREFIX, при "x-sendfile" — Apache mod_xsendfile или lighttpd.
+Без них файл отдаёт Django: FileResponse (wsgi.file_wrapper, sendfile у
+gunicorn), Range с одним диапазоном, ETag/Last-Modified и 304 на
+If-None-Match/If-Modified-Since.
+
+Имена в хранилище с адресацией по содержимому и URL с ?v=<хеш>, совпадающим
+с текущим содержимым файла (storage.py), кешируются браузером на год;
+остальные файлы, в том числе с устаревшим ?v=, браузер перепроверяет по ETag.
+"""
+
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .storage import file_version, is_hashed_name
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def can_view(request, name):
+    """Служебные файлы не раздаются; при MEDIA_LOGIN_REQUIRED — только вошедшим"""
+    if any(part.startswith(".") for part in name.split("/")):
+        return False
+    if getattr(settings, "MEDIA_LOGIN_REQUIRED", False):
+        return request.user.is_authenticated
+    return True
+
+
+def parse_range(header, size):
+    """
+    (начало, конец включительно) из заголовка Range или None — отдать весь
+    файл (несколько диапазонов или некорректный заголовок).
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not size:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last or not int(last):
+            return None
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = min(int(last), size - 1) if last else size - 1
+    if end < start:
+        return None
+    return start, end
+
+
+def range_applies(request, etag, mtime):
+    """If-Range: диапазон только для той же версии файла"""
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == mtime
+
+
+def file_range(f, start, length, block_size=FileResponse.block_size):
+    try:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(block_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        f.close()
+
+
+def cache_control(request, name, path):
+    version = request.GET.get("v")
+    if is_hashed_name(name) or (version and version == file_version(path)):
+        control = IMMUTABLE
+    else:
+        control = "no-cache"
+    if getattr(settings, "MEDIA_LOGIN_REQUIRED", False):
+        control = control.replace("public", "private")
+    return control
+
+
+def file_response(request, path, size, mtime, etag):
+    """Ответ с телом файла: весь файл, диапазон или 416"""
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    byte_range = None
+    header = request.headers.get("Range")
+    if header and range_applies(request, etag, mtime):
+        try:
+            byte_range = parse_range(header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+    if byte_range is None:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            file_range(open(path, "rb"), start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def offload_response(path, name, backend):
+    """Пустой ответ, тело которого отдаёт фронтовой сервер"""
+    response = HttpResponse(
+        content_type=mimetypes.guess_type(path)[0] or "application/octet-stream"
+    )
+    if backend == "x-accel-redirect":
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(name)
+    else:
+        response["X-Sendfile"] = path
+    return response
+
+
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not can_view(request, path):
+        raise Http404
+    try:
+        info = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not stat.S_ISREG(info.st_mode):
+        raise Http404
+
+    mtime = int(info.st_mtime)
+    etag = quote_etag(f"{info.st_mtime_ns:x}-{info.st_size:x}")
+    response = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if response is None:
+        backend = getattr(settings, "MEDIA_SENDFILE", "")
+        if backend:
+            response = offload_response(full_path, path, backend)
+        else:
+            response = file_response(request, full_path, info.st_size, mtime, etag)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(mtime)
+    response["Cache-Control"] = cache_control(request, path, full_path)
+    return response
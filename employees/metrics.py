@@ -0,0 +1,453 @@
+"""
+Метрики запросов в формате Prometheus и выборочный профилировщик.
+
+MetricsMiddleware для каждого запроса записывает по имени маршрута
+(resolver_match.view_name) время обработки, число и суммарное время
+SQL-запросов, время рендеринга шаблонов и размер ответа в гистограммы
+процесса. Если задан METRICS_DIR, процесс раз в METRICS_FLUSH_INTERVAL
+секунд сохраняет свои значения в METRICS_DIR/<pid>-<время запуска>.json,
+а /metrics складывает файлы всех процессов (воркеров gunicorn/uvicorn).
+Время запуска в имени не даёт новому процессу с тем же pid затереть
+чужие значения; файлы завершившихся процессов удаляются при запуске
+(Registry.prune). Middleware работает и под WSGI, и под ASGI без
+переключения потоков. /metrics отдаётся сотрудникам с is_staff и
+сборщику с токеном METRICS_TOKEN.
+
+Заголовок X-Profile со значением METRICS_PROFILE_TOKEN включает для
+запроса выборочный профилировщик: стеки потока снимаются каждые
+METRICS_PROFILE_INTERVAL секунд и сохраняются в METRICS_PROFILE_DIR в
+свёрнутом формате flamegraph.pl / speedscope.
+"""
+
+import contextlib
+import contextvars
+import hmac
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .budgets import count_queries
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    "django_request_duration_seconds": ("Время обработки запроса", TIME_BUCKETS),
+    "django_db_queries": ("Число SQL-запросов за запрос", COUNT_BUCKETS),
+    "django_db_query_duration_seconds": (
+        "Суммарное время SQL-запросов за запрос",
+        TIME_BUCKETS,
+    ),
+    "django_template_render_seconds": (
+        "Время рендеринга шаблонов за запрос",
+        TIME_BUCKETS,
+    ),
+    "django_response_size_bytes": ("Размер тела ответа", SIZE_BUCKETS),
+}
+COUNTERS = {
+    "django_requests_total": "Запросы по маршруту, методу и статусу",
+}
+PROFILE_HEADER = "X-Profile"
+
+_request = contextvars.ContextVar("metrics_request", default=None)
+
+
+class Registry:
+    """
+    Значения метрик процесса: {(метрика, метки): [счётчики корзин..., сумма]}
+    для гистограмм и {(метрика, метки): [значение]} для счётчиков.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.values = {}
+        self.lock = threading.Lock()
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.flushed_at = 0.0
+        self.started = int(time.time())
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, labels)
+        with self.lock:
+            values = self.values.get(key)
+            if values is None:
+                values = self.values[key] = [0] * (len(buckets) + 2)
+            values[bisect_left(buckets, value)] += 1
+            values[-1] += value
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self.lock:
+            values = self.values.setdefault(key, [0])
+            values[0] += amount
+
+    def snapshot(self):
+        with self.lock:
+            return {key: list(values) for key, values in self.values.items()}
+
+    def path(self, pid=None):
+        return os.path.join(self.directory, f"{pid or os.getpid()}-{self.started}.json")
+
+    def prune(self, tmp_age=60):
+        """
+        Удаляет файлы завершившихся процессов и прежних процессов с тем же
+        pid, а также брошенные при сбое временные файлы старше tmp_age секунд
+        """
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        own = os.path.basename(self.path())
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            if filename.endswith(".tmp"):
+                stale = _age(path) > tmp_age
+            elif filename.endswith(".json") and filename != own:
+                pid = filename.partition("-")[0]
+                stale = pid.isdigit() and (
+                    int(pid) == os.getpid() or not pid_alive(int(pid))
+                )
+            else:
+                continue
+            if stale:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+
+    def maybe_flush(self):
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if now - self.flushed_at < self.flush_interval:
+            return
+        self.flushed_at = now
+        self.flush()
+
+    def flush(self):
+        """Сохраняет значения процесса в METRICS_DIR атомарной заменой файла"""
+        os.makedirs(self.directory, exist_ok=True)
+        data = [
+            [name, list(labels), values]
+            for (name, labels), values in self.snapshot().items()
+        ]
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path())
+
+    def collect(self):
+        """Сумма значений этого процесса и файлов остальных процессов"""
+        merged = self.snapshot()
+        if not self.directory or not os.path.isdir(self.directory):
+            return merged
+        own = os.path.basename(self.path())
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json") or filename == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, values in data:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                current = merged.get(key)
+                if current is None:
+                    merged[key] = values
+                else:
+                    merged[key] = [a + b for a, b in zip(current, values)]
+        return merged
+
+
+def _age(path):
+    try:
+        return time.time() - os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0
+
+
+def pid_alive(pid):
+    # Сигнал 0 только проверяет процесс; в Windows os.kill его не знает
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def exposition(values):
+    """Текстовый формат Prometheus 0.0.4"""
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (metric, labels), counts in sorted(values.items()):
+            if metric == name:
+                value = format_number(counts[0])
+                lines.append(f"{name}{format_labels(labels)} {value}")
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (metric, labels), counts in sorted(values.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip([*buckets, "+Inf"], counts):
+                cumulative += count
+                le = format_labels(labels, [("le", bound)])
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            label_text = format_labels(labels)
+            lines.append(f"{name}_sum{label_text} {format_number(counts[-1])}")
+            lines.append(f"{name}_count{label_text} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+_registry = None
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        _registry = Registry(
+            getattr(settings, "METRICS_DIR", None),
+            getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0),
+        )
+        _registry.prune()
+    return _registry
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.template_time = 0.0
+        self.template_depth = 0
+
+
+def instrument_templates():
+    """Засекает время рендеринга шаблонов Django и Jinja2 (только внешних)"""
+    from django.template.backends.django import Template
+
+    _wrap_render(Template)
+    try:
+        from django.template.backends.jinja2 import Template as Jinja2Template
+    except ImportError:
+        return
+    _wrap_render(Jinja2Template)
+
+
+def _wrap_render(template_class):
+    if getattr(template_class.render, "_metrics", False):
+        return
+    render = template_class.render
+
+    def timed_render(self, context=None, request=None):
+        state = _request.get()
+        if state is None:
+            return render(self, context, request)
+        state.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            state.template_depth -= 1
+            if not state.template_depth:
+                state.template_time += time.perf_counter() - start
+
+    timed_render._metrics = True
+    template_class.render = timed_render
+
+
+class SamplingProfiler:
+    """Снимает стек потока thread_id каждые interval секунд в фоновом потоке"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def profiling_requested(request):
+    token = getattr(settings, "METRICS_PROFILE_TOKEN", None)
+    return bool(token) and request.headers.get(PROFILE_HEADER) == token
+
+
+def save_profile(profiler, view_name):
+    directory = getattr(settings, "METRICS_PROFILE_DIR", None) or os.path.join(
+        tempfile.gettempdir(), "profiles"
+    )
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    filename = f"{view_name.replace(':', '_')}-{stamp}-{os.getpid()}.folded"
+    with open(os.path.join(directory, filename), "w") as f:
+        f.write(profiler.folded())
+    return filename
+
+
+class MetricsMiddleware:
+    """Метрики каждого запроса; ставится первым в MIDDLEWARE"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.registry = get_registry()
+        instrument_templates()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not profiling_requested(request):
+            return self.measure(request)
+        with self.profiler() as profiler:
+            response = self.measure(request)
+        return self.annotate(request, response, profiler)
+
+    async def __acall__(self, request):
+        # Под ASGI профилируется поток цикла событий; запросы к базе и
+        # синхронный код в потоках sync_to_async в профиль не попадают
+        if not profiling_requested(request):
+            return await self.ameasure(request)
+        with self.profiler() as profiler:
+            response = await self.ameasure(request)
+        return self.annotate(request, response, profiler)
+
+    def profiler(self):
+        return SamplingProfiler(
+            threading.get_ident(),
+            getattr(settings, "METRICS_PROFILE_INTERVAL", 0.005),
+        )
+
+    def annotate(self, request, response, profiler):
+        response[f"{PROFILE_HEADER}-Samples"] = profiler.samples
+        response[f"{PROFILE_HEADER}-File"] = save_profile(
+            profiler, self.view_name(request)
+        )
+        return response
+
+    def view_name(self, request):
+        match = getattr(request, "resolver_match", None)
+        return match.view_name if match else "<unresolved>"
+
+    def measure(self, request):
+        state = RequestMetrics()
+        token = _request.set(state)
+        start = time.perf_counter()
+        try:
+            with count_queries() as queries:
+                response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.record(request, response, state, queries, start)
+
+    async def ameasure(self, request):
+        state = RequestMetrics()
+        token = _request.set(state)
+        start = time.perf_counter()
+        # Соединения с базой у каждого потока свои: счётчик ставится в
+        # поток, где sync_to_async выполняет запросы этого запроса
+        stack = contextlib.ExitStack()
+        queries = await sync_to_async(stack.enter_context)(count_queries())
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            _request.reset(token)
+        return self.record(request, response, state, queries, start)
+
+    def record(self, request, response, state, queries, start):
+        duration = time.perf_counter() - start
+        view = self.view_name(request)
+        if view == "metrics":
+            return response
+        labels = (("view", view),)
+        registry = self.registry
+        registry.observe("django_request_duration_seconds", labels, duration)
+        registry.observe("django_db_queries", labels, queries.count)
+        registry.observe("django_db_query_duration_seconds", labels, queries.duration)
+        registry.observe("django_template_render_seconds", labels, state.template_time)
+        if not response.streaming:
+            registry.observe(
+                "django_response_size_bytes", labels, len(response.content)
+            )
+        registry.inc(
+            "django_requests_total",
+            (
+                *labels,
+                ("method", request.method),
+                ("status", str(response.status_code)),
+            ),
+        )
+        registry.maybe_flush()
+        return response
+
+
+def metrics_view(request):
+    """Метрики всех процессов; доступны сотрудникам с is_staff и по
+    заголовку Authorization: Bearer <METRICS_TOKEN>"""
+    token = getattr(settings, "METRICS_TOKEN", None)
+    bearer = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    user = getattr(request, "user", None)
+    if not (token and hmac.compare_digest(bearer, token)) and not (
+        user is not None and user.is_staff
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        exposition(get_registry().collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+# Копия employees.models.classify_position на момент миграции: миграция не
+# должна зависеть от дальнейших изменений кода приложения
+TESTER_KEYWORDS = ("тестировщик", "tester")
+DEVELOPER_KEYWORDS = ("разработчик", "developer", "backend", "frontend")
+
+
+def classify_position(position):
+    position = (position or "").lower()
+    if any(word in position for word in TESTER_KEYWORDS):
+        return "tester"
+    if any(word in position for word in DEVELOPER_KEYWORDS):
+        return "developer"
+    return "other"
+
+
+def fill_role(apps, schema_editor):
+    Employee = apps.get_model("employees", "Employee")
+    employees = list(Employee.objects.only("id", "position"))
+    for employee in employees:
+        employee.role = classify_position(employee.position)
+    Employee.objects.bulk_update(employees, ["role"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0003_alter_employee_workstation"),
+        ("workstations", "0003_workstation_table_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="role",
+            field=models.CharField(
+                choices=[
+                    ("tester", "Тестировщик"),
+                    ("developer", "Разработчик"),
+                    ("other", "Другое"),
+                ],
+                db_index=True,
+                default="other",
+                editable=False,
+                max_length=20,
+                verbose_name="Роль",
+            ),
+        ),
+        migrations.RunPython(fill_role, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0004_employee_role"),
+        ("workstations", "0003_workstation_table_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["last_name", "first_name", "id"],
+                name="employee_name_keyset_idx",
+            ),
+        ),
+    ]
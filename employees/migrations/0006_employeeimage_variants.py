@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 15:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0005_employee_name_keyset_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employeeimage",
+            name="height",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="Высота"
+            ),
+        ),
+        migrations.AddField(
+            model_name="employeeimage",
+            name="variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Копии изображения",
+            ),
+        ),
+        migrations.AddField(
+            model_name="employeeimage",
+            name="width",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="Ширина"
+            ),
+        ),
+    ]
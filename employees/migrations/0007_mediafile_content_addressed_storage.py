@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 15:08
+
+from django.db import migrations, models
+
+import employees.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0006_employeeimage_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, unique=True, verbose_name="Файл"),
+                ),
+                ("refs", models.IntegerField(default=0, verbose_name="Число ссылок")),
+                (
+                    "orphaned_at",
+                    models.DateTimeField(
+                        blank=True,
+                        db_index=True,
+                        null=True,
+                        verbose_name="Без ссылок с",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Файл хранилища",
+                "verbose_name_plural": "Файлы хранилища",
+            },
+        ),
+        migrations.AlterField(
+            model_name="employeeimage",
+            name="image",
+            field=models.ImageField(
+                db_index=True,
+                storage=employees.storage.employee_media_storage,
+                upload_to="employees/%Y/%m/%d/",
+                verbose_name="Изображение",
+            ),
+        ),
+    ]
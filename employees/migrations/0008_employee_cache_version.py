@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0007_mediafile_content_addressed_storage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="cache_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
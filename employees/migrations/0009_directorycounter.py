@@ -0,0 +1,74 @@
+# Generated by Django 5.2 on 2026-10-18 15:11
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    # Копия employees.counters.compute_counters на момент миграции
+    Employee = apps.get_model("employees", "Employee")
+    Workstation = apps.get_model("workstations", "Workstation")
+    DirectoryCounter = apps.get_model("employees", "DirectoryCounter")
+
+    counters = {"employees:total": Employee.objects.count()}
+    for role, count in (
+        Employee.objects.order_by().values_list("role").annotate(n=Count("id"))
+    ):
+        counters[f"employees:role:{role}"] = count
+    for location, count in (
+        Employee.objects.order_by()
+        .values_list("workstation__location")
+        .annotate(n=Count("id"))
+    ):
+        counters[f"employees:location:{location or ''}"] = count
+    occupied = (
+        Employee.objects.filter(workstation__isnull=False)
+        .order_by()
+        .values("workstation")
+    )
+    counters["workstations:occupied"] = Workstation.objects.filter(
+        pk__in=occupied
+    ).count()
+    counters["workstations:free"] = (
+        Workstation.objects.filter(is_active=True).exclude(pk__in=occupied).count()
+    )
+    DirectoryCounter.objects.bulk_create(
+        DirectoryCounter(name=name, value=value) for name, value in counters.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0008_employee_cache_version"),
+        ("workstations", "0003_workstation_table_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DirectoryCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Счётчик"
+                    ),
+                ),
+                ("value", models.BigIntegerField(default=0, verbose_name="Значение")),
+            ],
+            options={
+                "verbose_name": "Счётчик справочника",
+                "verbose_name_plural": "Счётчики справочника",
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# Копия схемы и заполнения из employees/search.py на момент миграции
+FTS_TABLE = "employees_employee_fts"
+FTS_COLUMNS = [
+    "last_name",
+    "first_name",
+    "middle_name",
+    "email",
+    "position",
+    "description",
+    "skills",
+]
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    + ", ".join(FTS_COLUMNS)
+    + ", tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+DROP_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+
+def fold_sql(expression):
+    return f"replace(replace(coalesce({expression}, ''), 'ё', 'е'), 'Ё', 'Е')"
+
+
+FILL_SQL = (
+    f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) SELECT e.id, "
+    + ", ".join(fold_sql(f"e.{column}") for column in FTS_COLUMNS[:-1])
+    + ", "
+    + fold_sql(
+        "(SELECT group_concat(s.name, ' ') FROM employees_employeeskill es "
+        "JOIN employees_skill s ON s.id = es.skill_id WHERE es.employee_id = e.id)"
+    )
+    + " FROM employees_employee e"
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(FILL_SQL)
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0009_directorycounter"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0010_employee_fts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, verbose_name="Изменён"
+            ),
+        ),
+        migrations.AddField(
+            model_name="skill",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, verbose_name="Изменён"
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 16:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0011_updated_at"),
+        ("workstations", "0005_floor_plan"),
+    ]
+
+    # Составной индекс создаётся до удаления индекса по employee_id
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["hire_date", "id"], name="employee_hire_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employeeimage",
+            index=models.Index(
+                fields=["employee", "order", "created_at"],
+                name="employee_image_order_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="employeeimage",
+            name="employee",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="images",
+                to="employees.employee",
+                verbose_name="Сотрудник",
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2 on 2026-10-18 16:12
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0012_tenure_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageUpload",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(max_length=255, verbose_name="Имя файла"),
+                ),
+                ("size", models.PositiveBigIntegerField(verbose_name="Размер")),
+                ("sha256", models.CharField(max_length=64, verbose_name="SHA-256")),
+                (
+                    "received",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Получено байт"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, db_index=True, verbose_name="Дата изменения"
+                    ),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="uploads",
+                        to="employees.employee",
+                        verbose_name="Сотрудник",
+                    ),
+                ),
+                (
+                    "image",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="employees.employeeimage",
+                        verbose_name="Изображение",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Загрузка фотографии",
+                "verbose_name_plural": "Загрузки фотографий",
+            },
+        ),
+    ]
@@ -1,93 +1,181 @@
-from django.db import models
+import uuid
+from functools import partial
+
+from django.apps import apps
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    DateField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Value,
+    When,
+)
 from django.utils import timezone
-import os
 from django.utils.translation import gettext_lazy as _
 
-from django.apps import apps
+from .storage import employee_media_storage
+
+TESTER_KEYWORDS = ("тестировщик", "tester")
+DEVELOPER_KEYWORDS = ("разработчик", "developer", "backend", "frontend")
+
+
+def classify_position(position):
+    """Категория роли по тексту должности"""
+    position = (position or "").lower()
+    if any(word in position for word in TESTER_KEYWORDS):
+        return Employee.ROLE_TESTER
+    if any(word in position for word in DEVELOPER_KEYWORDS):
+        return Employee.ROLE_DEVELOPER
+    return Employee.ROLE_OTHER
+
+
+def conflicting_role(role):
+    """Роль, с которой нельзя сидеть за соседним столом"""
+    return {
+        Employee.ROLE_TESTER: Employee.ROLE_DEVELOPER,
+        Employee.ROLE_DEVELOPER: Employee.ROLE_TESTER,
+    }.get(role)
 
 
 def validate_no_adjacent_tables(value, employee_instance=None):
+    """
+    Тестировщики и разработчики не могут сидеть за соседними столами.
+
+    Соседи берутся из графа WorkstationNeighbour (workstations/layout.py):
+    один индексированный запрос по рёбрам стола и Employee.role.
+    """
     # Используем строковые ссылки на модели
     Workstation = apps.get_model("workstations", "Workstation")
+    WorkstationNeighbour = apps.get_model("workstations", "WorkstationNeighbour")
     Employee = apps.get_model("employees", "Employee")
 
-    if not value:  # Если workstation не установлен
+    if not value or employee_instance is None:
         return
 
-    # Получаем номер стола из workstation
-    table_number = None
-
-    if isinstance(value, int):
-        try:
-            workstation = Workstation.objects.get(id=value)
-            table_number = workstation.table_number
-        except Workstation.DoesNotExist:
-            return
-    else:
-        # Если value - это объект Workstation
-        table_number = value.table_number
-
-    # Проверяем, что номер стола существует и является числом
-    if not table_number:
+    opposite_role = conflicting_role(classify_position(employee_instance.position))
+    if opposite_role is None:
         return
 
-    # Преобразуем table_number в число (если оно хранится как строка)
-    try:
-        table_number_int = int(table_number)
-    except (ValueError, TypeError):
-        return  # Если номер стола не является числом, пропускаем проверку
-
-    # Получаем текущего сотрудника
-    if not hasattr(validate_no_adjacent_tables, "_current_instance"):
-        return
+    workstation_id = value if isinstance(value, int) else value.pk
+    neighbours = Employee.objects.filter(
+        role=opposite_role,
+        workstation__in=WorkstationNeighbour.objects.filter(
+            workstation_id=workstation_id
+        ).values("neighbour_id"),
+    ).select_related("workstation")
+    if employee_instance.pk:
+        neighbours = neighbours.exclude(pk=employee_instance.pk)
+
+    emp = neighbours.first()
+    if emp is not None:
+        if isinstance(value, int):
+            value = Workstation.objects.only("table_number").get(id=value)
+        raise ValidationError(
+            f"Тестировщики и разработчики не могут сидеть за соседними столами. "
+            f"Стол {value.table_number} соседствует со столом "
+            f"{emp.workstation.table_number} "
+            f"(сотрудник: {emp.first_name} {emp.last_name}, должность: {emp.position})"
+        )
 
-    current_employee = validate_no_adjacent_tables._current_instance
 
-    # Получаем всех сотрудников за соседними столами
-    adjacent_tables = [table_number_int - 1, table_number_int + 1]
+# Границы интервалов стажа в годах: до 1 года, 1–3, 3–5, 5–10, 10 и больше
+TENURE_BUCKETS = (1, 3, 5, 10)
 
-    # Находим рабочие места с соседними столами
-    adjacent_workstations = Workstation.objects.filter(
-        table_number__in=[str(t) for t in adjacent_tables]
-    )
 
-    # Получаем сотрудников на соседних рабочих местах
-    adjacent_employees = Employee.objects.filter(workstation__in=adjacent_workstations)
+def years_ago(today, years):
+    """Дата на years лет раньше today (29 февраля -> 28 февраля)"""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+
+def tenure_label(min_years, max_years):
+    if min_years == 0:
+        return f"до {max_years} г."
+    if max_years is None:
+        return f"от {min_years} лет"
+    return f"{min_years}–{max_years} г."
+
+
+def tenure_histogram(counts, bounds=TENURE_BUCKETS):
+    """
+    Интервалы стажа по {номер интервала: число}: список словарей
+    min_years, max_years, label, count.
+    """
+    edges = [0, *bounds, None]
+    return [
+        {
+            "min_years": edges[i],
+            "max_years": edges[i + 1],
+            "label": tenure_label(edges[i], edges[i + 1]),
+            "count": counts.get(i, 0),
+        }
+        for i in range(len(bounds) + 1)
+    ]
 
-    # Проверяем, есть ли среди соседей тестировщики или разработчики
-    for emp in adjacent_employees:
-        if (
-            emp == current_employee or not emp.workstation
-        ):  # Пропускаем текущего сотрудника и без рабочего места
-            continue
 
-        # Получаем номер стола соседнего сотрудника
-        emp_table_number = emp.workstation.table_number
+class EmployeeQuerySet(models.QuerySet):
+    """
+    Стаж в запросе. Фильтры, сортировка и интервалы стажа выражены через
+    hire_date, поэтому используют индекс employee_hire_date_idx; сам стаж
+    (timedelta) — аннотация tenure.
+    """
 
-        is_tester = (
-            "тестировщик" in emp.position.lower() or "tester" in emp.position.lower()
-        )
-        is_developer = any(
-            word in emp.position.lower()
-            for word in ["разработчик", "developer", "backend", "frontend"]
+    def with_tenure(self, today=None):
+        today = today or timezone.localdate()
+        return self.annotate(
+            tenure=ExpressionWrapper(
+                Value(today, output_field=DateField()) - F("hire_date"),
+                output_field=DurationField(),
+            )
         )
 
-        current_is_tester = (
-            "тестировщик" in current_employee.position.lower()
-            or "tester" in current_employee.position.lower()
+    def tenure_between(self, min_years=None, max_years=None, today=None):
+        """Стаж не меньше min_years и меньше max_years лет"""
+        today = today or timezone.localdate()
+        queryset = self
+        if min_years is not None:
+            queryset = queryset.filter(hire_date__lte=years_ago(today, min_years))
+        if max_years is not None:
+            queryset = queryset.filter(hire_date__gt=years_ago(today, max_years))
+        return queryset
+
+    def order_by_tenure(self, descending=False):
+        if descending:
+            return self.order_by("hire_date", "id")
+        return self.order_by("-hire_date", "-id")
+
+    def tenure_bucket_counts(self, bounds=TENURE_BUCKETS, today=None):
+        """Пары (номер интервала стажа, число сотрудников) одним GROUP BY"""
+        today = today or timezone.localdate()
+        bucket = Case(
+            *(
+                When(hire_date__gt=years_ago(today, years), then=Value(i))
+                for i, years in enumerate(bounds)
+            ),
+            default=Value(len(bounds)),
         )
-        current_is_developer = any(
-            word in current_employee.position.lower()
-            for word in ["разработчик", "developer", "backend", "frontend"]
+        return (
+            self.order_by()
+            .annotate(tenure_bucket=bucket)
+            .values_list("tenure_bucket")
+            .annotate(count=Count("pk"))
         )
 
-        if (is_tester and current_is_developer) or (is_developer and current_is_tester):
-            raise ValidationError(
-                f"Тестировщики и разработчики не могут сидеть за соседними столами. "
-                f"Стол {table_number} соседствует со столом {emp_table_number} "
-                f"(сотрудник: {emp.first_name} {emp.last_name}, должность: {emp.position})"
-            )
+    def tenure_histogram(self, bounds=TENURE_BUCKETS, today=None):
+        return tenure_histogram(dict(self.tenure_bucket_counts(bounds, today)), bounds)
+
+    async def atenure_histogram(self, bounds=TENURE_BUCKETS, today=None):
+        counts = {
+            bucket: count
+            async for bucket, count in self.tenure_bucket_counts(bounds, today)
+        }
+        return tenure_histogram(counts, bounds)
 
 
 class Employee(models.Model):
@@ -96,6 +184,15 @@ class Employee(models.Model):
         ("F", "Женский"),
     ]
 
+    ROLE_TESTER = "tester"
+    ROLE_DEVELOPER = "developer"
+    ROLE_OTHER = "other"
+    ROLE_CHOICES = [
+        (ROLE_TESTER, "Тестировщик"),
+        (ROLE_DEVELOPER, "Разработчик"),
+        (ROLE_OTHER, "Другое"),
+    ]
+
     first_name = models.CharField(max_length=100, verbose_name="Имя")
     last_name = models.CharField(max_length=100, verbose_name="Фамилия")
     middle_name = models.CharField(
@@ -104,6 +201,15 @@ class Employee(models.Model):
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, verbose_name="Пол")
     email = models.EmailField(verbose_name="Email", unique=True)
     position = models.CharField(max_length=200, verbose_name="Должность")
+    # Категория роли вычисляется из position при сохранении
+    role = models.CharField(
+        max_length=20,
+        choices=ROLE_CHOICES,
+        default=ROLE_OTHER,
+        editable=False,
+        db_index=True,
+        verbose_name="Роль",
+    )
     hire_date = models.DateField(
         verbose_name="Дата приема на работу", default=timezone.now
     )
@@ -115,39 +221,62 @@ class Employee(models.Model):
         verbose_name="Рабочее место",
     )
     description = models.TextField(verbose_name="Описание", blank=True)
+    # Версия для кеша фрагментов, увеличивается сигналами (fragments.py)
+    cache_version = models.PositiveIntegerField(default=0, editable=False)
+    # Время изменения сотрудника или связанных данных (ETag в api.py)
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name="Изменён"
+    )
+
+    objects = EmployeeQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Сотрудник"
         verbose_name_plural = "Сотрудники"
         ordering = ["last_name", "first_name"]
+        indexes = [
+            # Ключ курсорной пагинации списка сотрудников
+            models.Index(
+                fields=["last_name", "first_name", "id"],
+                name="employee_name_keyset_idx",
+            ),
+            # Фильтры и сортировка по стажу, последние принятые на главной
+            models.Index(fields=["hire_date", "id"], name="employee_hire_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.last_name} {self.first_name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Состояние из базы для инкрементальных счётчиков (counters.py)
+        if {"role", "workstation_id"} <= instance.__dict__.keys():
+            instance._counter_state = (instance.role, instance.workstation_id)
+        return instance
+
     def clean(self):
         """Валидация при сохранении"""
         super().clean()
-
-        # Сохраняем текущий экземпляр для использования в валидаторе
-        validate_no_adjacent_tables._current_instance = self
+        self.role = classify_position(self.position)
 
         # Валидируем workstation
         if self.workstation:
-            validate_no_adjacent_tables(self.workstation)
+            validate_no_adjacent_tables(self.workstation, self)
 
     def save(self, *args, **kwargs):
         """Переопределяем save для обязательной валидации"""
+        self.role = classify_position(self.position)
         # Валидируем перед сохранением
         self.full_clean()
         super().save(*args, **kwargs)
 
-        # Очищаем временную переменную
-        if hasattr(validate_no_adjacent_tables, "_current_instance"):
-            delattr(validate_no_adjacent_tables, "_current_instance")
-
     @property
     def work_experience_days(self):
-        """Стаж работы в днях"""
+        """Стаж работы в днях (из аннотации with_tenure, если она есть)"""
+        tenure = self.__dict__.get("tenure")
+        if tenure is not None:
+            return tenure.days
         if self.hire_date:
             return (timezone.now().date() - self.hire_date).days
         return 0
@@ -164,6 +293,9 @@ class Employee(models.Model):
 class Skill(models.Model):
     name = models.CharField(max_length=100, verbose_name="Навык")
     description = models.TextField(verbose_name="Описание навыка", blank=True)
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name="Изменён"
+    )
 
     class Meta:
         verbose_name = "Навык"
@@ -195,33 +327,182 @@ class EmployeeSkill(models.Model):
     def __str__(self):
         return f"{self.employee} - {self.skill} ({self.get_level_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Состояние из базы для индекса навыков (skill_index.py)
+        if {"employee_id", "skill_id"} <= instance.__dict__.keys():
+            instance._index_state = (instance.employee_id, instance.skill_id)
+        return instance
+
+
+class DirectoryCounter(models.Model):
+    """Счётчик справочника, см. counters.py"""
+
+    name = models.CharField(max_length=255, unique=True, verbose_name="Счётчик")
+    value = models.BigIntegerField(default=0, verbose_name="Значение")
+
+    class Meta:
+        verbose_name = "Счётчик справочника"
+        verbose_name_plural = "Счётчики справочника"
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class MediaFileManager(models.Manager):
+    def acquire(self, name):
+        """Добавляет ссылку на файл"""
+        if self.filter(name=name).update(refs=F("refs") + 1, orphaned_at=None):
+            return
+        try:
+            with transaction.atomic():
+                self.create(name=name, refs=1)
+        except IntegrityError:
+            self.filter(name=name).update(refs=F("refs") + 1, orphaned_at=None)
+
+    def release(self, name):
+        """Убирает ссылку; файл без ссылок удалит сборщик collect_orphans"""
+        self.filter(name=name).update(refs=F("refs") - 1)
+        self.filter(name=name, refs__lte=0, orphaned_at__isnull=True).update(
+            orphaned_at=timezone.now()
+        )
+
+
+class MediaFile(models.Model):
+    """Файл хранилища с подсчётом ссылок из EmployeeImage"""
+
+    name = models.CharField(max_length=255, unique=True, verbose_name="Файл")
+    refs = models.IntegerField(default=0, verbose_name="Число ссылок")
+    orphaned_at = models.DateTimeField(
+        null=True, blank=True, db_index=True, verbose_name="Без ссылок с"
+    )
+
+    objects = MediaFileManager()
+
+    class Meta:
+        verbose_name = "Файл хранилища"
+        verbose_name_plural = "Файлы хранилища"
+
+    def __str__(self):
+        return f"{self.name} ({self.refs})"
+
 
 class EmployeeImage(models.Model):
     employee = models.ForeignKey(
         Employee,
         on_delete=models.CASCADE,
         related_name="images",
+        # Покрывается индексом employee_image_order_idx
+        db_index=False,
         verbose_name="Сотрудник",
     )
     image = models.ImageField(
-        upload_to="employees/%Y/%m/%d/", verbose_name="Изображение"
+        upload_to="employees/%Y/%m/%d/",
+        storage=employee_media_storage,
+        db_index=True,
+        verbose_name="Изображение",
     )
     order = models.PositiveIntegerField(default=0, verbose_name="Порядковый номер")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    # Размеры оригинала и уменьшенные копии (JPEG/PNG + WebP), см. imaging.py
+    width = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Ширина"
+    )
+    height = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Высота"
+    )
+    variants = models.JSONField(
+        default=dict, blank=True, editable=False, verbose_name="Копии изображения"
+    )
 
     class Meta:
         verbose_name = "Изображение сотрудника"
         verbose_name_plural = "Изображения сотрудников"
         ordering = ["employee", "order", "created_at"]
+        indexes = [
+            models.Index(
+                fields=["employee", "order", "created_at"],
+                name="employee_image_order_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Изображение {self.order} для {self.employee}"
 
-    def delete(self, *args, **kwargs):
-        # Удаляем файл изображения при удалении объекта
-        if self.image and os.path.isfile(self.image.path):
-            os.remove(self.image.path)
-        super().delete(*args, **kwargs)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем сохранённый файл, чтобы при замене снять с него ссылку
+        instance._stored_image_name = instance.__dict__.get("image")
+        return instance
+
+    def save(self, *args, **kwargs):
+        stored = getattr(self, "_stored_image_name", None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            name = self.image.name or None
+            if name != stored:
+                if name:
+                    MediaFile.objects.acquire(name)
+                if stored:
+                    MediaFile.objects.release(stored)
+                self._stored_image_name = name
+
+        if self.image and self.variants.get("source") != self.image.name:
+            # Тот же файл уже обработан для другой записи — копии общие
+            sibling = (
+                EmployeeImage.objects.filter(
+                    image=self.image.name, variants__source=self.image.name
+                )
+                .exclude(pk=self.pk)
+                .values("variants", "width", "height")
+                .first()
+            )
+            if sibling:
+                from .signals import bump_cache_version
+
+                EmployeeImage.objects.filter(pk=self.pk).update(**sibling)
+                bump_cache_version(Employee.objects.filter(pk=self.employee_id))
+                self.variants = sibling["variants"]
+                self.width, self.height = sibling["width"], sibling["height"]
+            else:
+                from .tasks import schedule_variants
+
+                # Копии создаются в фоне после фиксации транзакции
+                transaction.on_commit(
+                    partial(schedule_variants, self.pk, self.image.name)
+                )
+
+    def _variant_url(self, size, key):
+        return self.image.storage.versioned_url(size[key], size.get(f"{key}_version"))
+
+    def _srcset(self, key):
+        return ", ".join(
+            f"{self._variant_url(size, key)} {size['width']}w"
+            for size in self.variants.get("sizes", [])
+        )
+
+    @property
+    def srcset(self):
+        """srcset из копий в исходном формате"""
+        return self._srcset("src")
+
+    @property
+    def webp_srcset(self):
+        """srcset из WebP-копий"""
+        return self._srcset("webp")
+
+    @property
+    def thumbnail_url(self):
+        """Наименьшая копия, подходящая для карточки, или оригинал"""
+        sizes = self.variants.get("sizes", [])
+        for size in sizes:
+            if size["width"] >= 400:
+                return self._variant_url(size, "src")
+        if sizes:
+            return self._variant_url(sizes[-1], "src")
+        return self.image.url
 
     def clean(self):
         # Валидация порядка
@@ -229,3 +510,42 @@ class EmployeeImage(models.Model):
             raise ValidationError(
                 {"order": "Порядковый номер не может быть отрицательным"}
             )
+
+
+class ImageUpload(models.Model):
+    """Загрузка фотографии частями (uploads.py); файл — EMPLOYEE_UPLOAD_DIR/<id>.part"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="uploads",
+        verbose_name="Сотрудник",
+    )
+    filename = models.CharField(max_length=255, verbose_name="Имя файла")
+    size = models.PositiveBigIntegerField(verbose_name="Размер")
+    sha256 = models.CharField(max_length=64, verbose_name="SHA-256")
+    received = models.PositiveBigIntegerField(default=0, verbose_name="Получено байт")
+    image = models.ForeignKey(
+        EmployeeImage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Изображение",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name="Дата изменения"
+    )
+
+    class Meta:
+        verbose_name = "Загрузка фотографии"
+        verbose_name_plural = "Загрузки фотографий"
+
+    def __str__(self):
+        return f"{self.filename}: {self.received} из {self.size}"
+
+    @property
+    def complete(self):
+        return self.image_id is not None
@@ -0,0 +1,211 @@
+"""
+Курсорная (keyset) пагинация и пагинатор с оценкой числа строк для админки.
+
+Вместо OFFSET страница выбирается условием по ключу сортировки последней
+показанной строки, поэтому стоимость любой страницы одинакова и не нужен
+COUNT(*). Ключ сортировки должен быть уникальным (последнее поле — id) и
+поддерживаться составным индексом; поля с «-» сортируются по убыванию.
+"""
+
+import base64
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(values, direction):
+    # Даты и время — строками ISO 8601, их принимают фильтры полей
+    data = json.dumps([direction, *values], ensure_ascii=False, cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, size):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        direction, *values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+    if direction not in ("next", "prev") or len(values) != size:
+        raise InvalidCursor(token)
+    return direction, values
+
+
+def keyset_filter(fields, values, lookup):
+    """
+    Условие (f1, f2, ..., fn) > (v1, v2, ..., vn) для lookup="gt"
+    (или < для "lt"), с ведущим f1 >= v1 для диапазонного чтения индекса.
+    Для полей с «-» сравнение обратное.
+    """
+
+    def compare(field, value, suffix=""):
+        name = field.lstrip("-")
+        op = lookup if name == field else {"gt": "lt", "lt": "gt"}[lookup]
+        return Q(**{f"{name}__{op}{suffix}": value})
+
+    condition = compare(fields[-1], values[-1])
+    for field, value in zip(reversed(fields[:-1]), reversed(values[:-1])):
+        condition = compare(field, value) | (
+            Q(**{field.lstrip("-"): value}) & condition
+        )
+    return compare(fields[0], values[0], "e") & condition
+
+
+class KeysetPage:
+    def __init__(self, paginator, object_list, has_next, has_previous):
+        self.paginator = paginator
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def _cursor(self, obj, direction):
+        return encode_cursor(
+            [getattr(obj, field.lstrip("-")) for field in self.paginator.ordering],
+            direction,
+        )
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return self._cursor(self.object_list[-1], "next")
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return self._cursor(self.object_list[0], "prev")
+        return None
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по возрастающему ключу ordering (поля модели, последнее —
+    уникальное). Общее количество строк считается по запросу и кешируется
+    на count_timeout секунд под ключом count_cache_key.
+    """
+
+    def __init__(
+        self,
+        queryset,
+        per_page,
+        ordering=("id",),
+        count_cache_key=None,
+        count_timeout=60,
+    ):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.count_cache_key = count_cache_key
+        self.count_timeout = count_timeout
+
+    @property
+    def count(self):
+        if self.count_cache_key is None:
+            return self.queryset.count()
+        return cache.get_or_set(
+            self.count_cache_key, self.queryset.count, self.count_timeout
+        )
+
+    def page(self, cursor=None):
+        queryset, direction = self.page_queryset(cursor)
+        return self.make_page(list(queryset), direction, cursor)
+
+    async def apage(self, cursor=None):
+        """page() для асинхронных представлений"""
+        queryset, direction = self.page_queryset(cursor)
+        return self.make_page([obj async for obj in queryset], direction, cursor)
+
+    def page_queryset(self, cursor):
+        queryset = self.queryset.order_by(*self.ordering)
+        direction = "next"
+        if cursor:
+            direction, values = decode_cursor(cursor, len(self.ordering))
+            values = self.clean_values(values)
+            lookup = "gt" if direction == "next" else "lt"
+            queryset = queryset.filter(keyset_filter(self.ordering, values, lookup))
+        if direction == "prev":
+            queryset = queryset.reverse()
+        return queryset[: self.per_page + 1], direction
+
+    def make_page(self, rows, direction, cursor):
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if direction == "prev":
+            rows.reverse()
+            return KeysetPage(self, rows, has_next=True, has_previous=has_more)
+        return KeysetPage(self, rows, has_next=has_more, has_previous=bool(cursor))
+
+    def clean_values(self, values):
+        """Значения курсора в типах полей; подделанный курсор — InvalidCursor"""
+        opts = self.queryset.model._meta
+        try:
+            return [
+                opts.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValidationError, ValueError, TypeError) as e:
+            raise InvalidCursor(str(e))
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator списков админки для больших таблиц.
+
+    Без фильтров число строк оценивается по max(pk) — поиск по первичному
+    ключу вместо COUNT(*) по всей таблице; пока оценка не больше
+    count_limit, строки считаются точно. Удалённые строки завышают оценку,
+    и последние страницы могут оказаться пустыми: вместо пустой страницы
+    показывается последняя по точному числу строк.
+
+    С фильтрами или поиском считается точно, но не дальше count_limit
+    строк: в отфильтрованном списке доступны первые count_limit строк
+    (100 страниц по 100 в админке), остальные — только уточнением фильтра.
+    """
+
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, "query"):
+            return super().count
+        if not queryset.query.where:
+            # Без аннотаций списка: SQLite находит MAX(id) по индексу
+            manager = queryset.model._default_manager.using(queryset.db)
+            estimate = manager.aggregate(last=Max("pk"))["last"] or 0
+            if estimate > self.count_limit:
+                return estimate
+        return queryset.order_by().values("pk")[: self.count_limit].count()
+
+    def page(self, number):
+        page = super().page(number)
+        if page.number == 1 or page.object_list:
+            return page
+        # Страница за концом таблицы из-за завышенной оценки
+        self.__dict__["count"] = self.object_list.order_by().count()
+        for name in ("num_pages", "page_range"):
+            self.__dict__.pop(name, None)
+        return super().page(self.num_pages)
@@ -0,0 +1,223 @@
+"""
+Полнотекстовый поиск сотрудников на SQLite FTS5.
+
+Виртуальная таблица employees_employee_fts хранит по строке на сотрудника
+(rowid = id): ФИО, email, должность, описание и названия навыков.
+Токенизатор unicode61 приводит русские и английские слова к нижнему
+регистру, «ё» заменяется на «е» при индексации и в запросе. Каждое слово
+запроса ищется по префиксу, результаты сортируются по bm25. Таблица
+обновляется сигналами (signals.py), массовые операции вызывают
+index_employees() или rebuild_index(). На других СУБД поиск выполняется
+через icontains.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Employee
+
+FTS_TABLE = "employees_employee_fts"
+FTS_COLUMNS = [
+    "last_name",
+    "first_name",
+    "middle_name",
+    "email",
+    "position",
+    "description",
+    "skills",
+]
+# Веса bm25 в порядке FTS_COLUMNS
+FTS_WEIGHTS = (10.0, 6.0, 2.0, 4.0, 4.0, 1.0, 3.0)
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    + ", ".join(FTS_COLUMNS)
+    + ", tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+DROP_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fold(value):
+    return value.replace("ё", "е").replace("Ё", "Е")
+
+
+def _fold_sql(expression):
+    return f"replace(replace(coalesce({expression}, ''), 'ё', 'е'), 'Ё', 'Е')"
+
+
+SOURCE_SQL = (
+    "SELECT e.id, "
+    + ", ".join(_fold_sql(f"e.{column}") for column in FTS_COLUMNS[:-1])
+    + ", "
+    + _fold_sql(
+        "(SELECT group_concat(s.name, ' ') FROM employees_employeeskill es "
+        "JOIN employees_skill s ON s.id = es.skill_id WHERE es.employee_id = e.id)"
+    )
+    + " FROM employees_employee e"
+)
+INSERT_SQL = f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+
+
+def search_available(using=connection):
+    return using.vendor == "sqlite"
+
+
+def _chunks(ids, size=500):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def index_employees(ids):
+    """Переиндексирует сотрудников с указанными id (удалённые — убирает)"""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(ids):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk
+            )
+            cursor.execute(
+                INSERT_SQL + SOURCE_SQL + f" WHERE e.id IN ({placeholders})", chunk
+            )
+
+
+def index_skill_holders(skill_id):
+    """Переиндексирует сотрудников, у которых есть навык skill_id"""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        holders = "SELECT employee_id FROM employees_employeeskill WHERE skill_id = %s"
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({holders})", [skill_id]
+        )
+        cursor.execute(
+            INSERT_SQL + SOURCE_SQL + f" WHERE e.id IN ({holders})", [skill_id]
+        )
+
+
+def remove_employees(ids):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(ids):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk
+            )
+
+
+def rebuild_index(using=connection):
+    """Полностью перестраивает индекс; возвращает число строк"""
+    if not search_available(using):
+        return 0
+    with using.cursor() as cursor:
+        cursor.execute(CREATE_SQL)
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(INSERT_SQL + SOURCE_SQL)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def parse_query(query):
+    """Слова запроса (не более 10) в нормализованном виде"""
+    return [fold(word.lower()) for word in WORD_RE.findall(query or "")][:10]
+
+
+def match_expression(words):
+    """Выражение MATCH: все слова, каждое как префикс ("иван"* AND ...)"""
+    return " AND ".join(f'"{word}"*' for word in words)
+
+
+class SearchResults:
+    """
+    Ранжированные результаты поиска для Paginator: count() и срезы,
+    возвращающие сотрудников в порядке релевантности. queryset задаёт
+    загрузку найденных строк (select_related и т. п.), а не фильтр.
+    """
+
+    def __init__(self, query, queryset=None):
+        self.words = parse_query(query)
+        self.queryset = queryset if queryset is not None else Employee.objects.all()
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if not self.words:
+                self._count = 0
+            elif search_available():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                        [match_expression(self.words)],
+                    )
+                    self._count = cursor.fetchone()[0]
+            else:
+                self._count = self._fallback().count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def ids(self, offset, limit):
+        if not self.words:
+            return []
+        if not search_available():
+            return list(
+                self._fallback()
+                .order_by("last_name", "first_name", "id")
+                .values_list("id", flat=True)[offset : offset + limit]
+            )
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, {weights}), rowid LIMIT %s OFFSET %s",
+                [match_expression(self.words), limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def id_subquery(self):
+        """Подзапрос id найденных сотрудников для filter(pk__in=...)"""
+        if not self.words:
+            return []
+        if not search_available():
+            return self._fallback().values("id")
+        return RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            [match_expression(self.words)],
+        )
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key : key + 1][0]
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        ids = self.ids(start, max(0, stop - start))
+        employees = self.queryset.in_bulk(ids)
+        return [employees[pk] for pk in ids if pk in employees]
+
+    def _fallback(self):
+        queryset = self.queryset
+        for word in self.words:
+            queryset = queryset.filter(
+                Q(last_name__icontains=word)
+                | Q(first_name__icontains=word)
+                | Q(middle_name__icontains=word)
+                | Q(email__icontains=word)
+                | Q(position__icontains=word)
+                | Q(description__icontains=word)
+                | Q(employeeskill__skill__name__icontains=word)
+            )
+        return queryset.distinct()
+
+
+def search_employees(query, queryset=None):
+    return SearchResults(query, queryset)
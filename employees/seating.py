@@ -0,0 +1,319 @@
+"""
+Массовая рассадка сотрудников по рабочим местам.
+
+Столы рассматриваются как граф соседства (WorkstationNeighbour, см.
+workstations/layout.py), а правило «тестировщик не сидит рядом
+с разработчиком» — как ограничение раскраски: вершины-столы раскрашиваются
+ролями так, чтобы между «tester» и «developer» не было рёбер. Роль «other»
+и пустой стол совместимы с любым соседом и служат буфером между группами.
+
+Сначала пробуется жадное заполнение компонент в двух порядках ролей; если
+оно не справилось (например, буферный стол нужен внутри компоненты),
+выполняется перебор с возвратом, ограниченный SEARCH_LIMIT шагами.
+"""
+
+from collections import defaultdict, deque
+from itertools import accumulate
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from workstations.layout import neighbour_map
+from workstations.models import WorkstationNeighbour
+
+from .counters import apply_deltas, seating_deltas
+from .models import Employee, conflicting_role
+
+# Предел шагов перебора с возвратом в SeatingSolver.search
+SEARCH_LIMIT = 200_000
+
+
+class SeatingSolver:
+    """
+    Решатель ограничения соседства для набора свободных столов.
+
+    desks — id столов в порядке заполнения, people — список пар
+    (id сотрудника, роль), neighbours — словарь id стола -> id соседних
+    столов (в том числе вне набора), fixed_roles — словарь id стола ->
+    множество ролей сотрудников, которые остаются на своих местах рядом
+    с рассаживаемыми.
+    """
+
+    def __init__(self, desks, people, neighbours, fixed_roles=None):
+        self.desks = list(desks)
+        self.people = list(people)
+        self.graph = neighbours
+        self.fixed_roles = fixed_roles or {}
+        self.desk_set = set(self.desks)
+
+    def neighbours(self, desk_id):
+        for neighbour in self.graph.get(desk_id, ()):
+            if neighbour in self.desk_set:
+                yield neighbour
+
+    def components(self):
+        """Связные компоненты графа столов, каждая — в порядке обхода в ширину"""
+        seen = set()
+        result = []
+        for desk_id in self.desks:
+            if desk_id in seen:
+                continue
+            seen.add(desk_id)
+            component = []
+            queue = deque([desk_id])
+            while queue:
+                current = queue.popleft()
+                component.append(current)
+                for neighbour in self.neighbours(current):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        queue.append(neighbour)
+            result.append(component)
+        return result
+
+    def allowed(self, desk_id, role, colouring):
+        """Можно ли посадить сотрудника с ролью role за стол desk_id"""
+        opposite = conflicting_role(role)
+        if opposite is None:
+            return True
+        for neighbour in self.graph.get(desk_id, ()):
+            if opposite in self.fixed_roles.get(neighbour, ()):
+                return False
+        return all(colouring.get(n) != opposite for n in self.neighbours(desk_id))
+
+    def place(self, role, count, components, colouring):
+        """
+        Занимает count столов ролью role, заполняя компоненты подряд, чтобы
+        граница с другой ролью (и число буферных столов) была минимальной.
+        """
+        if not count:
+            return True
+        free = [
+            [desk_id for desk_id in component if desk_id not in colouring]
+            for component in components
+        ]
+        # Сначала самая маленькая компонента, вмещающая всю группу целиком,
+        # затем остальные по убыванию размера
+        order = sorted(range(len(free)), key=lambda i: -len(free[i]))
+        fitting = [i for i in order if len(free[i]) >= count]
+        if fitting:
+            best = min(fitting, key=lambda i: len(free[i]))
+            order.remove(best)
+            order.insert(0, best)
+
+        placed = 0
+        for i in order:
+            for desk_id in free[i]:
+                if self.allowed(desk_id, role, colouring):
+                    colouring[desk_id] = role
+                    placed += 1
+                    if placed == count:
+                        return True
+        return False
+
+    def colour(self, role_order):
+        counts = defaultdict(int)
+        for _, role in self.people:
+            counts[role] += 1
+        components = self.components()
+        colouring = {}
+        for role in role_order:
+            if not self.place(role, counts[role], components, colouring):
+                return None
+        return colouring
+
+    def search(self, counts, limit=SEARCH_LIMIT):
+        """
+        Перебор с возвратом: столы тестировщиков и разработчиков без общих
+        рёбер. Возвращает раскраску, None, если рассадки нет, или бросает
+        ValidationError, если перебор превысил limit шагов.
+        """
+        roles = (Employee.ROLE_TESTER, Employee.ROLE_DEVELOPER)
+        order = [desk_id for component in self.components() for desk_id in component]
+        total = len(order)
+        # left[role][i] — сколько столов начиная с позиции i допускают роль
+        # с учётом фиксированных соседей
+        left = {}
+        for role in roles:
+            fits = [self.allowed(desk_id, role, {}) for desk_id in reversed(order)]
+            left[role] = list(accumulate(fits, initial=0))[::-1]
+        need = {role: counts[role] for role in roles}
+        colouring = {}
+
+        def options(i):
+            if total - i < sum(need.values()) or any(
+                left[role][i] < need[role] for role in roles
+            ):
+                return []
+            result = [
+                role
+                for role in roles
+                if need[role] and self.allowed(order[i], role, colouring)
+            ]
+            if total - i - 1 >= sum(need.values()):
+                result.append(None)
+            return result
+
+        stack = []
+        i, pending, steps = 0, options(0), 0
+        while any(need.values()):
+            if not pending:
+                if not stack:
+                    return None
+                i, pending = stack.pop()
+                role = colouring.pop(order[i], None)
+                if role:
+                    need[role] += 1
+                continue
+            steps += 1
+            if steps > limit:
+                raise ValidationError(
+                    f"Рассадка не найдена за {limit} шагов перебора; "
+                    "уменьшите набор столов или сотрудников"
+                )
+            choice = pending.pop(0)
+            stack.append((i, pending))
+            if choice:
+                colouring[order[i]] = choice
+                need[choice] -= 1
+            i += 1
+            pending = options(i)
+
+        # Роль «other» совместима с любым соседом — на оставшиеся столы
+        others = counts[Employee.ROLE_OTHER]
+        for desk_id in self.desks:
+            if not others:
+                break
+            if desk_id not in colouring:
+                colouring[desk_id] = Employee.ROLE_OTHER
+                others -= 1
+        return colouring
+
+    def solve(self):
+        """Словарь id сотрудника -> id стола; ValidationError, если рассадки нет"""
+        if len(self.people) > len(self.desks):
+            raise ValidationError(
+                f"Недостаточно рабочих мест: сотрудников {len(self.people)}, "
+                f"свободных столов {len(self.desks)}"
+            )
+
+        colouring = None
+        for role_order in (
+            (Employee.ROLE_TESTER, Employee.ROLE_DEVELOPER, Employee.ROLE_OTHER),
+            (Employee.ROLE_DEVELOPER, Employee.ROLE_TESTER, Employee.ROLE_OTHER),
+        ):
+            colouring = self.colour(role_order)
+            if colouring is not None:
+                break
+        if colouring is None:
+            counts = defaultdict(int)
+            for _, role in self.people:
+                counts[role] += 1
+            colouring = self.search(counts)
+        if colouring is None:
+            raise ValidationError(
+                "Рассадка невозможна: тестировщики и разработчики оказались бы "
+                "за соседними столами при любом размещении"
+            )
+
+        desks_by_role = defaultdict(list)
+        for desk_id in self.desks:
+            if desk_id in colouring:
+                desks_by_role[colouring[desk_id]].append(desk_id)
+        for desks in desks_by_role.values():
+            desks.reverse()
+
+        return {
+            employee_id: desks_by_role[role].pop() for employee_id, role in self.people
+        }
+
+
+def plan_seating(employees, workstations):
+    """
+    Рассчитывает рассадку employees по workstations без записи в базу.
+
+    Занятые другими сотрудниками и неактивные столы пропускаются; сотрудники
+    за соседними столами, не входящие в набор, учитываются как фиксированные.
+    Возвращает словарь id сотрудника -> id рабочего места.
+    """
+    if hasattr(employees, "values"):
+        employee_ids = employees.values("pk")
+        employees = list(employees)
+    else:
+        employees = list(employees)
+        employee_ids = [employee.pk for employee in employees]
+    outsiders = Employee.objects.exclude(pk__in=employee_ids)
+
+    workstations = workstations.filter(is_active=True).exclude(
+        pk__in=outsiders.filter(workstation__isnull=False).values("workstation")
+    )
+    # Порядок заполнения — по плану этажа, затем по номеру стола
+    desks = workstations.order_by(
+        "location", "floor_plan", "y", "x", "table_index", "id"
+    ).values_list("id", flat=True)
+
+    fixed_roles = defaultdict(set)
+    for workstation_id, role in (
+        outsiders.filter(
+            workstation__in=WorkstationNeighbour.objects.filter(
+                workstation__in=workstations.values("id")
+            ).values("neighbour_id")
+        )
+        .exclude(role=Employee.ROLE_OTHER)
+        .order_by()
+        .values_list("workstation_id", "role")
+    ):
+        fixed_roles[workstation_id].add(role)
+
+    solver = SeatingSolver(
+        desks,
+        [(employee.pk, employee.role) for employee in employees],
+        neighbour_map(workstations),
+        fixed_roles,
+    )
+    return solver.solve()
+
+
+def apply_seating(assignment, batch_size=1000):
+    """Записывает рассадку одним bulk_update в транзакции"""
+    # bulk_update не заполняет auto_now
+    now = timezone.now()
+    employees = [
+        Employee(
+            pk=employee_id,
+            workstation_id=workstation_id,
+            cache_version=F("cache_version") + 1,
+            updated_at=now,
+        )
+        for employee_id, workstation_id in assignment.items()
+    ]
+    with transaction.atomic():
+        Employee.objects.bulk_update(
+            employees,
+            ["workstation", "cache_version", "updated_at"],
+            batch_size=batch_size,
+        )
+    return len(employees)
+
+
+def current_seats(employees):
+    """{id сотрудника: id стола или None}"""
+    if hasattr(employees, "values_list"):
+        return dict(employees.order_by().values_list("pk", "workstation_id"))
+    return {employee.pk: employee.workstation_id for employee in employees}
+
+
+def reseat(employees, workstations, dry_run=False):
+    """
+    Рассчитывает и применяет рассадку в одной транзакции; счётчики
+    меняются только для затронутых столов и местоположений
+    """
+    with transaction.atomic():
+        assignment = plan_seating(employees, workstations)
+        if not dry_run:
+            deltas = seating_deltas(current_seats(employees), assignment)
+            apply_seating(assignment)
+            apply_deltas(deltas)
+    return assignment
@@ -0,0 +1,144 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from workstations.models import Workstation
+
+from . import counters, search, skill_index
+from .fragments import delete_fragments
+from .models import Employee, EmployeeImage, EmployeeSkill, MediaFile, Skill
+
+
+@receiver(post_delete, sender=EmployeeImage)
+def release_image_file(sender, instance, **kwargs):
+    # Срабатывает и при каскадном удалении сотрудника; сам файл удалит
+    # сборщик collect_media, когда на него не останется ссылок
+    if instance.image:
+        MediaFile.objects.release(instance.image.name)
+
+
+# Версии кеша фрагментов
+
+
+def bump_cache_version(queryset):
+    # updated_at тоже: представление сотрудника в API включает связанные данные
+    queryset.update(cache_version=F("cache_version") + 1, updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Employee)
+def bump_employee_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.cache_version = (instance.cache_version or 0) + 1
+
+
+@receiver(post_delete, sender=Employee)
+def drop_employee_fragments(sender, instance, **kwargs):
+    delete_fragments(instance)
+
+
+@receiver(post_save, sender=EmployeeImage)
+@receiver(post_delete, sender=EmployeeImage)
+@receiver(post_save, sender=EmployeeSkill)
+@receiver(post_delete, sender=EmployeeSkill)
+def bump_owner_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_cache_version(Employee.objects.filter(pk=instance.employee_id))
+
+
+# pre_delete: после удаления связи (каскад или SET_NULL) уже не найти
+
+
+@receiver(post_save, sender=Skill)
+@receiver(pre_delete, sender=Skill)
+def bump_skill_holders_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_cache_version(Employee.objects.filter(employeeskill__skill=instance))
+
+
+@receiver(post_save, sender=Workstation)
+@receiver(pre_delete, sender=Workstation)
+def bump_workstation_occupants_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_cache_version(Employee.objects.filter(workstation=instance))
+
+
+# Счётчики справочника
+
+
+@receiver(post_save, sender=Employee)
+def count_employee_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        counters.employee_saved(instance, created)
+
+
+@receiver(post_delete, sender=Employee)
+def count_employee_deleted(sender, instance, **kwargs):
+    counters.employee_deleted(instance)
+
+
+@receiver(post_save, sender=Workstation)
+def count_workstation_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        counters.workstation_saved(instance, created)
+
+
+@receiver(pre_delete, sender=Workstation)
+def count_workstation_deleting(sender, instance, **kwargs):
+    counters.workstation_deleting(instance)
+
+
+# Полнотекстовый поиск
+
+
+@receiver(post_save, sender=Employee)
+def index_employee(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_employees([instance.pk])
+
+
+@receiver(post_delete, sender=Employee)
+def unindex_employee(sender, instance, **kwargs):
+    search.remove_employees([instance.pk])
+
+
+@receiver(post_save, sender=EmployeeSkill)
+@receiver(post_delete, sender=EmployeeSkill)
+def index_skill_owner(sender, instance, raw=False, **kwargs):
+    # При удалении навыка каскадно удаляются и связи — их сигналы
+    # переиндексируют владельцев
+    if not raw:
+        search.index_employees([instance.employee_id])
+
+
+@receiver(post_save, sender=Skill)
+def index_skill_holders(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_skill_holders(instance.pk)
+
+
+# Индекс навыков
+
+
+@receiver(post_save, sender=EmployeeSkill)
+def index_employee_skill(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    state = (instance.employee_id, instance.skill_id)
+    old = None if created else getattr(instance, "_index_state", None)
+    if old is not None and old != state:
+        # В админке у существующей связи можно сменить сотрудника или навык:
+        # бит прежней пары снимается
+        skill_index.employee_skill_changed(*old)
+    skill_index.employee_skill_changed(*state, instance.level)
+    instance._index_state = state
+
+
+@receiver(post_delete, sender=EmployeeSkill)
+def unindex_employee_skill(sender, instance, **kwargs):
+    skill_index.employee_skill_changed(instance.employee_id, instance.skill_id)
+
+
+@receiver(post_delete, sender=Skill)
+def unindex_skill(sender, instance, **kwargs):
+    skill_index.skill_deleted(instance.pk)
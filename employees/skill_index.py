@@ -0,0 +1,252 @@
+"""
+Инвертированный индекс навыков в памяти процесса.
+
+Для каждого навыка и уровня хранится битовая карта (целое число Python,
+бит N — сотрудник с id N) сотрудников, владеющих навыком не ниже этого
+уровня. Запросы «Python ≥ Продвинутый И Django ≥ Средний», «любой из» и
+«не менее k из» выполняются операциями над картами, результат — id
+сотрудников для одной выборки через ORM. Фильтр по местоположению — тоже
+карта (location_bitmap), а EmployeeIds отдаёт страницу id, не превращая
+в список всю выборку.
+
+Индекс строится из EmployeeSkill при первом запросе и обновляется
+сигналами после коммита (signals.py). Каждое изменение увеличивает
+поколение в DirectoryCounter; процесс, увидевший чужое поколение,
+перестраивает индекс. Массовые операции без сигналов вызывают
+invalidate().
+"""
+
+import threading
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+
+from .counters import apply_deltas, counter_value
+from .models import Employee, EmployeeSkill, Skill
+
+GENERATION = "skill_index:generation"
+LEVELS = sorted(value for value, _ in EmployeeSkill.LEVEL_CHOICES)
+
+# Позиции единичных битов для каждого значения байта
+BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def iter_bits(bitmap):
+    """id сотрудников из битовой карты по возрастанию"""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        if byte:
+            base = offset * 8
+            for bit in BYTE_BITS[byte]:
+                yield base + bit
+
+
+def to_bitmap(ids):
+    bitmap = 0
+    for pk in ids:
+        bitmap |= 1 << pk
+    return bitmap
+
+
+class EmployeeIds:
+    """
+    Последовательность id из битовой карты для Paginator: длина — число
+    единичных битов, срез перебирает биты только до конца страницы.
+    """
+
+    def __init__(self, bitmap):
+        self.bitmap = bitmap
+
+    def __len__(self):
+        return self.bitmap.bit_count()
+
+    def __iter__(self):
+        return iter_bits(self.bitmap)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(islice(self, *key.indices(len(self))))
+        return next(islice(self, range(len(self))[key], None))
+
+
+class SkillIndex:
+    """Карты at_least[skill_id][level] сотрудников с уровнем навыка ≥ level"""
+
+    def __init__(self, generation=0):
+        self.generation = generation
+        self.at_least = defaultdict(lambda: dict.fromkeys(LEVELS, 0))
+        self.lock = threading.Lock()
+
+    @classmethod
+    def build(cls, generation=0):
+        index = cls(generation)
+        ids = defaultdict(lambda: defaultdict(list))
+        for employee_id, skill_id, level in EmployeeSkill.objects.values_list(
+            "employee_id", "skill_id", "level"
+        ).iterator(chunk_size=10000):
+            ids[skill_id][level].append(employee_id)
+        for skill_id, by_level in ids.items():
+            bitmap = 0
+            # Карта уровня включает все более высокие уровни
+            for level in reversed(LEVELS):
+                bitmap |= to_bitmap(by_level.get(level, ()))
+                index.at_least[skill_id][level] = bitmap
+        return index
+
+    def set_level(self, employee_id, skill_id, level=None):
+        """Уровень навыка сотрудника; level=None — навык удалён"""
+        bit = 1 << employee_id
+        with self.lock:
+            maps = self.at_least[skill_id]
+            for value in LEVELS:
+                if level is not None and value <= level:
+                    maps[value] |= bit
+                else:
+                    maps[value] &= ~bit
+
+    def remove_skill(self, skill_id):
+        with self.lock:
+            self.at_least.pop(skill_id, None)
+
+    def skill_bitmap(self, skill_ids, min_level=1):
+        """Сотрудники, у которых есть любой из skill_ids не ниже min_level"""
+        bitmap = 0
+        for skill_id in skill_ids:
+            maps = self.at_least.get(skill_id)
+            if maps:
+                bitmap |= maps[max(min_level, LEVELS[0])]
+        return bitmap
+
+    def query(self, all_of=(), any_of=(), min_match=1):
+        """
+        Битовая карта сотрудников по условиям (skill_ids, min_level):
+        all_of — все условия, any_of — не менее min_match условий.
+        """
+        result = None
+        for skill_ids, level in all_of:
+            bitmap = self.skill_bitmap(skill_ids, level)
+            result = bitmap if result is None else result & bitmap
+            if not result:
+                return 0
+
+        if any_of:
+            min_match = max(1, min(min_match, len(any_of)))
+            # matched[j] — сотрудники, выполнившие не менее j условий
+            matched = [-1] + [0] * min_match
+            for skill_ids, level in any_of:
+                bitmap = self.skill_bitmap(skill_ids, level)
+                for j in range(min_match, 0, -1):
+                    matched[j] |= matched[j - 1] & bitmap
+            if result is None:
+                result = matched[min_match]
+            else:
+                result &= matched[min_match]
+        return result or 0
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Индекс процесса, перестроенный, если другой процесс изменил навыки"""
+    global _index
+    generation = counter_value(GENERATION)
+    if _index is None or _index.generation != generation:
+        with _index_lock:
+            if _index is None or _index.generation != generation:
+                _index = SkillIndex.build(generation)
+    return _index
+
+
+def _bump_generation():
+    # Поколение читается в той же транзакции, что и UPDATE, поэтому
+    # значение принадлежит именно этому изменению
+    apply_deltas({GENERATION: 1})
+    return counter_value(GENERATION)
+
+
+def _applied(generation, update):
+    def apply():
+        index = _index
+        if index is not None and index.generation == generation - 1:
+            update(index)
+            index.generation = generation
+
+    return apply
+
+
+def employee_skill_changed(employee_id, skill_id, level=None):
+    """Вызывается сигналами EmployeeSkill; level=None — связь удалена"""
+    with transaction.atomic():
+        generation = _bump_generation()
+        transaction.on_commit(
+            _applied(
+                generation,
+                lambda index: index.set_level(employee_id, skill_id, level),
+            )
+        )
+
+
+def skill_deleted(skill_id):
+    with transaction.atomic():
+        generation = _bump_generation()
+        transaction.on_commit(
+            _applied(generation, lambda index: index.remove_skill(skill_id))
+        )
+
+
+def invalidate():
+    """Заставляет все процессы перестроить индекс (после bulk-операций)"""
+    _bump_generation()
+
+
+def resolve_skills(names):
+    """{имя навыка в нижнем регистре: [id]} одним запросом"""
+    ids = defaultdict(list)
+    lookups = {name.strip().lower() for name in names}
+    for pk, name in Skill.objects.values_list("id", "name"):
+        if name.lower() in lookups:
+            ids[name.lower()].append(pk)
+    return ids
+
+
+def match_bitmap(all_of=None, any_of=None, min_match=1):
+    """
+    Битовая карта сотрудников по условиям {имя навыка: мин. уровень}.
+
+    all_of — нужны все навыки, any_of — не менее min_match навыков.
+    Неизвестный навык в all_of даёт пустой результат.
+    """
+    all_of, any_of = all_of or {}, any_of or {}
+    skill_ids = resolve_skills([*all_of, *any_of])
+    conditions_all = [
+        (skill_ids.get(name.strip().lower(), ()), level)
+        for name, level in all_of.items()
+    ]
+    conditions_any = [
+        (skill_ids.get(name.strip().lower(), ()), level)
+        for name, level in any_of.items()
+    ]
+    if not conditions_all and not conditions_any:
+        return 0
+    return get_index().query(conditions_all, conditions_any, min_match)
+
+
+def find_employee_ids(all_of=None, any_of=None, min_match=1):
+    """id сотрудников по возрастанию, условия как у match_bitmap"""
+    return list(iter_bits(match_bitmap(all_of, any_of, min_match)))
+
+
+def location_bitmap(location):
+    """
+    Сотрудники за столами местоположения. Карта строится одним запросом
+    без id в параметрах: список найденных id для pk__in упирается в лимит
+    переменных SQLite.
+    """
+    return to_bitmap(
+        Employee.objects.filter(workstation__location=location)
+        .values_list("id", flat=True)
+        .iterator(chunk_size=10000)
+    )
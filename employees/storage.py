@@ -0,0 +1,181 @@
+"""
+Хранилище фотографий с адресацией по содержимому.
+
+Файл сохраняется под именем employees/cas/<xx>/<sha256><ext>, поэтому
+одинаковые загрузки занимают место один раз. URL копий получают
+?v=<хеш содержимого>, вычисленный при их создании (imaging.py), чтобы
+браузер мог кешировать их навсегда (media.py); url() файлы не читает. Ссылки на файл считаются в
+MediaFile, а физическое удаление откладывается: файлы без ссылок удаляет
+пакетный сборщик collect_orphans (команда collect_media).
+"""
+
+import hashlib
+import os
+import posixpath
+import shutil
+from datetime import timedelta
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+from .imaging import VARIANTS_DIR, content_version
+
+CAS_PREFIX = "employees/cas"
+
+
+def content_hash(content, chunk_size=64 * 1024):
+    digest = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    if hasattr(content, "chunks"):
+        chunks = content.chunks(chunk_size)
+    else:
+        chunks = iter(lambda: content.read(chunk_size), b"")
+    for chunk in chunks:
+        digest.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(digest, original_name):
+    ext = posixpath.splitext(original_name)[1].lower()
+    return posixpath.join(CAS_PREFIX, digest[:2], f"{digest}{ext}")
+
+
+def is_hashed_name(name):
+    return bool(name) and name.startswith(CAS_PREFIX + "/")
+
+
+@lru_cache(maxsize=4096)
+def _version(path, mtime_ns, size):
+    return content_version(path)
+
+
+def file_version(path):
+    """
+    Текущая версия файла для проверки ?v= при раздаче (media.py);
+    пересчитывается только при изменении файла
+    """
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return _version(path, info.st_mtime_ns, info.st_size)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage, сохраняющий файлы под хешем содержимого"""
+
+    def save(self, name, content, max_length=None):
+        if content is None:
+            return super().save(name, content, max_length)
+        if not hasattr(content, "chunks"):
+            from django.core.files import File
+
+            content = File(content, name)
+        name = hashed_name(content_hash(content), name)
+        if self.reuse(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def reuse(self, name):
+        """
+        True, если файл name уже есть и не будет удалён сборщиком.
+
+        Файлу без ссылок продлевается срок до удаления: новая ссылка
+        появится только после сохранения EmployeeImage. Строку, которую
+        сборщик уже занял, UPDATE дожидается; после этого ни строки, ни
+        файла нет, и файл записывается заново.
+        """
+        MediaFile = apps.get_model("employees", "MediaFile")
+        MediaFile.objects.filter(name=name, refs__lte=0).update(
+            orphaned_at=timezone.now()
+        )
+        return self.exists(name)
+
+    def versioned_url(self, name, version):
+        """URL с ?v=<version>; имени с хешем версия не нужна"""
+        url = self.url(name)
+        if version and not is_hashed_name(name):
+            return f"{url}?v={version}"
+        return url
+
+    def save_local(self, path, original_name, digest):
+        """
+        Переносит локальный файл path с хешем digest в хранилище без
+        копирования (на той же файловой системе) и возвращает его имя.
+        """
+        name = hashed_name(digest, original_name)
+        if self.reuse(name):
+            os.remove(path)
+            return name
+        target = self.path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(path, target)
+        if self.file_permissions_mode is not None:
+            os.chmod(target, self.file_permissions_mode)
+        return name
+
+
+def employee_media_storage():
+    return ContentAddressedStorage()
+
+
+def remove_file(storage, name):
+    """Удаляет файл и все его копии из variants/"""
+    storage.delete(name)
+    stem = posixpath.splitext(name)[0]
+    directory, prefix = posixpath.split(posixpath.join(VARIANTS_DIR, stem))
+    if not storage.exists(directory):
+        return
+    for filename in storage.listdir(directory)[1]:
+        if filename.startswith(prefix + "_"):
+            storage.delete(posixpath.join(directory, filename))
+
+
+def collect_orphans(grace=None, batch_size=500, storage=None):
+    """
+    Удаляет файлы, на которые не осталось ссылок дольше grace.
+
+    Работает пачками по batch_size; возвращает число удалённых файлов.
+    Строки MediaFile сначала занимаются (SELECT FOR UPDATE и DELETE), и
+    удаляются только файлы занятых строк в той же транзакции: файл,
+    получивший ссылку или повторную загрузку (reuse), не трогается.
+    """
+    MediaFile = apps.get_model("employees", "MediaFile")
+    if grace is None:
+        grace = timedelta(
+            seconds=getattr(settings, "EMPLOYEE_MEDIA_DELETE_GRACE_SECONDS", 3600)
+        )
+    storage = storage or employee_media_storage()
+    cutoff = timezone.now() - grace
+
+    removed = 0
+    while True:
+        with transaction.atomic():
+            orphans = MediaFile.objects.filter(refs__lte=0, orphaned_at__lte=cutoff)
+            batch = list(
+                orphans.select_for_update()
+                .order_by("pk")
+                .values_list("pk", "name")[:batch_size]
+            )
+            if not batch:
+                return removed
+            pks = [pk for pk, _ in batch]
+            orphans.filter(pk__in=pks).delete()
+            # Без блокировки строк (SQLite) строка могла получить ссылку
+            # между SELECT и DELETE — такие остаются вместе с файлом
+            kept = set(
+                MediaFile.objects.filter(pk__in=pks).values_list("pk", flat=True)
+            )
+            for pk, name in batch:
+                if pk not in kept:
+                    remove_file(storage, name)
+        removed += len(batch) - len(kept)
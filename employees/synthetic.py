@@ -0,0 +1,351 @@
+"""
+Генератор синтетических данных для нагрузочных тестов.
+
+Создаёт рабочие места в нескольких местоположениях, сотрудников, навыки
+с уровнями и фотографии пакетами bulk_create в одной транзакции, затем
+индексирует сотрудников для поиска и пересчитывает счётчики и индекс навыков.
+
+Правило соседства соблюдается раскладкой столов полосами: STRIPE столов
+тестировщиков, стол-буфер для прочих ролей, STRIPE столов разработчиков,
+буфер и так далее. Тестировщик и разработчик никогда не оказываются за
+соседними столами, прочие роли садятся куда угодно.
+
+Фотографии — несколько сгенерированных изображений с готовыми копиями
+(imaging.py), которые разделяют все записи EmployeeImage, как одинаковые
+загрузки в хранилище с адресацией по содержимому.
+"""
+
+import io
+import random
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from workstations.layout import rebuild_neighbours
+from workstations.models import Workstation
+
+from . import skill_index
+from .counters import rebuild_counters
+from .imaging import generate_variants
+from .models import (
+    Employee,
+    EmployeeImage,
+    EmployeeSkill,
+    MediaFile,
+    Skill,
+    classify_position,
+)
+from .search import index_employees, search_available
+
+STRIPE = 8
+LOCATIONS = [
+    "Москва, офис 1",
+    "Москва, офис 2",
+    "Санкт-Петербург",
+    "Казань",
+    "Новосибирск",
+    "Екатеринбург",
+    "Нижний Новгород",
+    "Самара",
+]
+LAST_NAMES = [
+    "Иванов",
+    "Петров",
+    "Сидоров",
+    "Смирнов",
+    "Кузнецов",
+    "Попов",
+    "Васильев",
+    "Соколов",
+    "Михайлов",
+    "Новиков",
+    "Фёдоров",
+    "Морозов",
+    "Волков",
+    "Алексеев",
+    "Лебедев",
+    "Семёнов",
+]
+FIRST_NAMES = {
+    "M": ["Александр", "Дмитрий", "Максим", "Сергей", "Андрей", "Алексей", "Олег"],
+    "F": ["Анна", "Мария", "Елена", "Ольга", "Наталья", "Татьяна", "Юлия"],
+}
+MIDDLE_NAMES = {
+    "M": ["Александрович", "Сергеевич", "Андреевич", "Игоревич", "Петрович"],
+    "F": ["Александровна", "Сергеевна", "Андреевна", "Игоревна", "Петровна"],
+}
+POSITIONS = {
+    Employee.ROLE_DEVELOPER: [
+        "Backend разработчик",
+        "Frontend разработчик",
+        "Ведущий разработчик",
+        "Python developer",
+    ],
+    Employee.ROLE_TESTER: ["Тестировщик", "Ведущий тестировщик", "QA tester"],
+    Employee.ROLE_OTHER: [
+        "Аналитик",
+        "Менеджер проектов",
+        "Дизайнер",
+        "Системный администратор",
+        "Технический писатель",
+    ],
+}
+ROLE_WEIGHTS = {
+    Employee.ROLE_DEVELOPER: 40,
+    Employee.ROLE_TESTER: 20,
+    Employee.ROLE_OTHER: 40,
+}
+SKILLS = [
+    "Python",
+    "Django",
+    "SQL",
+    "PostgreSQL",
+    "Docker",
+    "Kubernetes",
+    "Linux",
+    "Git",
+    "JavaScript",
+    "TypeScript",
+    "React",
+    "Go",
+    "Java",
+    "Selenium",
+    "Pytest",
+    "Нагрузочное тестирование",
+    "Английский язык",
+    "Аналитика данных",
+]
+# Начальный уровень встречается чаще экспертного
+LEVEL_WEIGHTS = [35, 35, 20, 10]
+PHOTO_COLOURS = [
+    (180, 90, 60),
+    (60, 120, 180),
+    (90, 160, 90),
+    (200, 170, 70),
+    (130, 90, 170),
+    (70, 170, 170),
+    (170, 70, 110),
+    (110, 110, 110),
+]
+
+
+def desk_role(index, stripe=STRIPE):
+    """Роль полосы стола: тестировщики, буфер, разработчики, буфер, ..."""
+    block, position = divmod(index, stripe + 1)
+    if position == stripe:
+        return Employee.ROLE_OTHER
+    return Employee.ROLE_TESTER if block % 2 == 0 else Employee.ROLE_DEVELOPER
+
+
+def skill_names(count):
+    return [
+        SKILLS[i] if i < len(SKILLS) else f"{SKILLS[i % len(SKILLS)]} {i}"
+        for i in range(count)
+    ]
+
+
+def make_photos(count, rng, size=(600, 800)):
+    """
+    Сохраняет count изображений в хранилище фотографий и создаёт их копии.
+
+    Возвращает список словарей полей EmployeeImage (image, width, height,
+    variants).
+    """
+    storage = EmployeeImage._meta.get_field("image").storage
+    photos = []
+    for n in range(count):
+        image = Image.new("RGB", size, PHOTO_COLOURS[n % len(PHOTO_COLOURS)])
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x, y = rng.randrange(size[0]), rng.randrange(size[1])
+            radius = rng.randrange(20, 120)
+            shade = tuple(rng.randrange(256) for _ in range(3))
+            draw.ellipse((x - radius, y - radius, x + radius, y + radius), shade)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=85)
+        name = storage.save(f"synthetic_{n}.jpg", ContentFile(buffer.getvalue()))
+        variants, width, height = generate_variants(settings.MEDIA_ROOT, name)
+        photos.append(
+            {"image": name, "width": width, "height": height, "variants": variants}
+        )
+    return photos
+
+
+def _silent(message):
+    """progress по умолчанию: сообщения не выводятся"""
+
+
+class Generator:
+    """
+    Параметры набора данных. Вызов generate() создаёт данные и возвращает
+    словарь с числом созданных строк.
+    """
+
+    def __init__(
+        self,
+        employees=1000,
+        workstations=None,
+        locations=4,
+        skills=len(SKILLS),
+        max_skills=6,
+        max_images=2,
+        photos=len(PHOTO_COLOURS),
+        occupancy=0.9,
+        seed=0,
+        batch_size=5000,
+        progress=None,
+    ):
+        self.employees = employees
+        self.workstations = employees if workstations is None else workstations
+        self.locations = LOCATIONS[: max(1, min(locations, len(LOCATIONS)))]
+        self.skills = skills
+        self.max_skills = min(max_skills, skills)
+        self.max_images = max_images
+        self.photos = photos if max_images else 0
+        self.occupancy = occupancy
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.progress = progress or _silent
+        self.created = dict.fromkeys(
+            ["workstations", "employees", "skills", "employee_skills", "images"], 0
+        )
+
+    def generate(self):
+        photos = make_photos(self.photos, self.rng)
+        with transaction.atomic():
+            skill_ids = self.create_skills()
+            desks = self.create_workstations()
+            self.create_employees(desks, skill_ids, photos)
+            self.count_photo_refs(photos)
+            rebuild_counters()
+            skill_index.invalidate()
+        return self.created
+
+    def create_skills(self):
+        skills = Skill.objects.bulk_create(
+            Skill(name=name, description=f"Навык «{name}»")
+            for name in skill_names(self.skills)
+        )
+        self.created["skills"] = len(skills)
+        return [skill.pk for skill in skills]
+
+    def create_workstations(self):
+        """{роль полосы: очередь id столов}"""
+        # Зазор в один стол отделяет новые столы от существующих
+        start = (
+            Workstation.objects.aggregate(last=Max("table_index"))["last"] or 0
+        ) + 2
+        per_location = -(-self.workstations // len(self.locations))
+        desks = {role: deque() for role in ROLE_WEIGHTS}
+        for offset in range(0, self.workstations, self.batch_size):
+            batch = [
+                Workstation(
+                    name=f"Стол {start + i}",
+                    table_number=str(start + i),
+                    table_index=start + i,
+                    location=self.locations[i // per_location],
+                    equipment='Ноутбук, монитор 27"',
+                )
+                for i in range(offset, min(offset + self.batch_size, self.workstations))
+            ]
+            for workstation in Workstation.objects.bulk_create(batch):
+                desks[desk_role(workstation.table_index - start)].append(workstation.pk)
+            self.created["workstations"] += len(batch)
+            self.progress(f"Рабочих мест: {self.created['workstations']}")
+        rebuild_neighbours(self.locations)
+        return desks
+
+    def take_desk(self, desks, role):
+        if self.rng.random() >= self.occupancy:
+            return None
+        # Прочие роли занимают сначала буферные столы, затем любые
+        queues = [desks[role]]
+        if role == Employee.ROLE_OTHER:
+            queues += [desks[Employee.ROLE_DEVELOPER], desks[Employee.ROLE_TESTER]]
+        for queue in queues:
+            if queue:
+                return queue.popleft()
+        return None
+
+    def new_employee(self, number, desks):
+        rng = self.rng
+        role = rng.choices(list(ROLE_WEIGHTS), weights=list(ROLE_WEIGHTS.values()))[0]
+        gender = rng.choice("MF")
+        last_name = rng.choice(LAST_NAMES) + ("а" if gender == "F" else "")
+        position = rng.choice(POSITIONS[role])
+        return Employee(
+            last_name=last_name,
+            first_name=rng.choice(FIRST_NAMES[gender]),
+            middle_name=rng.choice(MIDDLE_NAMES[gender]),
+            gender=gender,
+            email=f"employee{number}@synthetic.example.com",
+            position=position,
+            role=classify_position(position),
+            hire_date=timezone.now().date() - timedelta(days=rng.randrange(15 * 365)),
+            workstation_id=self.take_desk(desks, role),
+            description=f"{position}, табельный номер {number}",
+        )
+
+    def create_employees(self, desks, skill_ids, photos):
+        rng = self.rng
+        first = (Employee.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        levels = [value for value, _ in EmployeeSkill.LEVEL_CHOICES]
+        for offset in range(0, self.employees, self.batch_size):
+            count = min(self.batch_size, self.employees - offset)
+            employees = Employee.objects.bulk_create(
+                self.new_employee(first + offset + i, desks) for i in range(count)
+            )
+            employee_skills, images = [], []
+            for employee in employees:
+                for skill_id in rng.sample(skill_ids, rng.randint(0, self.max_skills)):
+                    employee_skills.append(
+                        EmployeeSkill(
+                            employee_id=employee.pk,
+                            skill_id=skill_id,
+                            level=rng.choices(levels, weights=LEVEL_WEIGHTS)[0],
+                        )
+                    )
+                if photos:
+                    for order in range(rng.randint(0, self.max_images)):
+                        images.append(
+                            EmployeeImage(
+                                employee_id=employee.pk,
+                                order=order,
+                                **rng.choice(photos),
+                            )
+                        )
+            EmployeeSkill.objects.bulk_create(employee_skills)
+            EmployeeImage.objects.bulk_create(images)
+            if search_available():
+                index_employees([employee.pk for employee in employees])
+            self.created["employees"] += count
+            self.created["employee_skills"] += len(employee_skills)
+            self.created["images"] += len(images)
+            self.progress(f"Сотрудников: {self.created['employees']}")
+
+    def count_photo_refs(self, photos):
+        """Ссылки MediaFile для фотографий, созданных bulk_create"""
+        names = [photo["image"] for photo in photos]
+        refs = dict.fromkeys(names, 0)
+        refs.update(
+            EmployeeImage.objects.filter(image__in=names)
+            .values_list("image")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        existing = set(
+            MediaFile.objects.filter(name__in=names).values_list("name", flat=True)
+        )
+        MediaFile.objects.bulk_create(
+            MediaFile(name=name) for name in names if name not in existing
+        )
+        for name, count in refs.items():
+            MediaFile.objects.filter(name=name).update(
+                refs=count, orphaned_at=None if count else timezone.now()
+            )
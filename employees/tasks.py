@@ -0,0 +1,73 @@
+"""
+Фоновая генерация копий изображений в пуле процессов.
+
+Размер пула задаётся настройкой EMPLOYEE_IMAGE_VARIANT_WORKERS; при 0
+копии создаются синхронно (удобно для тестов и management-команд).
+"""
+
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+
+from .imaging import generate_variants
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    workers = getattr(settings, "EMPLOYEE_IMAGE_VARIANT_WORKERS", 0)
+    if not workers:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+def store_variants(pk, name, result):
+    """
+    Сохраняет результат generate_variants, если изображение не сменилось.
+    UPDATE не вызывает сигналов, поэтому версия кеша владельца поднимается
+    здесь же — иначе фрагменты остались бы без srcset.
+    """
+    from .signals import bump_cache_version
+
+    Employee = apps.get_model("employees", "Employee")
+    EmployeeImage = apps.get_model("employees", "EmployeeImage")
+    variants, width, height = result
+    if EmployeeImage.objects.filter(pk=pk, image=name).update(
+        variants=variants, width=width, height=height
+    ):
+        bump_cache_version(Employee.objects.filter(images__pk=pk))
+
+
+def _on_done(pk, name, future):
+    # Колбэк выполняется в служебном потоке пула: своё соединение с базой
+    try:
+        store_variants(pk, name, future.result())
+    except Exception:
+        logger.exception("Не удалось создать копии изображения %s", name)
+    finally:
+        connections.close_all()
+
+
+def schedule_variants(pk, name):
+    """Ставит генерацию копий изображения в очередь пула процессов"""
+    executor = get_executor()
+    if executor is None:
+        try:
+            store_variants(pk, name, generate_variants(settings.MEDIA_ROOT, name))
+        except Exception:
+            logger.exception("Не удалось создать копии изображения %s", name)
+        return
+    future = executor.submit(generate_variants, settings.MEDIA_ROOT, name)
+    future.add_done_callback(partial(_on_done, pk, name))
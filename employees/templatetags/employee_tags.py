@@ -0,0 +1,17 @@
+from django import template
+
+from ..components import card_context, page_links
+
+register = template.Library()
+
+
+@register.inclusion_tag("employees/_pagination.html")
+def pagination(page, query_string=""):
+    """Пагинация с окном номеров, посчитанным в Python (components.py)"""
+    return {"links": page_links(page, query_string)}
+
+
+@register.inclusion_tag("employees/_card.html")
+def employee_card(employee, compact=False):
+    """Карточка сотрудника: список или главная страница (compact)"""
+    return card_context(employee, compact)
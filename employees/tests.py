@@ -1,3 +1,1904 @@
-from django.test import TestCase
+import csv
+import datetime
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from PIL import Image
+
+from workspace1.db import PrimaryReplicaRouter, databases, sqlite_pragmas
+from workstations.layout import adjacency_conflicts, rebuild_neighbours
+from workstations.models import Workstation
+
+from .async_views import (
+    AsyncEmployeeApiView,
+    AsyncEmployeeDetailView,
+    AsyncEmployeeListView,
+    AsyncHomeView,
+)
+from .budgets import (
+    QueryBudgetExceeded,
+    count_queries,
+    get_query_budget,
+    query_budget,
+)
+from .bulk import grant_skill
+from .components import page_links
+from .counters import TOTAL, compute_counters, read_counters, rebuild_counters
+from .fragments import fragment_cache, fragment_key
+from .imaging import generate_variants, remove_variants
+from .importing import import_employees, read_records
+from .media import parse_range
+from .metrics import MetricsMiddleware, Registry
+from .models import (
+    DirectoryCounter,
+    Employee,
+    EmployeeImage,
+    EmployeeSkill,
+    ImageUpload,
+    MediaFile,
+    Skill,
+    conflicting_role,
+)
+from .pagination import (
+    EstimatedCountPaginator,
+    InvalidCursor,
+    KeysetPaginator,
+    decode_cursor,
+    encode_cursor,
+)
+from .search import search_employees
+from .seating import SeatingSolver, reseat
+from .skill_index import EmployeeIds, find_employee_ids, to_bitmap
+from .storage import collect_orphans, file_version, is_hashed_name
+from .synthetic import Generator
+from .uploads import UploadError, expire_uploads, part_path, write_chunk
+
+
+class QueryBudgetTestMixin:
+    """Проверка, что представление по адресу url укладывается в свой бюджет"""
+
+    def assertWithinQueryBudget(self, url, data=None):
+        budget = get_query_budget(resolve(url).func)
+        self.assertIsNotNone(budget, f"У представления {url} не задан бюджет")
+        with override_settings(QUERY_BUDGET_ENFORCE=True):
+            try:
+                response = self.client.get(url, data)
+            except QueryBudgetExceeded as e:
+                self.fail(str(e))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+
+@override_settings(QUERY_BUDGET_ENFORCE=True)
+class BudgetMixinTests(TestCase):
+    def test_exceeded_budget_raises(self):
+        @query_budget(1)
+        def view(request):
+            list(Employee.objects.all())
+            list(Skill.objects.all())
+
+        with self.assertRaises(QueryBudgetExceeded):
+            view(None)
+
+    def test_count_queries(self):
+        with count_queries() as counter:
+            list(Employee.objects.all())
+        self.assertEqual(counter.count, 1)
+        # Без бюджета текст запросов не хранится
+        self.assertIsNone(counter.queries)
+        with count_queries(keep_sql=True) as counter:
+            list(Employee.objects.all())
+        self.assertIn("employees_employee", counter.queries[0])
+
+    def test_exceeded_budget_reports_sql(self):
+        @query_budget(0)
+        def view(request):
+            list(Skill.objects.all())
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, "employees_skill"):
+            view(None)
+
+
+class ViewQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Бюджет не зависит от числа сотрудников, фотографий и навыков"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("viewer", password="x")
+        cls.skills = Skill.objects.bulk_create(
+            [Skill(name=f"Навык {i}") for i in range(10)]
+        )
+
+    def setUp(self):
+        caches["default"].clear()
+        fragment_cache().clear()
+        self.client.force_login(self.user)
+
+    def create_employees(self, count, images, skills):
+        employees = []
+        for i in range(count):
+            workstation = Workstation.objects.create(
+                name=f"Стол {i}",
+                table_number=f"{count}-{i}",
+                location="Офис",
+            )
+            employee = Employee.objects.create(
+                first_name="Иван",
+                last_name=f"Иванов{i}",
+                gender="M",
+                email=f"e{count}-{i}@example.com",
+                position="Менеджер",
+                hire_date=datetime.date(2020, 1, 1),
+                workstation=workstation,
+            )
+            EmployeeImage.objects.bulk_create(
+                EmployeeImage(
+                    employee=employee, image=f"employees/{i}_{n}.jpg", order=n
+                )
+                for n in range(images)
+            )
+            EmployeeSkill.objects.bulk_create(
+                EmployeeSkill(employee=employee, skill=skill, level=3)
+                for skill in self.skills[:skills]
+            )
+            employees.append(employee)
+        return employees
+
+    def assertViewsWithinBudget(self, employee):
+        self.assertWithinQueryBudget(reverse("employees:home"))
+        self.assertWithinQueryBudget(reverse("employees:employee_list"))
+        self.assertWithinQueryBudget(reverse("employees:employee_list"), {"page": 1})
+        self.assertWithinQueryBudget(
+            reverse("employees:employee_detail", args=[employee.pk])
+        )
+        self.assertWithinQueryBudget(
+            reverse("employees:employee_search"), {"q": "иванов навык"}
+        )
+        self.assertWithinQueryBudget(
+            reverse("employees:skill_query"),
+            {"skill": "Навык 0:2", "any": ["Навык 1", "Навык 2"], "location": "Офис"},
+        )
+
+    def test_single_employee(self):
+        (employee,) = self.create_employees(1, images=1, skills=1)
+        self.assertViewsWithinBudget(employee)
+
+    def test_many_images_and_skills(self):
+        employees = self.create_employees(12, images=8, skills=10)
+        self.assertViewsWithinBudget(employees[0])
+
+    def test_cached_fragments(self):
+        employees = self.create_employees(4, images=3, skills=3)
+        self.assertViewsWithinBudget(employees[0])
+        self.assertViewsWithinBudget(employees[0])
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.employee = Employee.objects.create(
+            first_name="Пётр",
+            last_name="Фёдоров",
+            gender="M",
+            email="fedorov@example.com",
+            position="Backend разработчик",
+        )
+        self.skill = Skill.objects.create(name="Kubernetes")
+
+    def found(self, query):
+        return [employee.pk for employee in search_employees(query)[:10]]
+
+    def test_prefix_and_yo(self):
+        self.assertEqual(self.found("федор"), [self.employee.pk])
+        self.assertEqual(self.found("Пётр разраб"), [self.employee.pk])
+        self.assertEqual(self.found("тестировщик"), [])
+
+    def test_index_follows_skills(self):
+        link = EmployeeSkill.objects.create(
+            employee=self.employee, skill=self.skill, level=2
+        )
+        self.assertEqual(self.found("kube"), [self.employee.pk])
+        self.skill.name = "Helm"
+        self.skill.save()
+        self.assertEqual(self.found("kube"), [])
+        self.assertEqual(self.found("helm"), [self.employee.pk])
+        link.delete()
+        self.assertEqual(self.found("helm"), [])
+
+    def test_deleted_employee_is_removed(self):
+        self.employee.delete()
+        self.assertEqual(search_employees("федоров").count(), 0)
+
+
+class SkillIndexTests(TestCase):
+    def setUp(self):
+        self.python, self.django, self.go = Skill.objects.bulk_create(
+            [Skill(name="Python"), Skill(name="Django"), Skill(name="Go")]
+        )
+        self.employees = []
+        for i, levels in enumerate([(4, 2, 0), (2, 3, 1), (3, 0, 4), (0, 0, 0)]):
+            employee = Employee.objects.create(
+                first_name="Иван",
+                last_name=f"Иванов{i}",
+                gender="M",
+                email=f"skills{i}@example.com",
+                position="Аналитик",
+            )
+            for skill, level in zip([self.python, self.django, self.go], levels):
+                if level:
+                    EmployeeSkill.objects.create(
+                        employee=employee, skill=skill, level=level
+                    )
+            self.employees.append(employee.pk)
+
+    def test_all_any_and_threshold(self):
+        a, b, c, _ = self.employees
+        self.assertEqual(find_employee_ids({"python": 3, "Django": 2}), [a])
+        self.assertEqual(find_employee_ids({"Python": 2}), [a, b, c])
+        self.assertEqual(find_employee_ids(any_of={"Django": 3, "Go": 4}), [b, c])
+        self.assertEqual(
+            find_employee_ids(any_of={"Python": 1, "Django": 1, "Go": 1}, min_match=3),
+            [b],
+        )
+        self.assertEqual(
+            find_employee_ids({"Python": 3}, {"Django": 1, "Go": 1}), [a, c]
+        )
+        self.assertEqual(find_employee_ids({"Rust": 1}), [])
+
+    def test_incremental_updates(self):
+        a, b, c, d = self.employees
+        self.assertEqual(find_employee_ids({"Go": 2}), [c])
+        with self.captureOnCommitCallbacks(execute=True):
+            EmployeeSkill.objects.create(employee_id=d, skill=self.go, level=3)
+        self.assertEqual(find_employee_ids({"Go": 2}), [c, d])
+        with self.captureOnCommitCallbacks(execute=True):
+            EmployeeSkill.objects.filter(employee_id=c, skill=self.go).delete()
+        self.assertEqual(find_employee_ids({"Go": 1}), [b, d])
+        link = EmployeeSkill.objects.get(employee_id=b, skill=self.go)
+        link.level = 4
+        with self.captureOnCommitCallbacks(execute=True):
+            link.save()
+        self.assertEqual(find_employee_ids({"Go": 4}), [b])
+
+    def test_changed_pair_clears_old_bit(self):
+        a, b, c, d = self.employees
+        link = EmployeeSkill.objects.get(employee_id=b, skill=self.go)
+        link.employee_id = d
+        with self.captureOnCommitCallbacks(execute=True):
+            link.save()
+        self.assertEqual(find_employee_ids({"Go": 1}), [c, d])
+        link.skill = self.python
+        with self.captureOnCommitCallbacks(execute=True):
+            link.save()
+        self.assertEqual(find_employee_ids({"Go": 1}), [c])
+        self.assertEqual(find_employee_ids({"Python": 1}), [a, b, c, d])
+
+    def test_employee_ids_slices_bitmap(self):
+        ids = EmployeeIds(to_bitmap([3, 70, 1000, 4096]))
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(ids[1:3], [70, 1000])
+        self.assertEqual(ids[-1], 4096)
+        self.assertEqual(list(ids), [3, 70, 1000, 4096])
+        self.assertEqual(len(EmployeeIds(0)), 0)
+
+    def test_query_view_filters_location(self):
+        a, b, c, _ = self.employees
+        for n, pk in enumerate([c, a]):
+            workstation = Workstation.objects.create(
+                name="Стол", table_number=str(n), location="Казань"
+            )
+            Employee.objects.filter(pk=pk).update(workstation=workstation)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("employees:skill_query"),
+                {"skill": "Python:2", "location": "Казань", "format": "json"},
+            )
+        data = response.json()
+        self.assertEqual(data["count"], 2)
+        self.assertEqual([row["id"] for row in data["results"]], [a, c])
+        # Найденные id не передаются в запрос местоположения параметрами
+        location_query = next(
+            q["sql"] for q in queries.captured_queries if '"location" = ' in q["sql"]
+        )
+        self.assertNotIn(" IN (", location_query)
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        self.workstation = Workstation.objects.create(
+            name="Стол", table_number="1", location="Офис"
+        )
+        self.employee = Employee.objects.create(
+            first_name="Анна",
+            last_name="Смирнова",
+            gender="F",
+            email="smirnova@example.com",
+            position="Аналитик",
+            workstation=self.workstation,
+        )
+        self.user = get_user_model().objects.create_user("api", password="x")
+        self.client.force_login(self.user)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse("employees:api_employees"))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"error": "Требуется вход"})
+
+    def test_staff_fields(self):
+        url = reverse("employees:api_workstations")
+        response = self.client.get(url, {"fields": "id,ip_address"})
+        self.assertEqual(response.status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url, {"fields": "id,ip_address"})
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": self.workstation.pk, "ip_address": None}],
+        )
+
+    def test_sparse_fields(self):
+        response = self.client.get(
+            reverse("employees:api_employees"), {"fields": "last_name,workstation"}
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "last_name": "Смирнова",
+                    "workstation": {
+                        "id": self.workstation.pk,
+                        "table_number": "1",
+                        "location": "Офис",
+                    },
+                }
+            ],
+        )
+        response = self.client.get(
+            reverse("employees:api_employees"), {"fields": "salary"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_unchanged_poll_is_not_modified(self):
+        url = reverse("employees:api_employee", args=[self.employee.pk])
+        etag = self.client.get(url)["ETag"]
+        with count_queries() as counter:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # сессия, пользователь и состояние выборки
+        self.assertEqual(counter.count, 3)
+
+        skill = Skill.objects.create(name="SQL")
+        EmployeeSkill.objects.create(employee=self.employee, skill=skill, level=2)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_deletion_changes_etag(self):
+        url = reverse("employees:api_workstations")
+        Workstation.objects.create(name="Стол", table_number="2", location="Офис")
+        response = self.client.get(url)
+        etag = response["ETag"]
+        # Только ETag: по времени изменения удаление не заметить
+        self.assertNotIn("Last-Modified", response)
+        Workstation.objects.filter(table_number="2").delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE="Thu, 01 Jan 2037 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("async", password="x")
+        cls.employee = Employee.objects.create(
+            first_name="Олег",
+            last_name="Кузнецов",
+            gender="M",
+            email="kuznetsov@example.com",
+            position="Менеджер",
+        )
+
+    def setUp(self):
+        fragment_cache().clear()
+        self.factory = AsyncRequestFactory()
+
+    def request(self, path, user=None):
+        request = self.factory.get(path)
+
+        async def auser():
+            return user or AnonymousUser()
+
+        request.user = user or AnonymousUser()
+        request.auser = auser
+        return request
+
+    async def test_pages(self):
+        response = await AsyncHomeView.as_view()(self.request("/"))
+        self.assertContains(response.render(), "Кузнецов")
+        response = await AsyncEmployeeListView.as_view()(self.request("/employees/"))
+        self.assertContains(response.render(), "Кузнецов")
+        response = await AsyncEmployeeListView.as_view()(
+            self.request("/employees/?page=1")
+        )
+        self.assertContains(response.render(), "Кузнецов")
+        response = await AsyncEmployeeListView.as_view()(
+            self.request("/employees/?sort=-tenure&tenure_max=1")
+        )
+        self.assertContains(response.render(), "Кузнецов")
+
+    async def test_detail_requires_login(self):
+        view = AsyncEmployeeDetailView.as_view()
+        path = f"/employees/{self.employee.pk}/"
+        response = await view(self.request(path), pk=self.employee.pk)
+        self.assertEqual(response.status_code, 302)
+        response = await view(self.request(path, self.user), pk=self.employee.pk)
+        self.assertContains(response.render(), "Кузнецов")
+
+    async def test_api_not_modified(self):
+        view = AsyncEmployeeApiView.as_view()
+        response = await view(self.request("/api/employees/"))
+        self.assertEqual(response.status_code, 401)
+        response = await view(
+            self.request("/api/employees/?fields=id,skills", self.user)
+        )
+        self.assertEqual(response.status_code, 200)
+        request = self.request("/api/employees/?fields=id,skills", self.user)
+        request.META["HTTP_IF_NONE_MATCH"] = response["ETag"]
+        self.assertEqual((await view(request)).status_code, 304)
+
+
+class DatabaseProfileTests(TransactionTestCase):
+    # Вне TestCase: его транзакция отправила бы всё чтение в основную базу
+    def test_router_reads_from_replica_outside_transactions(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Employee), "replica")
+        self.assertEqual(router.db_for_write(Employee), "default")
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Employee), "default")
+            self.assertEqual(router.db_for_write(Employee), "default")
+        self.assertEqual(router.db_for_read(Employee), "replica")
+
+        employee = Employee(last_name="Репликов")
+        employee._state.db = "default"
+        self.assertEqual(router.db_for_read(Workstation, instance=employee), "default")
+        self.assertTrue(router.allow_migrate("default", "employees"))
+        self.assertFalse(router.allow_migrate("replica", "employees"))
+
+    def test_production_pragmas_on_both_connections(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        handler = ConnectionHandler(
+            databases("production", os.path.join(directory.name, "profile.sqlite3"))
+        )
+        self.addCleanup(handler.close_all)
+
+        with override_settings(SQLITE_PRAGMAS=sqlite_pragmas("production")):
+            for alias in ("default", "replica"):
+                handler[alias].ensure_connection()
+        for alias, query_only in (("default", 0), ("replica", 1)):
+            with handler[alias].cursor() as cursor:
+                values = {}
+                for name in ("journal_mode", "synchronous", "busy_timeout"):
+                    cursor.execute(f"PRAGMA {name}")
+                    values[name] = cursor.fetchone()[0]
+                cursor.execute("PRAGMA query_only")
+                values["query_only"] = cursor.fetchone()[0]
+            # synchronous = NORMAL — значение 1
+            self.assertEqual(
+                values,
+                {
+                    "journal_mode": "wal",
+                    "synchronous": 1,
+                    "busy_timeout": 5000,
+                    "query_only": query_only,
+                },
+                alias,
+            )
+        with self.assertRaises(OperationalError):
+            with handler["replica"].cursor() as cursor:
+                cursor.execute("CREATE TABLE probe (id integer)")
+
+
+class SyntheticDataTests(TestCase):
+    def test_generated_seating_respects_adjacency_rule(self):
+        created = Generator(employees=300, max_images=0, seed=1).generate()
+        self.assertEqual(created["employees"], 300)
+        self.assertEqual(read_counters()[TOTAL], 300)
+
+        seats = dict(
+            Employee.objects.filter(workstation__isnull=False).values_list(
+                "workstation__table_index", "role"
+            )
+        )
+        for table_index, role in seats.items():
+            opposite = conflicting_role(role)
+            if opposite:
+                self.assertNotEqual(seats.get(table_index + 1), opposite)
+
+
+class MetricsTests(TestCase):
+    def test_request_metrics_are_exported(self):
+        Employee.objects.create(
+            last_name="Иванов",
+            first_name="Иван",
+            gender="M",
+            email="i@example.com",
+            position="Аналитик",
+        )
+        self.client.get(reverse("employees:employee_list"))
+
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        with override_settings(METRICS_TOKEN="secret"):
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+            self.assertEqual(response.status_code, 403)
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        labels = '{view="employees:employee_list"}'
+        self.assertIn(f"django_db_queries_count{labels}", text)
+        self.assertIn(f"django_template_render_seconds_sum{labels}", text)
+        self.assertIn(
+            'django_request_duration_seconds_bucket{view="employees:employee_list",le="+Inf"}',
+            text,
+        )
+        self.assertNotIn('view="metrics"', text)
+
+    def test_staff_can_read_metrics(self):
+        staff = get_user_model().objects.create_user("staff", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    async def test_async_requests_are_measured(self):
+        async def view(request):
+            await Employee.objects.acount()
+            return HttpResponse("ok")
+
+        middleware = MetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = AsyncRequestFactory().get("/")
+        request.resolver_match = mock.Mock(view_name="async-test")
+        response = await middleware(request)
+        self.assertEqual(response.content, b"ok")
+        values = middleware.registry.collect()
+        self.assertEqual(
+            values[("django_db_queries", (("view", "async-test"),))][-1], 1
+        )
+
+    def test_registry_merges_process_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            other = Registry(directory)
+            other.observe("django_db_queries", (("view", "a"),), 3)
+            other.flush()
+            os.rename(other.path(), other.path(pid=1))
+            registry = Registry(directory)
+            registry.observe("django_db_queries", (("view", "a"),), 30)
+            values = registry.collect()[("django_db_queries", (("view", "a"),))]
+        self.assertEqual(sum(values[:-1]), 2)
+        self.assertEqual(values[-1], 33)
+
+    def test_prune_removes_files_of_finished_processes(self):
+        finished = subprocess.Popen([sys.executable, "-c", "pass"])
+        finished.wait()
+        with tempfile.TemporaryDirectory() as directory:
+            registry = Registry(directory)
+            registry.flush()
+            names = [
+                f"{finished.pid}-1.json",
+                # Прежний процесс с тем же pid
+                f"{os.getpid()}-1.json",
+                f"{os.getppid()}-1.json",
+                "crashed.tmp",
+            ]
+            for name in names:
+                with open(os.path.join(directory, name), "w") as f:
+                    f.write("[]")
+            old = time.time() - 3600
+            os.utime(os.path.join(directory, "crashed.tmp"), (old, old))
+            registry.prune()
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                sorted([os.path.basename(registry.path()), f"{os.getppid()}-1.json"]),
+            )
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Generator(employees=150, max_images=0, seed=2).generate()
+        cls.user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "admin"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_changelists_do_not_query_per_row(self):
+        for url in [
+            "/admin/employees/employee/",
+            "/admin/employees/employeeskill/",
+            "/admin/workstations/workstation/",
+        ]:
+            with count_queries() as counter:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(counter.count, 8, url)
+
+    def test_estimated_count_and_occupant(self):
+        response = self.client.get("/admin/workstations/workstation/")
+        self.assertEqual(
+            response.context["cl"].result_count, Workstation.objects.count()
+        )
+        employee = Employee.objects.filter(workstation__isnull=False).first()
+        self.assertContains(response, f"{employee.last_name} {employee.first_name}")
+
+    def test_change_form(self):
+        employee = Employee.objects.filter(employeeskill__isnull=False).first()
+        response = self.client.get(f"/admin/employees/employee/{employee.pk}/change/")
+        self.assertEqual(response.status_code, 200)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Workstation.objects.bulk_create(
+            Workstation(name="Стол", table_number=str(n), location="Офис")
+            for n in range(30)
+        )
+        cls.queryset = Workstation.objects.order_by("pk")
+
+    def paginator(self, queryset, limit):
+        paginator = EstimatedCountPaginator(queryset, 10)
+        paginator.count_limit = limit
+        return paginator
+
+    def test_small_table_is_counted_exactly(self):
+        self.queryset.filter(table_number__in=["0", "1", "2"]).delete()
+        self.assertEqual(self.paginator(self.queryset, 100).count, 27)
+
+    def test_trailing_page_beyond_estimate(self):
+        first, last = self.queryset.first().pk, self.queryset.last().pk
+        self.queryset.filter(pk__gt=first + 10).exclude(pk=last).delete()
+        paginator = self.paginator(self.queryset, 5)
+        self.assertEqual(paginator.count, last)
+        page = paginator.page(3)
+        self.assertEqual(paginator.count, 12)
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page.object_list), 2)
+
+    def test_filtered_count_is_capped(self):
+        queryset = self.queryset.filter(location="Офис")
+        self.assertEqual(self.paginator(queryset, 25).count, 25)
+        self.assertEqual(self.paginator(queryset, 100).count, 30)
+
+
+class BulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "admin"
+        )
+        cls.desks = Workstation.objects.bulk_create(
+            Workstation(
+                name=f"Стол {n}",
+                table_number=str(n),
+                table_index=n,
+                location="Казань" if n > 10 else "Москва",
+            )
+            for n in range(1, 15)
+        )
+        rebuild_neighbours()
+        rebuild_counters()
+        cls.skill = Skill.objects.create(name="Kubernetes")
+        cls.employees = [
+            Employee.objects.create(
+                last_name=f"Сотрудник{n}",
+                first_name="Имя",
+                gender="M",
+                email=f"bulk{n}@example.com",
+                position=position,
+                workstation=cls.desks[n * 2],
+            )
+            for n, position in enumerate(["Тестировщик", "Разработчик", "Аналитик"])
+        ]
+        EmployeeSkill.objects.create(
+            employee=cls.employees[0], skill=cls.skill, level=3
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def action(self, url, action, objects, **data):
+        return self.client.post(
+            url,
+            {
+                "action": action,
+                "_selected_action": [obj.pk for obj in objects],
+                **data,
+            },
+        )
+
+    def assertCountersExact(self):
+        counters = read_counters()
+        for name, value in compute_counters().items():
+            self.assertEqual(counters.get(name, 0), value, name)
+
+    def test_move_to_location(self):
+        response = self.action(
+            "/admin/employees/employee/",
+            "move_to_location",
+            self.employees,
+            location="Казань",
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            set(Employee.objects.values_list("workstation__location", flat=True)),
+            {"Казань"},
+        )
+        self.assertEqual(adjacency_conflicts(), [])
+        self.assertCountersExact()
+
+    def test_move_fails_without_enough_desks(self):
+        for desk in self.desks[11:]:
+            desk.is_active = False
+            desk.save()
+        self.action(
+            "/admin/employees/employee/",
+            "move_to_location",
+            self.employees,
+            location="Казань",
+        )
+        self.assertEqual(
+            Employee.objects.filter(workstation__location="Казань").count(), 0
+        )
+
+    def test_grant_skill_only_raises_levels(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.action(
+                "/admin/employees/employee/",
+                "grant_skill",
+                self.employees,
+                skill=self.skill.pk,
+                level=2,
+            )
+        levels = dict(
+            EmployeeSkill.objects.filter(skill=self.skill).values_list(
+                "employee_id", "level"
+            )
+        )
+        first, second, third = (employee.pk for employee in self.employees)
+        self.assertEqual(levels, {first: 3, second: 2, third: 2})
+        self.assertEqual(find_employee_ids({"Kubernetes": 2}), [first, second, third])
+        self.assertEqual(search_employees("kube").count(), 3)
+
+    def test_grant_skill_bumps_recipients_only(self):
+        first, second, third = (employee.pk for employee in self.employees)
+        EmployeeSkill.objects.create(employee_id=second, skill=self.skill, level=1)
+        versions = dict(Employee.objects.values_list("pk", "cache_version"))
+        with CaptureQueriesContext(connection) as queries:
+            granted = grant_skill(Employee.objects.all(), self.skill, 2)
+        self.assertEqual(granted, (1, 1))
+        bumped = {
+            pk
+            for pk, version in Employee.objects.values_list("pk", "cache_version")
+            if version > versions[pk]
+        }
+        self.assertEqual(bumped, {second, third})
+        # Получатели передаются подзапросом, а не списком id
+        bump = next(
+            q["sql"] for q in queries.captured_queries if "cache_version" in q["sql"]
+        )
+        self.assertIn("SELECT", bump)
+
+    def test_deactivate_unseats_occupants(self):
+        desks = self.desks[:3]
+        response = self.action("/admin/workstations/workstation/", "deactivate", desks)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(
+            Workstation.objects.filter(pk__in=[d.pk for d in desks], is_active=True)
+        )
+        seats = dict(Employee.objects.values_list("pk", "workstation"))
+        first, second, third = (employee.pk for employee in self.employees)
+        self.assertEqual(seats, {first: None, second: None, third: self.desks[4].pk})
+        self.assertCountersExact()
+
+
+class TenureTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = datetime.date(2026, 3, 1)
+        cls.today = today
+        cls.employees = Employee.objects.bulk_create(
+            Employee(
+                last_name=f"Сотрудник{days}",
+                first_name="Имя",
+                gender="F",
+                email=f"tenure{days}@example.com",
+                position="Аналитик",
+                hire_date=today - datetime.timedelta(days=days),
+            )
+            for days in (10, 400, 800, 1500, 2000, 4000)
+        )
+
+    def test_annotation_filters_and_histogram(self):
+        queryset = Employee.objects.with_tenure(self.today)
+        self.assertEqual(
+            sorted(employee.work_experience_days for employee in queryset),
+            [10, 400, 800, 1500, 2000, 4000],
+        )
+        self.assertEqual(
+            [
+                employee.tenure.days
+                for employee in queryset.tenure_between(
+                    1, 5, today=self.today
+                ).order_by_tenure(descending=True)
+            ],
+            [1500, 800, 400],
+        )
+        histogram = Employee.objects.tenure_histogram(today=self.today)
+        self.assertEqual([bucket["count"] for bucket in histogram], [1, 2, 1, 1, 1])
+        self.assertEqual(histogram[-1]["max_years"], None)
+
+    def test_list_view_filters_and_pages_by_tenure(self):
+        url = reverse("employees:employee_list")
+        response = self.client.get(url, {"sort": "tenure", "tenure_min": 0})
+        self.assertEqual(response.status_code, 200)
+        seen = [employee.pk for employee in response.context["employees"]]
+        view = response.context["view"]
+        self.assertEqual(view.cursor_ordering, ["-hire_date", "-id"])
+        self.assertEqual(seen, [employee.pk for employee in self.employees])
+        # Ссылки пагинации сохраняют фильтр и сортировку
+        self.assertEqual(response.context["query_string"], "sort=tenure&tenure_min=0")
+        self.assertEqual(self.client.get(url, {"tenure_min": "-1"}).status_code, 404)
+
+    def test_descending_keyset_pages(self):
+        paginator = KeysetPaginator(
+            Employee.objects.all(), 4, ordering=["-hire_date", "-id"]
+        )
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        self.assertEqual(
+            [employee.pk for employee in [*first, *second]],
+            [employee.pk for employee in self.employees],
+        )
+        previous = paginator.page(second.previous_cursor)
+        self.assertEqual(list(previous), list(first))
+
+    def test_admin_tenure_filter(self):
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "admin"
+        )
+        self.client.force_login(user)
+        response = self.client.get("/admin/employees/employee/", {"tenure": "10-"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+
+class UploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employees = Employee.objects.bulk_create(
+            Employee(
+                last_name=f"Фото{n}",
+                first_name="Имя",
+                gender="M",
+                email=f"photo{n}@example.com",
+                position="Аналитик",
+                hire_date=datetime.date(2024, 1, 1),
+            )
+            for n in range(2)
+        )
+        cls.user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "admin"
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(
+            MEDIA_ROOT=os.path.join(directory.name, "media"),
+            EMPLOYEE_UPLOAD_DIR=os.path.join(directory.name, "uploads"),
+            EMPLOYEE_UPLOAD_CHUNK_SIZE=1024,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.client.force_login(self.user)
+        buffer = io.BytesIO()
+        Image.effect_noise((64, 64), 40).convert("RGB").save(buffer, "PNG")
+        self.photo = buffer.getvalue()
+
+    def spec(self, employee, content=None):
+        content = content or self.photo
+        return {
+            "employee": employee.pk,
+            "filename": "camera.png",
+            "size": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+
+    def create(self, data):
+        return self.client.post(
+            reverse("employees:api_uploads"), data, content_type="application/json"
+        )
+
+    def send(self, url, offset, data):
+        return self.client.patch(
+            url,
+            data,
+            content_type="application/offset+octet-stream",
+            headers={"Upload-Offset": str(offset)},
+        )
+
+    def upload(self, url, content, start=0, chunk_size=1024):
+        for offset in range(start, len(content), chunk_size):
+            response = self.send(url, offset, content[offset : offset + chunk_size])
+        return response
+
+    def test_chunked_upload_with_resume(self):
+        EmployeeImage.objects.create(employee=self.employees[0], image="old.png")
+        response = self.create(self.spec(self.employees[0]))
+        self.assertEqual(response.status_code, 201)
+        url = response.json()["url"]
+        self.assertEqual(response.json()["chunk_size"], 1024)
+        self.assertGreater(len(self.photo), 2048)
+
+        self.send(url, 0, self.photo[:1024])
+        # Повтор уже принятой части отклоняется с текущим смещением
+        response = self.send(url, 0, self.photo[:1024])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Upload-Offset"], "1024")
+        self.assertEqual(self.client.head(url)["Upload-Offset"], "1024")
+        self.assertEqual(self.send(url, 0, b"x" * 2048).status_code, 413)
+
+        # Часть может быть короче chunk_size
+        self.send(url, 1024, self.photo[1024:1500])
+        offset = self.client.get(url).json()["offset"]
+        self.assertEqual(offset, 1500)
+        response = self.upload(url, self.photo, start=offset)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.json()["complete"])
+
+        image = EmployeeImage.objects.get(pk=response.json()["image"])
+        self.assertEqual(image.employee, self.employees[0])
+        self.assertEqual(image.order, 1)
+        self.assertTrue(image.image.name.startswith("employees/cas/"))
+        with image.image.open("rb") as f:
+            self.assertEqual(f.read(), self.photo)
+        self.assertEqual(os.listdir(settings.EMPLOYEE_UPLOAD_DIR), [])
+
+    def test_stale_chunk_keeps_accepted_data(self):
+        url = self.create(self.spec(self.employees[0])).json()["url"]
+        self.send(url, 0, self.photo[:100])
+        self.send(url, 100, self.photo[100:150])
+        upload = ImageUpload.objects.get()
+        self.assertEqual(upload.received, 150)
+        # Повтор первой части, прочитавший смещение до второй, проигрывает
+        # условный UPDATE и не должен обрезать уже принятые данные
+        upload.received = 0
+        with self.assertRaises(UploadError) as error:
+            write_chunk(upload, 0, io.BytesIO(self.photo[:100]), 100)
+        self.assertEqual(error.exception.status, 409)
+        self.assertEqual(upload.received, 150)
+        self.assertEqual(os.path.getsize(part_path(upload)), 150)
+        response = self.upload(url, self.photo, start=150)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.json()["complete"])
+
+    def test_checksum_mismatch_restarts_upload(self):
+        spec = self.spec(self.employees[0])
+        spec["sha256"] = hashlib.sha256(b"other").hexdigest()
+        url = self.create(spec).json()["url"]
+        response = self.upload(url, self.photo)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response["Upload-Offset"], "0")
+        self.assertFalse(EmployeeImage.objects.exists())
+
+    def test_batch_upload_and_expiry(self):
+        response = self.create(
+            {"uploads": [self.spec(employee) for employee in self.employees]}
+        )
+        self.assertEqual(response.status_code, 201)
+        uploads = response.json()["uploads"]
+        self.assertEqual(
+            [u["employee"] for u in uploads], [e.pk for e in self.employees]
+        )
+        for upload in uploads:
+            self.assertEqual(self.upload(upload["url"], self.photo).status_code, 200)
+        # Одинаковые файлы занимают место в хранилище один раз
+        self.assertEqual(EmployeeImage.objects.values("image").distinct().count(), 1)
+
+        bad = self.spec(self.employees[0])
+        bad["filename"] = "notes.txt"
+        response = self.create({"uploads": [self.spec(self.employees[0]), bad]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("uploads[1]", response.json()["error"])
+        self.assertEqual(ImageUpload.objects.count(), 2)
+
+        pending = self.create(self.spec(self.employees[1])).json()["url"]
+        self.send(pending, 0, self.photo[:100])
+        self.assertEqual(expire_uploads(datetime.timedelta(seconds=-1)), 3)
+        self.assertEqual(os.listdir(settings.EMPLOYEE_UPLOAD_DIR), [])
+
+    def test_requires_permission(self):
+        self.client.logout()
+        response = self.create(self.spec(self.employees[0]))
+        self.assertEqual(response.status_code, 401)
+
+
+class MediaTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(MEDIA_ROOT=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.content = bytes(range(256)) * 4
+        self.storage = EmployeeImage._meta.get_field("image").storage
+        self.name = self.storage.save("photo.png", io.BytesIO(self.content))
+        os.makedirs(os.path.join(directory.name, "old"))
+        with open(os.path.join(directory.name, "old", "photo.png"), "wb") as f:
+            f.write(self.content)
+
+    def test_full_response_and_conditional_get(self):
+        url = self.storage.url(self.name)
+        self.assertNotIn("?", url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("immutable", response["Cache-Control"])
+        response = self.client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+        # Файлы вне хранилища по хешу кешируются навсегда только с
+        # версией, совпадающей с содержимым
+        version = file_version(os.path.join(settings.MEDIA_ROOT, "old", "photo.png"))
+        url = self.storage.versioned_url("old/photo.png", version)
+        self.assertRegex(url, r"/media/old/photo\.png\?v=[0-9a-f]{12}$")
+        self.assertIn("immutable", self.client.get(url)["Cache-Control"])
+        for url in ["/media/old/photo.png", "/media/old/photo.png?v=stale"]:
+            self.assertEqual(self.client.get(url)["Cache-Control"], "no-cache")
+
+    def test_ranges(self):
+        url = self.storage.url(self.name)
+        response = self.client.get(url, headers={"Range": "bytes=10-19"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/1024")
+        self.assertEqual(b"".join(response.streaming_content), self.content[10:20])
+        response = self.client.get(url, headers={"Range": "bytes=2000-"})
+        self.assertEqual(response.status_code, 416)
+        response = self.client.get(
+            url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(parse_range("bytes=-24", 1024), (1000, 1023))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 1024))
+
+    def test_offload_and_forbidden_paths(self):
+        with override_settings(MEDIA_SENDFILE="x-accel-redirect"):
+            response = self.client.get(f"/media/{self.name}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.name}")
+        self.assertEqual(response.content, b"")
+        for path in ["/media/../manage.py", "/media/.hidden", "/media/old/"]:
+            self.assertEqual(self.client.get(path).status_code, 404, path)
+        with override_settings(MEDIA_LOGIN_REQUIRED=True):
+            self.assertEqual(self.client.get(f"/media/{self.name}").status_code, 404)
+
+
+JINJA2_TEMPLATES = settings.TEMPLATES[:1] + [
+    {
+        "BACKEND": "django.template.backends.jinja2.Jinja2",
+        "NAME": "jinja2",
+        "DIRS": [os.path.join(settings.BASE_DIR, "jinja2")],
+        "APP_DIRS": False,
+        "OPTIONS": {"environment": "employees.components.environment"},
+    }
+]
+
+
+class SettingsProfileTests(SimpleTestCase):
+    # Профиль выбирается при импорте settings, поэтому — в отдельном процессе
+    PROBE = """
+import json
+from django.conf import settings
+
+print(json.dumps({
+    "debug": settings.DEBUG,
+    "apps": settings.INSTALLED_APPS,
+    "middleware": settings.MIDDLEWARE,
+    "loaders": settings.TEMPLATES[0]["OPTIONS"].get("loaders"),
+    "staticfiles": settings.STORAGES["staticfiles"]["BACKEND"],
+}))
+"""
+
+    def load(self, **env):
+        environ = {
+            key: value
+            for key, value in os.environ.items()
+            if not key.startswith("DJANGO_")
+        }
+        environ.update(DJANGO_SETTINGS_MODULE="workspace1.settings", **env)
+        return subprocess.run(
+            [sys.executable, "-c", self.PROBE],
+            cwd=settings.BASE_DIR,
+            env=environ,
+            capture_output=True,
+            text=True,
+        )
+
+    def test_production_profile(self):
+        result = self.load(DJANGO_PROFILE="production", DJANGO_SECRET_KEY="secret")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        values = json.loads(result.stdout)
+        self.assertFalse(values["debug"])
+        self.assertNotIn("debug_toolbar", values["apps"])
+        self.assertFalse([m for m in values["middleware"] if "debug_toolbar" in m])
+        [(loader, _)] = values["loaders"]
+        self.assertEqual(loader, "django.template.loaders.cached.Loader")
+        self.assertEqual(
+            values["staticfiles"],
+            "django.contrib.staticfiles.storage.ManifestStaticFilesStorage",
+        )
+
+    def test_production_requires_secret_key(self):
+        result = self.load(DJANGO_PROFILE="production")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("ImproperlyConfigured", result.stderr)
+        self.assertIn("DJANGO_SECRET_KEY", result.stderr)
+
+    def test_development_profile(self):
+        result = self.load()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        values = json.loads(result.stdout)
+        self.assertTrue(values["debug"])
+        self.assertIn("debug_toolbar", values["apps"])
+        self.assertIsNone(values["loaders"])
+
+
+class TemplateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        skill = Skill.objects.create(name="Python")
+        for i in range(25):
+            employee = Employee.objects.create(
+                first_name="Анна",
+                last_name=f"Смирнова{i:02}",
+                gender="F",
+                email=f"anna{i}@example.com",
+                position="Аналитик",
+                hire_date=datetime.date(2021, 3, 1),
+            )
+            EmployeeSkill.objects.create(employee=employee, skill=skill, level=2)
+
+    def setUp(self):
+        fragment_cache().clear()
+
+    def test_page_links_window(self):
+        paginator = Paginator(range(1000), 10)
+        links = page_links(paginator.page(50), "sort=tenure")
+        self.assertEqual([n for n, _, _ in links["pages"]], [48, 49, 50, 51, 52])
+        self.assertEqual(links["last"], "?sort=tenure&page=100")
+        self.assertEqual(
+            page_links(paginator.page(1))["pages"][0], (1, "?page=1", True)
+        )
+        self.assertIsNone(page_links(Paginator(range(5), 10).page(1)))
+
+    def test_list_page(self):
+        response = self.client.get(reverse("employees:employee_list"), {"page": 2})
+        self.assertContains(response, "Смирнова10")
+        self.assertContains(response, "Python (Средний)")
+        self.assertContains(response, 'href="?page=3"')
+        self.assertContains(response, "Страница 2 из 3")
+
+    @skipUnless(importlib.util.find_spec("jinja2"), "jinja2 не установлен")
+    def test_jinja2_engine(self):
+        from django.template.backends.jinja2 import Template
+
+        with override_settings(
+            TEMPLATES=JINJA2_TEMPLATES, EMPLOYEE_TEMPLATE_ENGINE="jinja2"
+        ):
+            response = self.client.get(reverse("employees:employee_list"), {"page": 2})
+        self.assertTrue(response.templates)
+        for template in response.templates:
+            self.assertIsInstance(template, Template)
+        self.assertContains(response, "Смирнова10")
+        self.assertContains(response, "Python (Средний)")
+        self.assertContains(response, 'href="?page=3"')
+        self.assertContains(response, "Страница 2 из 3")
+
+
+class AdjacencyTests(TestCase):
+    def setUp(self):
+        self.desks = {
+            number: Workstation.objects.create(
+                name=f"Стол {number}", table_number=number, location="Офис"
+            )
+            for number in ["7", "8", "9"]
+        }
+
+    def employee(self, position, number, n):
+        employee = Employee(
+            last_name=f"Соседов{n}",
+            first_name="Имя",
+            gender="M",
+            email=f"desk{n}@example.com",
+            position=position,
+            workstation=self.desks[number],
+        )
+        employee.save()
+        return employee
+
+    def test_conflicting_roles_on_adjacent_desks(self):
+        tester = self.employee("Старший тестировщик", "8", 1)
+        self.assertEqual(tester.role, Employee.ROLE_TESTER)
+        # Та же роль и роль «другое» рядом допустимы
+        self.employee("QA tester", "7", 2)
+        self.employee("Менеджер", "9", 3)
+
+        developer = Employee(
+            last_name="Разработчиков",
+            first_name="Имя",
+            gender="M",
+            email="dev@example.com",
+            position="Frontend разработчик",
+            workstation=self.desks["9"],
+        )
+        with self.assertRaises(ValidationError) as error:
+            developer.save()
+        message = " ".join(error.exception.messages)
+        self.assertIn("Стол 9 соседствует со столом 8", message)
+        self.assertIn("Соседов1", message)
+
+        # Сотрудник не конфликтует сам с собой при повторном сохранении
+        tester.save()
+
+
+class SeatingTests(TestCase):
+    T, D, O = Employee.ROLE_TESTER, Employee.ROLE_DEVELOPER, Employee.ROLE_OTHER
+
+    def assertValidSeating(self, solver, assignment):
+        roles = dict(solver.people)
+        desk_roles = {desk: roles[pk] for pk, desk in assignment.items()}
+        self.assertEqual(len(set(assignment.values())), len(assignment))
+        for desk, role in desk_roles.items():
+            opposite = conflicting_role(role)
+            for neighbour in solver.graph.get(desk, ()):
+                if opposite:
+                    self.assertNotEqual(desk_roles.get(neighbour), opposite)
+
+    def test_buffer_inside_component(self):
+        # Звезда: центр 1 и листья 2–5. Жадное заполнение с центра не
+        # справляется, но рассадка есть: центр пустой
+        graph = {1: [2, 3, 4, 5], **{leaf: [1] for leaf in (2, 3, 4, 5)}}
+        solver = SeatingSolver(
+            [1, 2, 3, 4, 5], [(10, self.T), (11, self.D), (12, self.O)], graph
+        )
+        self.assertIsNone(solver.colour((self.T, self.D, self.O)))
+        assignment = solver.solve()
+        self.assertEqual(set(assignment), {10, 11, 12})
+        self.assertNotIn(1, [assignment[10], assignment[11]])
+        self.assertValidSeating(solver, assignment)
+
+    def test_infeasible(self):
+        # Столы 1 и 2 соседние, стол 3 — рядом с тестировщиком и
+        # разработчиком, которые остаются на местах
+        solver = SeatingSolver(
+            [1, 2, 3],
+            [(10, self.T), (11, self.D)],
+            {1: [2], 2: [1], 3: [4]},
+            fixed_roles={4: {self.T, self.D}},
+        )
+        with self.assertRaisesMessage(ValidationError, "Рассадка невозможна"):
+            solver.solve()
+        with self.assertRaisesMessage(ValidationError, "Недостаточно рабочих мест"):
+            SeatingSolver([1], [(10, self.T), (11, self.O)], {}).solve()
+
+    def test_reseat_applies_assignment(self):
+        desks = [
+            Workstation.objects.create(
+                name=f"Ряд {n}", table_number=str(n), location="Ряд"
+            )
+            for n in range(1, 6)
+        ]
+        employees = [
+            Employee.objects.create(
+                first_name="Имя",
+                last_name=f"Рассадкин{n}",
+                gender="M",
+                email=f"seat{n}@example.com",
+                position=position,
+            )
+            for n, position in enumerate(
+                ["Тестировщик", "Тестировщик", "Backend разработчик", "Менеджер"]
+            )
+        ]
+        assignment = reseat(
+            Employee.objects.filter(pk__in=[e.pk for e in employees]),
+            Workstation.objects.filter(location="Ряд"),
+        )
+        self.assertEqual(len(assignment), 4)
+        self.assertEqual(adjacency_conflicts(), [])
+        self.assertEqual(
+            Employee.objects.filter(workstation__in=desks).count(), len(employees)
+        )
+
+    def test_reseat_keeps_counters_exact(self):
+        old = [
+            Workstation.objects.create(
+                name="Старый", table_number=f"С{n}", location="Старый"
+            )
+            for n in range(3)
+        ]
+        for n in range(1, 4):
+            Workstation.objects.create(
+                name="Новый", table_number=f"Н{n}", location="Новый"
+            )
+        seats = [old[0], old[0], old[1], old[2]]
+        employees = [
+            Employee.objects.create(
+                first_name="Имя",
+                last_name=f"Переезд{n}",
+                gender="M",
+                email=f"move{n}@example.com",
+                position="Менеджер",
+                workstation=desk,
+            )
+            for n, desk in enumerate(seats)
+        ]
+        old[2].is_active = False
+        old[2].save()
+        reseat(
+            Employee.objects.filter(pk__in=[e.pk for e in employees[1:]]),
+            Workstation.objects.filter(location="Новый"),
+        )
+        counters = read_counters()
+        for name, value in compute_counters().items():
+            self.assertEqual(counters.get(name, 0), value, name)
+
+
+class ImportTests(TestCase):
+    HEADER = "email,first_name,last_name,gender,position,table_number,skills\n"
+
+    def setUp(self):
+        for number in ["30", "31"]:
+            Workstation.objects.create(
+                name=f"Стол {number}", table_number=number, location="Офис"
+            )
+        Employee.objects.create(
+            first_name="Имя",
+            last_name="Сидящий",
+            gender="M",
+            email="seated@example.com",
+            position="Тестировщик",
+            workstation=Workstation.objects.get(table_number="30"),
+        )
+
+    def records(self, rows):
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", encoding="utf-8", delete=False
+        ) as f:
+            f.write(self.HEADER + "".join(rows))
+        self.addCleanup(os.remove, f.name)
+        return read_records(f.name)
+
+    def test_error_report(self):
+        report = import_employees(
+            self.records(
+                [
+                    "new@example.com,Анна,Новая,F,Аналитик,,Python:3\n",
+                    "new@example.com,Анна,Дубль,F,Аналитик,,\n",
+                    "desk@example.com,Олег,Безстола,M,Аналитик,99,\n",
+                    "dev@example.com,Иван,Соседов,M,Backend разработчик,31,\n",
+                    "skill@example.com,Ян,Навыков,M,Аналитик,,Python:11\n",
+                ]
+            )
+        )
+        self.assertEqual((report.processed, report.created), (5, 1))
+        errors = dict(report.errors)
+        self.assertEqual(sorted(errors), [3, 4, 5, 6])
+        self.assertIn("Повторяющийся email", errors[3])
+        self.assertIn("Рабочее место 99 не найдено", errors[4])
+        # В сообщении — номера столов, а не их числовые индексы
+        self.assertIn("Стол 31 соседствует со столом 30", errors[5])
+        self.assertEqual(
+            EmployeeSkill.objects.get(employee__email="new@example.com").level, 3
+        )
+        self.assertEqual(read_counters()[TOTAL], 2)
+
+    def test_batch_failure_reported_once_per_line(self):
+        rows = [
+            "a@example.com,Анна,Первая,F,Аналитик,,\n",
+            "a@example.com,Анна,Дубль,F,Аналитик,,\n",
+            "b@example.com,Борис,Второй,M,Аналитик,,\n",
+        ]
+        with mock.patch.object(
+            EmployeeSkill.objects, "bulk_create", side_effect=IntegrityError("boom")
+        ):
+            report = import_employees(self.records(rows))
+        lines = [line for line, _ in report.errors]
+        self.assertEqual(sorted(lines), [2, 3, 4])
+        self.assertIn("Повторяющийся email", dict(report.errors)[3])
+        self.assertIn("Ошибка записи пачки", dict(report.errors)[4])
+        self.assertEqual(report.created, 0)
+        self.assertFalse(Employee.objects.filter(email="a@example.com").exists())
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Employee.objects.bulk_create(
+            Employee(
+                first_name="Имя",
+                # Повторяющиеся фамилии и даты: порядок решает id
+                last_name=f"Курсоров{n % 4}",
+                gender="M",
+                email=f"cursor{n}@example.com",
+                position="Аналитик",
+                hire_date=datetime.date(2020, 1, 1 + n % 3),
+            )
+            for n in range(23)
+        )
+
+    def walk(self, paginator):
+        pages, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            pages.append([employee.pk for employee in page])
+            if not page.has_next():
+                return pages, page
+            cursor = page.next_cursor
+
+    def test_round_trip(self):
+        for ordering in [("last_name", "first_name", "id"), ("-hire_date", "id")]:
+            queryset = Employee.objects.all()
+            paginator = KeysetPaginator(queryset, 5, ordering=ordering)
+            pages, last = self.walk(paginator)
+            expected = list(queryset.order_by(*ordering).values_list("pk", flat=True))
+            self.assertEqual([pk for page in pages for pk in page], expected)
+            self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+
+            # Назад по previous_cursor — те же страницы в обратном порядке
+            page, back = last, []
+            while page.has_previous():
+                page = paginator.page(page.previous_cursor)
+                back.append([employee.pk for employee in page])
+            self.assertEqual(back, pages[-2::-1])
+
+    def test_tampered_cursor(self):
+        url = reverse("employees:employee_list")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["page_obj"].next_cursor)
+        for sort, cursor in [
+            ("", "garbage!"),
+            ("", "eyJ"),
+            ("", encode_cursor(["x"], "next")),
+            ("", encode_cursor(["a", "b", "zz"], "next")),
+            ("tenure", encode_cursor(["zz", 1], "next")),
+        ]:
+            response = self.client.get(url, {"cursor": cursor, "sort": sort})
+            self.assertEqual(response.status_code, 404, cursor)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(encode_cursor([1, 2], "sideways"), 2)
+
+
+class VariantGenerationTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.media_root = directory.name
+        overrides = override_settings(MEDIA_ROOT=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def write(self, name, image, fmt):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        image.save(path, fmt)
+        return name
+
+    def test_transparent_image_is_not_upscaled(self):
+        name = self.write(
+            "employees/logo.png", Image.new("RGBA", (300, 150), (0, 0, 0, 0)), "PNG"
+        )
+        variants, width, height = generate_variants(self.media_root, name)
+        self.assertEqual((width, height), (300, 150))
+        self.assertEqual(
+            [(s["width"], s["height"]) for s in variants["sizes"]],
+            [(200, 100), (300, 150)],
+        )
+        for size in variants["sizes"]:
+            self.assertTrue(size["src"].endswith(".png"))
+            with Image.open(os.path.join(self.media_root, size["webp"])) as copy:
+                self.assertEqual(copy.format, "WEBP")
+        remove_variants(self.media_root, variants)
+        self.assertEqual(
+            os.listdir(os.path.join(self.media_root, "variants", "employees")), []
+        )
+
+    def test_command_fills_variants_and_bumps_owner(self):
+        employee = Employee.objects.create(
+            first_name="Имя",
+            last_name="Копиев",
+            gender="M",
+            email="variants@example.com",
+            position="Аналитик",
+        )
+        name = self.write("employees/a.jpg", Image.new("RGB", (500, 400)), "JPEG")
+        # Без on_commit: копии в фоне не создаются
+        image = EmployeeImage.objects.create(employee=employee, image=name)
+        version = Employee.objects.get(pk=employee.pk).cache_version
+        call_command("generate_image_variants", workers=1, stdout=io.StringIO())
+        image.refresh_from_db()
+        self.assertEqual(image.width, 500)
+        self.assertEqual(image.variants["source"], name)
+        self.assertGreater(Employee.objects.get(pk=employee.pk).cache_version, version)
+
+    def test_command_generates_shared_file_once(self):
+        names = [
+            self.write(f"employees/{n}.jpg", Image.new("RGB", (300, 200)), "JPEG")
+            for n in "abc"
+        ]
+        for n, name in enumerate([names[0], names[0], names[0], names[1], names[2]]):
+            employee = Employee.objects.create(
+                first_name="Имя",
+                last_name=f"Общий{n}",
+                gender="M",
+                email=f"shared{n}@example.com",
+                position="Аналитик",
+            )
+            EmployeeImage.objects.create(employee=employee, image=name)
+        out = io.StringIO()
+        call_command("generate_image_variants", workers=1, batch_size=2, stdout=out)
+        self.assertIn("файлов 3, изображений 5", out.getvalue())
+        self.assertEqual(
+            sorted(EmployeeImage.objects.values_list("variants__source", flat=True)),
+            sorted([names[0]] * 3 + names[1:]),
+        )
+
+        out = io.StringIO()
+        call_command("generate_image_variants", workers=1, stdout=out)
+        self.assertIn("файлов 0, изображений 0", out.getvalue())
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(
+            MEDIA_ROOT=directory.name, EMPLOYEE_IMAGE_VARIANT_WORKERS=0
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.employees = [
+            Employee.objects.create(
+                first_name="Ольга",
+                last_name=f"Фотова{n}",
+                gender="F",
+                email=f"foto{n}@example.com",
+                position="Аналитик",
+                hire_date=datetime.date(2022, 1, 1),
+            )
+            for n in range(2)
+        ]
+        buffer = io.BytesIO()
+        Image.new("RGB", (1000, 500), "teal").save(buffer, "JPEG")
+        storage = EmployeeImage._meta.get_field("image").storage
+        self.name = storage.save("photo.jpg", io.BytesIO(buffer.getvalue()))
+
+    def add_image(self, employee):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = EmployeeImage.objects.create(employee=employee, image=self.name)
+        return image
+
+    def version(self, employee):
+        return Employee.objects.get(pk=employee.pk).cache_version
+
+    def test_variants_bump_owner_version(self):
+        first, second = self.employees
+        with self.captureOnCommitCallbacks() as callbacks:
+            image = EmployeeImage.objects.create(employee=first, image=self.name)
+        version = self.version(first)
+        for callback in callbacks:
+            callback()
+        # Копии сохранены UPDATE — фрагменты владельца должны обновиться
+        self.assertGreater(self.version(first), version)
+        image.refresh_from_db()
+        self.assertEqual((image.width, image.height), (1000, 500))
+        self.assertEqual([s["width"] for s in image.variants["sizes"]], [200, 400, 800])
+        self.assertRegex(image.srcset, r"_400\.jpg\?v=[0-9a-f]{12} 400w")
+        self.assertRegex(image.webp_srcset, r"\.webp\?v=[0-9a-f]{12} ")
+
+        # Тот же файл у другого сотрудника получает готовые копии
+        copy = self.add_image(second)
+        self.assertEqual(copy.variants, image.variants)
+        self.assertEqual(EmployeeImage.objects.get(pk=copy.pk).variants, image.variants)
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("reader", password="x")
+        cls.skill = Skill.objects.create(name="Haskell")
+        cls.desk = Workstation.objects.create(
+            name="Стол", table_number="50", location="Офис"
+        )
+        cls.employee = Employee.objects.create(
+            first_name="Имя",
+            last_name="Фрагментов",
+            gender="M",
+            email="fragment@example.com",
+            position="Аналитик",
+            workstation=cls.desk,
+        )
+        EmployeeSkill.objects.create(employee=cls.employee, skill=cls.skill, level=1)
+
+    def setUp(self):
+        fragment_cache().clear()
+        self.client.force_login(self.user)
+
+    def page(self):
+        return self.client.get(reverse("employees:employee_list")).content.decode()
+
+    def test_related_changes_invalidate_cards(self):
+        self.assertIn("Haskell (Начальный)", self.page())
+        employee = Employee.objects.get(pk=self.employee.pk)
+        self.assertIsNotNone(fragment_cache().get(fragment_key("card", employee)))
+
+        self.skill.name = "OCaml"
+        self.skill.save()
+        self.assertIn("OCaml (Начальный)", self.page())
+
+        employee_skill = EmployeeSkill.objects.get(employee=self.employee)
+        employee_skill.level = 4
+        employee_skill.save()
+        self.assertIn("OCaml (Эксперт)", self.page())
+
+        self.desk.table_number = "51"
+        self.desk.save()
+        self.assertIn("<strong>Стол:</strong> 51", self.page())
+
+        EmployeeImage.objects.create(employee=self.employee, image="employees/x.jpg")
+        self.assertIn("employees/x.jpg", self.page())
+        self.assertGreater(
+            Employee.objects.get(pk=self.employee.pk).cache_version,
+            employee.cache_version,
+        )
+
+
+class CounterTests(TestCase):
+    def employee(self, n, position, workstation=None):
+        return Employee.objects.create(
+            first_name="Имя",
+            last_name=f"Счётов{n}",
+            gender="M",
+            email=f"count{n}@example.com",
+            position=position,
+            workstation=workstation,
+        )
+
+    def assertCountersExact(self):
+        expected = {k: v for k, v in compute_counters().items() if v}
+        actual = {k: v for k, v in read_counters().items() if v and k in expected}
+        self.assertEqual(actual, expected)
+
+    def test_deltas_follow_saves_and_moves(self):
+        first = Workstation.objects.create(name="A", table_number="1", location="A")
+        second = Workstation.objects.create(name="B", table_number="20", location="B")
+        tester = self.employee(1, "Тестировщик", first)
+        self.employee(2, "Менеджер")
+        self.assertCountersExact()
+        self.assertEqual(read_counters()["workstations:free"], 1)
+
+        tester.workstation = second
+        tester.position = "Аналитик"
+        tester.save()
+        self.assertCountersExact()
+        self.assertEqual(read_counters()["employees:location:B"], 1)
+        tester.delete()
+        second.delete()
+        self.assertCountersExact()
+        self.assertEqual(read_counters()[TOTAL], 1)
+
+    def test_reconcile_fixes_drift(self):
+        self.employee(1, "Тестировщик")
+        DirectoryCounter.objects.filter(name=TOTAL).update(value=42)
+        # Массовая операция без сигналов
+        Employee.objects.update(role=Employee.ROLE_DEVELOPER)
+        out = io.StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn(f"{TOTAL}: 42 -> 1", out.getvalue())
+        self.assertIn("employees:role:tester: 1 -> 0", out.getvalue())
+        self.assertCountersExact()
+        self.assertEqual(rebuild_counters(), {})
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(
+            MEDIA_ROOT=directory.name, EMPLOYEE_IMAGE_VARIANT_WORKERS=0
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.storage = EmployeeImage._meta.get_field("image").storage
+        self.employee = Employee.objects.create(
+            first_name="Пётр",
+            last_name="Файлов",
+            gender="M",
+            email="files@example.com",
+            position="Аналитик",
+            hire_date=datetime.date(2022, 1, 1),
+        )
+
+    def save(self, content=b"photo"):
+        return self.storage.save("photo.jpg", io.BytesIO(content))
+
+    def test_release_then_collect(self):
+        name = self.save()
+        self.assertEqual(name, self.save())
+        first = EmployeeImage.objects.create(employee=self.employee, image=name)
+        second = EmployeeImage.objects.create(employee=self.employee, image=name)
+        self.assertEqual(MediaFile.objects.get(name=name).refs, 2)
+
+        first.delete()
+        self.assertEqual(collect_orphans(grace=datetime.timedelta(0)), 0)
+        second.delete()
+        media_file = MediaFile.objects.get(name=name)
+        self.assertEqual(media_file.refs, 0)
+        self.assertIsNotNone(media_file.orphaned_at)
+        # Файл удаляется только после grace
+        self.assertEqual(collect_orphans(grace=datetime.timedelta(hours=1)), 0)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(collect_orphans(grace=datetime.timedelta(0)), 1)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(MediaFile.objects.exists())
+
+    def test_reupload_keeps_orphaned_file(self):
+        name = self.save()
+        EmployeeImage.objects.create(employee=self.employee, image=name).delete()
+        MediaFile.objects.update(
+            orphaned_at=timezone.now() - datetime.timedelta(days=1)
+        )
+        # Повторная загрузка того же файла продлевает ему срок
+        self.assertEqual(self.save(), name)
+        self.assertEqual(collect_orphans(grace=datetime.timedelta(hours=1)), 0)
+        image = EmployeeImage.objects.create(employee=self.employee, image=name)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(MediaFile.objects.get(name=name).refs, 1)
+        with image.image.open("rb") as f:
+            self.assertEqual(f.read(), b"photo")
+
+    def test_rehash_merges_duplicates(self):
+        photo = io.BytesIO()
+        Image.new("RGB", (300, 200), (200, 30, 30)).save(photo, "JPEG")
+        legacy = ["employees/old1.jpg", "employees/old2.jpg"]
+        for name in legacy:
+            path = os.path.join(settings.MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(photo.getvalue())
+        stale = os.path.join(
+            settings.MEDIA_ROOT, "variants", "employees", "old1_200.jpg"
+        )
+        os.makedirs(os.path.dirname(stale))
+        open(stale, "wb").close()
+        images = [
+            EmployeeImage.objects.create(employee=self.employee, image=name)
+            for name in [legacy[0], legacy[0], legacy[1]]
+        ]
+
+        out = io.StringIO()
+        call_command("rehash_media", workers=1, stdout=out)
+        self.assertIn("Перенесено: 2", out.getvalue())
+        names = {image.image.name for image in EmployeeImage.objects.all()}
+        self.assertEqual(len(names), 1)
+        [name] = names
+        self.assertTrue(is_hashed_name(name))
+        self.assertEqual(MediaFile.objects.get(name=name).refs, 3)
+        # Старые имена остаются без ссылок до collect_orphans
+        self.assertEqual(
+            list(
+                MediaFile.objects.filter(name__in=legacy).values_list("refs", flat=True)
+            ),
+            [0, 0],
+        )
+        for path in legacy:
+            self.assertFalse(self.storage.exists(path))
+        self.assertFalse(os.path.exists(stale))
+        # Копии созданы заново для нового имени
+        for image in images:
+            image.refresh_from_db()
+            self.assertEqual(image.variants["source"], name)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("exporter", password="x")
+        desk = Workstation.objects.create(
+            name="Стол", table_number="40", location="Офис"
+        )
+        python = Skill.objects.create(name="Python")
+        for n in range(3):
+            employee = Employee.objects.create(
+                first_name="Имя",
+                last_name=f"Выгрузкин{n}",
+                gender="M",
+                email=f"export{n}@example.com",
+                position="Аналитик",
+                hire_date=datetime.date(2020, 1, 1),
+                workstation=desk if n == 0 else None,
+            )
+            if n < 2:
+                EmployeeSkill.objects.create(employee=employee, skill=python, level=4)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, **params):
+        response = self.client.get(reverse("employees:employee_export"), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def test_ndjson_gzip(self):
+        response, body = self.get(format="ndjson", gzip="1", skill="python")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn("employees.ndjson.gz", response["Content-Disposition"])
+        records = [
+            json.loads(line) for line in gzip.decompress(body).decode().splitlines()
+        ]
+        self.assertEqual(
+            [r["last_name"] for r in records], ["Выгрузкин0", "Выгрузкин1"]
+        )
+        self.assertEqual(records[0]["table_number"], "40")
+        self.assertEqual(records[0]["skills"][0]["level_display"], "Эксперт")
+
+    def test_csv_and_command(self):
+        _, body = self.get()
+        rows = list(csv.DictReader(io.StringIO(body.decode("utf-8-sig"))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["location"], "Офис")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "employees.csv.gz")
+            call_command("export_employees", "--gzip", "-o", path, location="Офис")
+            with gzip.open(path, "rt", encoding="utf-8-sig") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([row["email"] for row in rows], ["export0@example.com"])
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse("employees:employee_export"))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,341 @@
+"""
+Загрузка фотографий сотрудников частями с продолжением после обрыва.
+
+POST /api/uploads/ создаёт загрузку по сотруднику, имени, размеру и
+SHA-256 файла, а с {"uploads": [...]} — сразу пакет загрузок для многих
+сотрудников. Части отправляются запросами PATCH с заголовком Upload-Offset:
+тело читается из потока кусками по READ_SIZE, минуя обработчики загрузки
+Django, и после проверки смещения дописывается в файл
+EMPLOYEE_UPLOAD_DIR/<id>.part; воркер занят только на время одной части,
+а не всей передачи. HEAD/GET
+возвращают принятое смещение, с которого передачу можно продолжить.
+
+После последнего байта сверяется контрольная сумма, Pillow проверяет
+изображение, файл переносится в хранилище с адресацией по содержимому
+(storage.py) без копирования и прикрепляется к сотруднику новым
+EmployeeImage со следующим order; копии создаются в фоне (tasks.py).
+Брошенные загрузки удаляет expire_uploads (команда collect_media).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.validators import get_available_image_extensions
+from django.db import transaction
+from django.db.models import Max
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views import View
+from PIL import Image
+
+from .models import Employee, EmployeeImage, ImageUpload
+from .storage import content_hash
+
+READ_SIZE = 64 * 1024
+MAX_BATCH = 500
+OFFSET_HEADER = "Upload-Offset"
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def part_path(upload):
+    return os.path.join(settings.EMPLOYEE_UPLOAD_DIR, f"{upload.pk}.part")
+
+
+def remove_part(upload):
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def clean_spec(spec, index=None):
+    """Поля ImageUpload из описания загрузки {employee, filename, size, sha256}"""
+    prefix = f"uploads[{index}]: " if index is not None else ""
+    if not isinstance(spec, dict):
+        raise UploadError(f"{prefix}ожидается объект")
+    try:
+        employee_id = int(spec["employee"])
+        size = int(spec["size"])
+        filename = str(spec["filename"])
+        sha256 = str(spec["sha256"]).lower()
+    except (KeyError, TypeError, ValueError):
+        raise UploadError(f"{prefix}нужны employee, filename, size и sha256")
+    ext = os.path.splitext(filename)[1].lower().lstrip(".")
+    if ext not in get_available_image_extensions():
+        raise UploadError(f"{prefix}неподдерживаемое расширение файла: {filename}")
+    if not 0 < size <= settings.EMPLOYEE_UPLOAD_MAX_SIZE:
+        raise UploadError(
+            f"{prefix}размер должен быть от 1 до "
+            f"{settings.EMPLOYEE_UPLOAD_MAX_SIZE} байт"
+        )
+    if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+        raise UploadError(f"{prefix}некорректный sha256")
+    return {
+        "employee_id": employee_id,
+        "filename": os.path.basename(filename)[:255],
+        "size": size,
+        "sha256": sha256,
+    }
+
+
+def create_uploads(specs, batch=False):
+    """
+    Создаёт загрузки по списку описаний одним INSERT. Если хотя бы одно
+    описание некорректно, не создаётся ни одной.
+    """
+    if len(specs) > MAX_BATCH:
+        raise UploadError(f"Не больше {MAX_BATCH} загрузок за запрос")
+    fields = [
+        clean_spec(spec, index if batch else None) for index, spec in enumerate(specs)
+    ]
+    ids = {item["employee_id"] for item in fields}
+    missing = ids - set(
+        Employee.objects.filter(pk__in=ids).values_list("pk", flat=True)
+    )
+    if missing:
+        raise UploadError(
+            f"Сотрудники не найдены: {', '.join(map(str, sorted(missing)))}"
+        )
+    return ImageUpload.objects.bulk_create(ImageUpload(**item) for item in fields)
+
+
+def write_chunk(upload, offset, stream, length):
+    """
+    Дописывает в файл загрузки length байт из stream с позиции offset.
+
+    Часть сначала читается во временный файл, затем диапазон
+    [offset, offset + принято) занимается условным UPDATE и только после
+    этого копируется в файл загрузки — в той же транзакции, так что
+    следующая часть ждёт, пока запись не закончится. Повтор уже принятой
+    или параллельная часть с тем же offset получает 409 и файл не трогает.
+    Если клиент оборвал передачу, принятая часть сохраняется. После
+    последней части загрузка завершается (finish_upload).
+    """
+    if upload.complete:
+        raise UploadError("Загрузка уже завершена", 409)
+    if offset != upload.received:
+        raise UploadError(
+            f"Ожидается {OFFSET_HEADER}: {upload.received}, получено {offset}", 409
+        )
+    if offset + length > upload.size:
+        raise UploadError("Часть выходит за объявленный размер файла", 413)
+
+    os.makedirs(settings.EMPLOYEE_UPLOAD_DIR, exist_ok=True)
+    with tempfile.TemporaryFile(dir=settings.EMPLOYEE_UPLOAD_DIR) as chunk:
+        written = 0
+        while written < length:
+            data = stream.read(min(READ_SIZE, length - written))
+            if not data:
+                break
+            chunk.write(data)
+            written += len(data)
+        chunk.seek(0)
+
+        received = offset + written
+        with transaction.atomic():
+            updated = ImageUpload.objects.filter(
+                pk=upload.pk, received=offset, image__isnull=True
+            ).update(received=received, updated_at=timezone.now())
+            if not updated:
+                upload.refresh_from_db()
+                raise UploadError("Загрузку одновременно продолжил другой запрос", 409)
+            # Диапазон занят этим запросом: пишется только он, без truncate —
+            # хвост оборванной попытки перезапишут следующие части
+            fd = os.open(part_path(upload), os.O_WRONLY | os.O_CREAT, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.seek(offset)
+                shutil.copyfileobj(chunk, f, READ_SIZE)
+
+    upload.received = received
+    if received == upload.size:
+        finish_upload(upload)
+    return upload
+
+
+def reject(upload, message):
+    """Сбрасывает загрузку на начало: файл нужно отправить заново"""
+    remove_part(upload)
+    ImageUpload.objects.filter(pk=upload.pk).update(
+        received=0, updated_at=timezone.now()
+    )
+    upload.received = 0
+    raise UploadError(message, 422)
+
+
+def finish_upload(upload):
+    """Проверяет файл и прикрепляет его к сотруднику новым EmployeeImage"""
+    path = part_path(upload)
+    with open(path, "rb") as f:
+        digest = content_hash(f)
+    if digest != upload.sha256:
+        reject(upload, "Контрольная сумма не совпадает")
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        # Pillow бросает разные исключения на повреждённых файлах
+        reject(upload, "Файл не является изображением")
+
+    storage = EmployeeImage._meta.get_field("image").storage
+    name = storage.save_local(path, upload.filename, digest)
+    with transaction.atomic():
+        last = EmployeeImage.objects.filter(employee_id=upload.employee_id).aggregate(
+            last=Max("order")
+        )["last"]
+        image = EmployeeImage(
+            employee_id=upload.employee_id,
+            image=name,
+            order=0 if last is None else last + 1,
+        )
+        image.save()
+        ImageUpload.objects.filter(pk=upload.pk).update(
+            image=image, updated_at=timezone.now()
+        )
+    upload.image = image
+    return image
+
+
+def cancel_upload(upload):
+    remove_part(upload)
+    upload.delete()
+
+
+def expire_uploads(max_age=None):
+    """
+    Удаляет загрузки и файлы частей, не менявшиеся дольше max_age, в том
+    числе файлы загрузок, удалённых вместе с сотрудником. Возвращает
+    число удалённых загрузок.
+    """
+    if max_age is None:
+        max_age = timedelta(seconds=settings.EMPLOYEE_UPLOAD_EXPIRE_SECONDS)
+    cutoff = time.time() - max_age.total_seconds()
+    directory = settings.EMPLOYEE_UPLOAD_DIR
+    if os.path.isdir(directory):
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".part") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+    removed, _ = ImageUpload.objects.filter(
+        updated_at__lt=timezone.now() - max_age
+    ).delete()
+    return removed
+
+
+def upload_data(upload):
+    return {
+        "id": str(upload.pk),
+        "url": reverse("employees:api_upload", args=[upload.pk]),
+        "employee": upload.employee_id,
+        "filename": upload.filename,
+        "size": upload.size,
+        "offset": upload.received,
+        "complete": upload.complete,
+        "image": upload.image_id,
+    }
+
+
+class UploadApiMixin:
+    """Права на добавление фотографий и ошибки в JSON"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.error(UploadError("Требуется вход", 401))
+        if not request.user.has_perm("employees.add_employeeimage"):
+            return self.error(UploadError("Недостаточно прав", 403))
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except UploadError as e:
+            return self.error(e)
+
+    def error(self, error):
+        return JsonResponse(
+            {"error": str(error)},
+            status=error.status,
+            json_dumps_params={"ensure_ascii": False},
+        )
+
+    def respond(self, data, status=200):
+        response = JsonResponse(
+            data, status=status, json_dumps_params={"ensure_ascii": False}
+        )
+        response["Cache-Control"] = "no-store"
+        return response
+
+
+class UploadListApiView(UploadApiMixin, View):
+    http_method_names = ["post", "options"]
+
+    def post(self, request):
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            raise UploadError("Тело запроса должно быть JSON")
+        batch = isinstance(payload, dict) and "uploads" in payload
+        specs = payload["uploads"] if batch else [payload]
+        if not isinstance(specs, list):
+            raise UploadError("uploads должен быть списком")
+        uploads = create_uploads(specs, batch=batch)
+        data = {"chunk_size": settings.EMPLOYEE_UPLOAD_CHUNK_SIZE}
+        if batch:
+            data["uploads"] = [upload_data(upload) for upload in uploads]
+            return self.respond(data, status=201)
+        data.update(upload_data(uploads[0]))
+        response = self.respond(data, status=201)
+        response["Location"] = data["url"]
+        return response
+
+
+class UploadApiView(UploadApiMixin, View):
+    http_method_names = ["get", "head", "patch", "delete", "options"]
+
+    def get_upload(self, pk):
+        try:
+            return ImageUpload.objects.get(pk=pk)
+        except ImageUpload.DoesNotExist:
+            raise Http404
+
+    def respond_upload(self, upload):
+        response = self.respond(upload_data(upload))
+        response[OFFSET_HEADER] = upload.received
+        response["Upload-Length"] = upload.size
+        return response
+
+    def get(self, request, pk):
+        return self.respond_upload(self.get_upload(pk))
+
+    def patch(self, request, pk):
+        try:
+            offset = int(request.headers[OFFSET_HEADER])
+        except (KeyError, ValueError):
+            raise UploadError(f"Нужен заголовок {OFFSET_HEADER}")
+        try:
+            length = int(request.META["CONTENT_LENGTH"])
+        except (KeyError, ValueError):
+            raise UploadError("Нужен заголовок Content-Length", 411)
+        if length > settings.EMPLOYEE_UPLOAD_CHUNK_SIZE:
+            raise UploadError(
+                f"Часть больше {settings.EMPLOYEE_UPLOAD_CHUNK_SIZE} байт", 413
+            )
+        upload = self.get_upload(pk)
+        try:
+            write_chunk(upload, offset, request, length)
+        except UploadError as e:
+            # Текущее смещение нужно клиенту, чтобы продолжить
+            response = self.error(e)
+            response[OFFSET_HEADER] = upload.received
+            return response
+        return self.respond_upload(upload)
+
+    def delete(self, request, pk):
+        cancel_upload(self.get_upload(pk))
+        return HttpResponse(status=204)
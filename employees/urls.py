@@ -1,10 +1,44 @@
+from django.conf import settings
 from django.urls import path
-from .views import HomeView, EmployeeListView, EmployeeDetailView
+
+from .api import EmployeeApiView, SkillApiView, WorkstationApiView
+from .uploads import UploadApiView, UploadListApiView
+from .views import (
+    EmployeeDetailView,
+    EmployeeExportView,
+    EmployeeListView,
+    EmployeeSearchView,
+    HomeView,
+    SkillQueryView,
+)
+
+if settings.EMPLOYEE_ASYNC_VIEWS:
+    from .async_views import AsyncEmployeeApiView as EmployeeApiView
+    from .async_views import AsyncEmployeeDetailView as EmployeeDetailView
+    from .async_views import AsyncEmployeeListView as EmployeeListView
+    from .async_views import AsyncHomeView as HomeView
+    from .async_views import AsyncSkillApiView as SkillApiView
+    from .async_views import AsyncWorkstationApiView as WorkstationApiView
 
 app_name = "employees"
 
 urlpatterns = [
     path("", HomeView.as_view(), name="home"),
     path("employees/", EmployeeListView.as_view(), name="employee_list"),
+    path("employees/search/", EmployeeSearchView.as_view(), name="employee_search"),
+    path("employees/skills/", SkillQueryView.as_view(), name="skill_query"),
+    path("employees/export/", EmployeeExportView.as_view(), name="employee_export"),
     path("employees/<int:pk>/", EmployeeDetailView.as_view(), name="employee_detail"),
+    path("api/employees/", EmployeeApiView.as_view(), name="api_employees"),
+    path("api/employees/<int:pk>/", EmployeeApiView.as_view(), name="api_employee"),
+    path("api/workstations/", WorkstationApiView.as_view(), name="api_workstations"),
+    path(
+        "api/workstations/<int:pk>/",
+        WorkstationApiView.as_view(),
+        name="api_workstation",
+    ),
+    path("api/skills/", SkillApiView.as_view(), name="api_skills"),
+    path("api/skills/<int:pk>/", SkillApiView.as_view(), name="api_skill"),
+    path("api/uploads/", UploadListApiView.as_view(), name="api_uploads"),
+    path("api/uploads/<uuid:pk>/", UploadApiView.as_view(), name="api_upload"),
 ]
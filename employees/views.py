@@ -1,90 +1,379 @@
-from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.views.generic import ListView, DetailView
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.db.models import Prefetch
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
+from django.utils.http import urlencode
+from django.views import View
+from django.views.generic import DetailView, ListView
+
+from .budgets import QueryBudgetMixin
+from .components import template_engine
+from .counters import TOTAL, counter_value, directory_summary
+from .export import CONTENT_TYPES, export_chunks, filter_employees
+from .fragments import render_fragments
+from .importing import parse_level
 from .models import Employee, EmployeeImage, EmployeeSkill, Skill
+from .pagination import InvalidCursor, KeysetPaginator
+from .search import search_employees
+from .skill_index import EmployeeIds, location_bitmap, match_bitmap
+
+
+def employee_prefetch():
+    """Галерея и навыки сотрудника для prefetch_related"""
+    return [
+        Prefetch("images", queryset=EmployeeImage.objects.order_by("order")),
+        Prefetch(
+            "employeeskill_set",
+            queryset=EmployeeSkill.objects.select_related("skill"),
+        ),
+    ]
+
+
+def employee_queryset():
+    """Сотрудники с галереей и навыками, загружаемыми через prefetch"""
+    return Employee.objects.prefetch_related(*employee_prefetch())
+
+
+def summary_context(summary):
+    """Сводка справочника для шаблона главной страницы"""
+    return {
+        "summary": summary,
+        "total_employees": summary["total"],
+        "role_counts": [
+            (label, summary["roles"].get(role, 0))
+            for role, label in Employee.ROLE_CHOICES
+        ],
+    }
+
+
+# Сортировки списка сотрудников: ключ курсорной пагинации
+LIST_ORDERINGS = {
+    "": ["last_name", "first_name", "id"],
+    # Сначала недавно принятые
+    "tenure": ["-hire_date", "-id"],
+    "-tenure": ["hire_date", "id"],
+}
+TENURE_HISTOGRAM_TIMEOUT = 10 * 60
+
+
+def list_options(params):
+    """
+    Фильтр по стажу (?tenure_min=, ?tenure_max= — годы) и сортировка
+    (?sort=tenure, -tenure) списка сотрудников; Http404 при ошибке.
+    """
+    try:
+        options = {
+            name: int(params[name]) if params.get(name) else None
+            for name in ("tenure_min", "tenure_max")
+        }
+    except ValueError:
+        raise Http404("Некорректный фильтр по стажу")
+    if any(value is not None and value < 0 for value in options.values()):
+        raise Http404("Некорректный фильтр по стажу")
+    options["sort"] = params.get("sort", "")
+    if options["sort"] not in LIST_ORDERINGS:
+        raise Http404("Некорректная сортировка")
+    return options
+
+
+def list_queryset(options):
+    """Сотрудники списка со стажем, отфильтрованные по options"""
+    return (
+        Employee.objects.select_related("workstation")
+        .with_tenure()
+        .tenure_between(options["tenure_min"], options["tenure_max"])
+    )
+
+
+def tenure_histogram_key():
+    return f"employees:tenure_histogram:{timezone.localdate().isoformat()}"
 
 
-class HomeView(ListView):
+def tenure_histogram():
+    """Интервалы стажа для фильтра списка; кешируются на 10 минут"""
+    return cache.get_or_set(
+        tenure_histogram_key(),
+        Employee.objects.tenure_histogram,
+        TENURE_HISTOGRAM_TIMEOUT,
+    )
+
+
+def list_context(request, options, histogram):
+    """Фильтры, интервалы стажа и параметры ссылок пагинации списка"""
+    params = request.GET.copy()
+    for name in ("cursor", "page"):
+        params.pop(name, None)
+    return {
+        "options": options,
+        "filtered": options["tenure_min"] is not None
+        or options["tenure_max"] is not None,
+        "tenure_histogram": histogram,
+        "query_string": params.urlencode(),
+        "sort_choices": [
+            ("", "По фамилии"),
+            ("tenure", "Сначала новые сотрудники"),
+            ("-tenure", "Сначала с большим стажем"),
+        ],
+    }
+
+
+class EmployeeTemplateMixin:
+    """Страницы сотрудников рендерит движок EMPLOYEE_TEMPLATE_ENGINE"""
+
+    @property
+    def template_engine(self):
+        return template_engine()
+
+
+class HomeView(EmployeeTemplateMixin, QueryBudgetMixin, ListView):
     model = Employee
     template_name = "employees/home.html"
     context_object_name = "employees"
+    # сотрудники, счётчики, галерея и навыки
+    query_budget = 4
 
     def get_queryset(self):
-        # Получаем 4 последних сотрудника по дате приёма
-        return Employee.objects.prefetch_related(
-            Prefetch("images", queryset=EmployeeImage.objects.order_by("order")),
-            Prefetch(
-                "employeeskill_set",
-                queryset=EmployeeSkill.objects.select_related("skill"),
-            ),
-        ).order_by("-hire_date")[
-            :4
-        ]  # 4 последних по дате приёма
+        # Получаем 4 последних сотрудника по дате приёма; галерея и навыки
+        # загружаются только для карточек не из кеша
+        queryset = Employee.objects.select_related("workstation")
+        return queryset.order_by("-hire_date")[:4]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Добавляем общее количество сотрудников
-        context["total_employees"] = Employee.objects.count()
+        context["cards"] = render_fragments(
+            "home_card",
+            "employees/_home_card.html",
+            context["employees"],
+            prefetch=employee_prefetch(),
+        )
+        # Общее количество сотрудников и сводка — из счётчиков справочника
+        context.update(summary_context(directory_summary()))
         return context
 
 
-class EmployeeListView(ListView):
+class EmployeeListView(EmployeeTemplateMixin, QueryBudgetMixin, ListView):
     model = Employee
     template_name = "employees/employee_list.html"
     context_object_name = "employees"
     paginate_by = 10
+    # страница (+ COUNT в режиме ?page=), счётчик, интервалы стажа,
+    # галерея и навыки
+    query_budget = 6
+    # Курсорная пагинация по ключу сортировки (LIST_ORDERINGS);
+    # ?page=N — старый режим
+    cursor_ordering = LIST_ORDERINGS[""]
+    show_total_count = True
 
     def get_queryset(self):
-        return Employee.objects.prefetch_related(
-            Prefetch("images", queryset=EmployeeImage.objects.order_by("order")),
-            Prefetch(
-                "employeeskill_set",
-                queryset=EmployeeSkill.objects.select_related("skill"),
-            ),
-        ).all()
+        self.options = list_options(self.request.GET)
+        self.cursor_ordering = LIST_ORDERINGS[self.options["sort"]]
+        # Галерея и навыки загружаются только для карточек не из кеша
+        return list_queryset(self.options).order_by(*self.cursor_ordering)
+
+    def uses_cursor(self):
+        return self.page_kwarg not in self.request.GET
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_cursor():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, ordering=self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise Http404("Некорректный курсор страницы")
+        return paginator, page, page.object_list, page.has_other_pages()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Не нужно добавлять work_experience_days в объекты, так как это свойство
-        # Оно уже доступно через employee.work_experience_days в шаблоне
+        context["cards"] = render_fragments(
+            "card",
+            "employees/_employee_card.html",
+            context["page_obj"],
+            prefetch=employee_prefetch(),
+        )
+        context["cursor_pagination"] = self.uses_cursor()
+        context.update(list_context(self.request, self.options, tenure_histogram()))
+        if (
+            context["cursor_pagination"]
+            and self.show_total_count
+            and not context["filtered"]
+        ):
+            context["total_count"] = counter_value(TOTAL)
+        # Стаж карточек — из аннотации tenure (Employee.work_experience_days)
         return context
 
 
-class EmployeeDetailView(DetailView):
+class EmployeeDetailView(EmployeeTemplateMixin, QueryBudgetMixin, DetailView):
     model = Employee
     template_name = "employees/employee_detail.html"
     context_object_name = "employee"
+    # сотрудник с рабочим местом, галерея и навыки
+    query_budget = 3
 
     def get_queryset(self):
-        return Employee.objects.prefetch_related(
-            Prefetch("images", queryset=EmployeeImage.objects.order_by("order")),
-            Prefetch(
-                "employeeskill_set",
-                queryset=EmployeeSkill.objects.select_related("skill"),
-            ),
-        ).all()
+        return Employee.objects.select_related("workstation")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Блоки карточки берутся из кеша; галерея и навыки загружаются
+        # только при его промахе
+        context["detail_fragment"] = render_fragments(
+            "detail",
+            "employees/_employee_detail.html",
+            [context["employee"]],
+            prefetch=employee_prefetch(),
+        )[0]
+        return context
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        return login_required(view, login_url="/admin/login/")
+
+
+class EmployeeSearchView(QueryBudgetMixin, ListView):
+    """Полнотекстовый поиск: ?q=...&page=N, результаты по релевантности"""
+
+    template_name = "employees/employee_search.html"
+    context_object_name = "employees"
+    paginate_by = 10
+    # количество, id страницы, сотрудники, галерея и навыки
+    query_budget = 5
+
+    def get_queryset(self):
+        return search_employees(
+            self.request.GET.get("q", ""),
+            Employee.objects.select_related("workstation"),
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        employee = context["employee"]
+        context["query"] = self.request.GET.get("q", "")
+        context["query_string"] = urlencode({"q": context["query"]})
+        context["cards"] = render_fragments(
+            "card",
+            "employees/_employee_card.html",
+            context["page_obj"],
+            prefetch=employee_prefetch(),
+        )
+        return context
+
 
-        # Получаем все изображения сотрудника
-        all_images = employee.images.all()
+def parse_skill_conditions(values):
+    """{навык: мин. уровень} из параметров вида "Python:3" или "Django:Средний" """
+    conditions = {}
+    for value in values:
+        name, _, level = value.partition(":")
+        if name.strip():
+            conditions[name.strip()] = parse_level(level) if level.strip() else 1
+    return conditions
 
-        # Первое изображение - заглавное фото
-        first_image = all_images.first() if all_images.exists() else None
 
-        # Остальные изображения для галереи (без первого)
-        gallery_images = all_images[1:] if all_images.count() > 1 else []
+class SkillQueryView(QueryBudgetMixin, ListView):
+    """
+    Подбор сотрудников по навыкам через индекс навыков:
+    ?skill=Python:3&skill=Django:2 — все навыки, ?any=Go&any=Rust&min=1 —
+    не менее min из перечисленных, ?location= — местоположение,
+    ?format=json — ответ в JSON.
+    """
 
-        # Добавляем в контекст
-        context["first_image"] = first_image
-        context["gallery_images"] = gallery_images
-        # work_experience_days доступен через свойство employee.work_experience_days
+    template_name = "employees/skill_query.html"
+    context_object_name = "employees"
+    paginate_by = 20
+    # поколение индекса, его перестройка, навыки, местоположение, страница,
+    # галерея и навыки карточек
+    query_budget = 7
 
+    def get_queryset(self):
+        params = self.request.GET
+        try:
+            self.all_of = parse_skill_conditions(params.getlist("skill"))
+            self.any_of = parse_skill_conditions(params.getlist("any"))
+            min_match = int(params.get("min") or 1)
+        except (ValidationError, ValueError):
+            raise Http404("Некорректные условия подбора")
+        bitmap = match_bitmap(self.all_of, self.any_of, min_match)
+
+        location = params.get("location")
+        if location and bitmap:
+            bitmap &= location_bitmap(location)
+        return EmployeeIds(bitmap)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page_ids = list(context["page_obj"])
+        found = Employee.objects.select_related("workstation").in_bulk(page_ids)
+        employees = [found[pk] for pk in page_ids if pk in found]
+        context["employees"] = employees
+        if self.request.GET.get("format") != "json":
+            context["cards"] = render_fragments(
+                "card",
+                "employees/_employee_card.html",
+                employees,
+                prefetch=employee_prefetch(),
+            )
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        context["query_string"] = params.urlencode()
+        context["skill_values"] = params.getlist("skill") + [""]
+        context["any_values"] = params.getlist("any") + [""]
+        context["min_match"] = params.get("min", 1)
+        context["location"] = params.get("location", "")
         return context
 
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get("format") != "json":
+            return super().render_to_response(context, **response_kwargs)
+        return JsonResponse(
+            {
+                "count": context["paginator"].count,
+                "page": context["page_obj"].number,
+                "results": [
+                    {
+                        "id": employee.pk,
+                        "name": str(employee),
+                        "position": employee.position,
+                        "table_number": employee.table_number,
+                    }
+                    for employee in context["employees"]
+                ],
+            },
+            json_dumps_params={"ensure_ascii": False},
+        )
+
+
+class EmployeeExportView(View):
+    """Потоковая выгрузка справочника: ?format=csv|ndjson&gzip=1"""
+
+    def get(self, request):
+        fmt = request.GET.get("format", "csv")
+        if fmt not in CONTENT_TYPES:
+            fmt = "csv"
+        compress = request.GET.get("gzip") in ("1", "true")
+
+        queryset = filter_employees(
+            employee_queryset().select_related("workstation"),
+            location=request.GET.get("location"),
+            position=request.GET.get("position"),
+            skills=request.GET.getlist("skill"),
+        )
+        response = StreamingHttpResponse(
+            export_chunks(
+                queryset,
+                fmt=fmt,
+                compress=compress,
+                build_url=request.build_absolute_uri,
+            ),
+            content_type="application/gzip" if compress else CONTENT_TYPES[fmt],
+        )
+        filename = f"employees.{fmt}" + (".gz" if compress else "")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
     @classmethod
     def as_view(cls, **initkwargs):
         view = super().as_view(**initkwargs)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "workspace1.settings")
+# Под ASGI страницы и API обслуживают асинхронные представления
+os.environ.setdefault("EMPLOYEE_ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
@@ -0,0 +1,93 @@
+"""
+Профили базы данных: настройки SQLite, постоянные соединения и
+маршрутизация чтения на реплику.
+
+Профиль выбирается переменной окружения DJANGO_DB_PROFILE
+("development" по умолчанию или "production"). В production база
+переводится в WAL (читатели не ждут писателя), PRAGMA из SQLITE_PRAGMAS
+выполняются при каждом новом соединении (сигнал connection_created),
+соединения живут CONN_MAX_AGE секунд, а чтение идёт через отдельное
+соединение "replica" к тому же файлу в режиме query_only.
+"""
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    # 256 МБ отображения файла и 64 МБ страничного кеша на соединение
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+
+def databases(profile, name):
+    """Словарь DATABASES для профиля и файла базы name"""
+    primary = {"ENGINE": "django.db.backends.sqlite3", "NAME": name}
+    if profile != "production":
+        return {"default": primary}
+    primary.update(CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True)
+    return {
+        "default": primary,
+        "replica": {
+            **primary,
+            # В тестах реплика — та же тестовая база
+            "TEST": {"MIRROR": "default"},
+        },
+    }
+
+
+def sqlite_pragmas(profile):
+    """{alias: {pragma: значение}} для профиля"""
+    if profile != "production":
+        return {}
+    return {
+        "default": PRODUCTION_PRAGMAS,
+        "replica": {**PRODUCTION_PRAGMAS, "query_only": "ON"},
+    }
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {}).get(connection.alias)
+    if not pragmas:
+        return
+    # Напрямую через sqlite3: PRAGMA не попадают в счётчики запросов
+    for name, value in pragmas.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+class PrimaryReplicaRouter:
+    """
+    Чтение — через реплику, запись — в основную базу. Внутри транзакции
+    основной базы чтение тоже идёт в неё: реплика не видит незакоммиченных
+    изменений.
+    """
+
+    primary = "default"
+    replica = "replica"
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if connections[self.primary].in_atomic_block:
+            return self.primary
+        return self.replica
+
+    def db_for_write(self, model, **hints):
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Обе базы — один и тот же файл
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == self.primary
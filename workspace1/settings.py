@@ -13,20 +13,52 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
+from workspace1.db import databases, sqlite_pragmas
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Профиль настроек: development (по умолчанию) или production — без
+# debug_toolbar, с кешем шаблонов и ManifestStaticFilesStorage; секреты,
+# хосты и пути production берёт из переменных окружения
+PROFILE = os.environ.get("DJANGO_PROFILE", "development")
+if PROFILE not in ("development", "production"):
+    raise ImproperlyConfigured(f"Неизвестный DJANGO_PROFILE: {PROFILE}")
+PRODUCTION = PROFILE == "production"
+
+
+def env_list(name, default=""):
+    return [
+        item.strip()
+        for item in os.environ.get(name, default).split(",")
+        if item.strip()
+    ]
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = "django-insecure-+6zw%t9)g0bii)43crl9ttb=k&!q4w3=)^&41&+wx!g=2osk2r"
+if PRODUCTION:
+    try:
+        SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+    except KeyError:
+        raise ImproperlyConfigured("В production нужен DJANGO_SECRET_KEY")
+else:
+    SECRET_KEY = "django-insecure-+6zw%t9)g0bii)43crl9ttb=k&!q4w3=)^&41&+wx!g=2osk2r"
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = not PRODUCTION
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = env_list("DJANGO_ALLOWED_HOSTS")
+CSRF_TRUSTED_ORIGINS = env_list("DJANGO_CSRF_TRUSTED_ORIGINS")
+if PRODUCTION:
+    # Сайт за HTTPS-прокси: cookie только по защищённому соединению
+    SESSION_COOKIE_SECURE = CSRF_COOKIE_SECURE = (
+        os.environ.get("DJANGO_SECURE_COOKIES", "1") == "1"
+    )
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -44,10 +76,10 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "workstations.apps.WorkstationsConfig",
     "employees",
-    "debug_toolbar",
 ]
 
 MIDDLEWARE = [
+    "employees.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -55,16 +87,19 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
 ]
 
+if not PRODUCTION:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.append("debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "workspace1.urls"
 
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, "templates")],
-        "APP_DIRS": True,
+        "APP_DIRS": not PRODUCTION,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -77,19 +112,87 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    # Шаблоны компилируются один раз на процесс и не перечитываются с диска
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        )
+    ]
+
+# Движок шаблонов страниц сотрудников: django или jinja2 (каталог jinja2/,
+# окружение в employees/components.py; нужен пакет jinja2)
+EMPLOYEE_TEMPLATE_ENGINE = os.environ.get("EMPLOYEE_TEMPLATE_ENGINE", "django")
+if EMPLOYEE_TEMPLATE_ENGINE == "jinja2":
+    TEMPLATES.append(
+        {
+            "BACKEND": "django.template.backends.jinja2.Jinja2",
+            "NAME": "jinja2",
+            "DIRS": [os.path.join(BASE_DIR, "jinja2")],
+            "APP_DIRS": False,
+            "OPTIONS": {"environment": "employees.components.environment"},
+        }
+    )
+
 WSGI_APPLICATION = "workspace1.wsgi.application"
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# Профиль базы (workspace1/db.py): development или production — WAL,
+# PRAGMA, постоянные соединения и чтение через реплику; по умолчанию
+# совпадает с профилем настроек
+DB_PROFILE = os.environ.get("DJANGO_DB_PROFILE", PROFILE)
+DATABASES = databases(
+    DB_PROFILE, os.environ.get("DJANGO_SQLITE_PATH", BASE_DIR / "db.sqlite3")
+)
+SQLITE_PRAGMAS = sqlite_pragmas(DB_PROFILE)
+DATABASE_ROUTERS = (
+    ["workspace1.db.PrimaryReplicaRouter"] if DB_PROFILE == "production" else []
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "files": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "cache"),
+    },
 }
 
+# Асинхронные представления (employees/async_views.py); включает asgi.py
+EMPLOYEE_ASYNC_VIEWS = os.environ.get("EMPLOYEE_ASYNC_VIEWS") == "1"
+
+# Превышение бюджета запросов представления (employees/budgets.py):
+# исключение при True, предупреждение в лог при False
+QUERY_BUDGET_ENFORCE = DEBUG
+
+# Метрики запросов (employees/metrics.py): каталог для значений всех
+# процессов (None — только текущий процесс) и период их сохранения
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = 1.0
+# Токен сборщика метрик: заголовок Authorization: Bearer <METRICS_TOKEN>
+# (None — /metrics доступен только сотрудникам с is_staff)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+# Значение заголовка X-Profile, включающее профилировщик (None — выключен)
+METRICS_PROFILE_TOKEN = os.environ.get("METRICS_PROFILE_TOKEN")
+METRICS_PROFILE_DIR = os.environ.get("METRICS_PROFILE_DIR")
+METRICS_PROFILE_INTERVAL = 0.005
+
+# Кеш фрагментов карточек сотрудников: "default" (в памяти процесса)
+# или "files" (общий для всех процессов на сервере)
+EMPLOYEE_FRAGMENT_CACHE_ALIAS = "default"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -134,11 +237,45 @@ STATICFILES_DIRS = (
     if os.path.exists(os.path.join(BASE_DIR, "static"))
     else []
 )
-STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+STATIC_ROOT = os.environ.get(
+    "DJANGO_STATIC_ROOT", os.path.join(BASE_DIR, "staticfiles")
+)
+# В production имена статики содержат хеш содержимого (нужен collectstatic)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+            if PRODUCTION
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        )
+    },
+}
 
 # Media files (Uploaded files)
 MEDIA_URL = "/media/"  # URL для доступа к медиафайлам
-MEDIA_ROOT = os.path.join(BASE_DIR, "media")  # Путь к папке с медиафайлами
+# Путь к папке с медиафайлами
+MEDIA_ROOT = os.environ.get("DJANGO_MEDIA_ROOT", os.path.join(BASE_DIR, "media"))
+# Кто отдаёт тело медиафайла (employees/media.py): "x-accel-redirect" —
+# nginx, "x-sendfile" — Apache mod_xsendfile или lighttpd, пусто — сам Django
+MEDIA_SENDFILE = os.environ.get("MEDIA_SENDFILE", "")
+# internal-location nginx с alias на MEDIA_ROOT
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+# Отдавать медиафайлы только вошедшим пользователям
+MEDIA_LOGIN_REQUIRED = False
+
+# Число процессов для фоновой генерации копий фотографий (0 — синхронно)
+EMPLOYEE_IMAGE_VARIANT_WORKERS = 2
+# Через сколько секунд collect_media удаляет файлы без ссылок
+EMPLOYEE_MEDIA_DELETE_GRACE_SECONDS = 3600
+# Загрузка фотографий частями (employees/uploads.py): каталог незавершённых
+# загрузок (вне MEDIA_ROOT, чтобы они не раздавались), наибольший размер
+# одной части и всего файла, через сколько секунд брошенные загрузки удаляет
+# collect_media
+EMPLOYEE_UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
+EMPLOYEE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+EMPLOYEE_UPLOAD_MAX_SIZE = 200 * 1024 * 1024
+EMPLOYEE_UPLOAD_EXPIRE_SECONDS = 24 * 3600
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -1,17 +1,31 @@
-from django.contrib import admin
-from django.urls import path, include
+import re
+
 from django.conf import settings
 from django.conf.urls.static import static
+from django.contrib import admin
+from django.urls import include, path, re_path
 
-import debug_toolbar
+from employees.media import serve_media
+from employees.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
     path("", include("employees.urls")),
-    path("__debug__/", include(debug_toolbar.urls)),
+    # Медиафайлы с проверкой прав; тело отдаёт nginx/Apache (MEDIA_SENDFILE)
+    re_path(
+        rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.+)$",
+        serve_media,
+        name="media",
+    ),
 ]
 
-# Добавляем обработку медиафайлов в режиме разработки
+# debug_toolbar подключён только в профиле development
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    import debug_toolbar
+
+    urlpatterns.append(path("__debug__/", include(debug_toolbar.urls)))
+
+# Статические файлы в режиме разработки
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
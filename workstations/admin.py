@@ -1,5 +1,19 @@
-from django.contrib import admin
-from .models import Workstation
+from django.contrib import admin, messages
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+
+from employees.bulk import deactivate_workstations
+from employees.models import Employee
+from employees.pagination import EstimatedCountPaginator
+
+from .models import FloorPlan, Workstation
+
+
+@admin.register(FloorPlan)
+class FloorPlanAdmin(admin.ModelAdmin):
+    list_display = ("name", "location", "neighbour_distance")
+    list_filter = ("location",)
+    search_fields = ("name", "location")
 
 
 @admin.register(Workstation)
@@ -8,11 +22,20 @@ class WorkstationAdmin(admin.ModelAdmin):
     list_filter = ("is_active", "location")
     search_fields = ("table_number", "name", "location")
     list_editable = ("is_active",)
+    list_select_related = ("floor_plan",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ["floor_plan"]
+    actions = ["deactivate"]
     fieldsets = (
         (
             "Основная информация",
             {"fields": ("table_number", "name", "location", "is_active")},
         ),
+        (
+            "Положение на плане",
+            {"fields": ("floor_plan", "x", "y"), "classes": ("collapse",)},
+        ),
         (
             "Описание",
             {"fields": ("description", "equipment", "notes"), "classes": ("collapse",)},
@@ -23,9 +46,33 @@ class WorkstationAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        # Сотрудник за столом — подзапрос по индексу Employee.workstation
+        occupant = Employee.objects.filter(workstation=OuterRef("pk")).order_by("pk")
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                occupant=Subquery(
+                    occupant.annotate(
+                        full_name=Concat("last_name", Value(" "), "first_name")
+                    ).values("full_name")[:1]
+                )
+            )
+        )
+
+    @admin.display(description="Сотрудник")
     def get_employee(self, obj):
-        if hasattr(obj, "employee"):
-            return obj.employee
-        return "Не назначено"
+        return obj.occupant or "Не назначено"
 
-    get_employee.short_description = "Сотрудник"
+    @admin.action(
+        description="Отключить и освободить рабочие места", permissions=["change"]
+    )
+    def deactivate(self, request, queryset):
+        deactivated, unseated = deactivate_workstations(queryset)
+        self.message_user(
+            request,
+            f"Отключено рабочих мест: {deactivated}, "
+            f"освобождено сотрудников: {unseated}",
+            messages.SUCCESS,
+        )
@@ -0,0 +1,207 @@
+"""
+Граф соседства рабочих мест.
+
+Столы с положением на плане этажа (floor_plan, x, y) соседствуют, если
+расстояние между ними не больше FloorPlan.neighbour_distance. Для столов
+без плана сохраняется прежнее правило — номера ±1, но только в пределах
+одного местоположения.
+
+Рёбра хранятся в WorkstationNeighbour в обе стороны, поэтому соседи стола —
+один индексированный запрос. Изменение стола пересчитывает только его рёбра
+(update_neighbours, сигнал post_save), массовые операции без сигналов
+вызывают rebuild_neighbours() для затронутых местоположений.
+"""
+
+import math
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import FloorPlan, Workstation, WorkstationNeighbour
+
+
+def is_positioned(floor_plan_id, x, y):
+    return floor_plan_id is not None and x is not None and y is not None
+
+
+def unpositioned():
+    return Q(floor_plan__isnull=True) | Q(x__isnull=True) | Q(y__isnull=True)
+
+
+def positioned_pairs(desks, distance):
+    """
+    Пары соседних столов одного плана из (id, x, y). Столы раскладываются
+    по клеткам со стороной distance, сравниваются только соседние клетки.
+    """
+    if not distance or distance <= 0:
+        return
+    cells = defaultdict(list)
+    for desk in desks:
+        cells[(math.floor(desk[1] / distance), math.floor(desk[2] / distance))].append(
+            desk
+        )
+    for (cx, cy), members in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for b in cells.get((cx + dx, cy + dy), ()):
+                    for a in members:
+                        if a[0] < b[0] and math.dist(a[1:], b[1:]) <= distance:
+                            yield a[0], b[0]
+
+
+def numbered_pairs(desks):
+    """Пары столов без плана из (id, table_index): номера, отличающиеся на 1"""
+    by_index = defaultdict(list)
+    for pk, table_index in desks:
+        if table_index is not None:
+            by_index[table_index].append(pk)
+    for table_index, ids in by_index.items():
+        for b in by_index.get(table_index + 1, ()):
+            for a in ids:
+                yield a, b
+
+
+def edges(pairs):
+    for a, b in pairs:
+        yield WorkstationNeighbour(workstation_id=a, neighbour_id=b)
+        yield WorkstationNeighbour(workstation_id=b, neighbour_id=a)
+
+
+def save_edges(pairs, batch_size=5000):
+    objects = edges(pairs)
+    count = 0
+    while batch := list(islice(objects, batch_size)):
+        WorkstationNeighbour.objects.bulk_create(batch)
+        count += len(batch)
+    return count // 2
+
+
+def rebuild_neighbours(locations=None):
+    """
+    Пересчитывает рёбра столов из locations (None — всех столов).
+    Возвращает число пар соседей.
+    """
+    workstations = Workstation.objects.all()
+    if locations is not None:
+        workstations = workstations.filter(location__in=list(locations))
+    distances = dict(FloorPlan.objects.values_list("id", "neighbour_distance"))
+
+    groups = defaultdict(list)
+    for pk, location, table_index, plan_id, x, y in (
+        workstations.order_by()
+        .values_list("id", "location", "table_index", "floor_plan_id", "x", "y")
+        .iterator(chunk_size=10000)
+    ):
+        if is_positioned(plan_id, x, y):
+            groups[(location, plan_id)].append((pk, x, y))
+        else:
+            groups[(location, None)].append((pk, table_index))
+
+    def pairs():
+        for (_, plan_id), desks in groups.items():
+            if plan_id is None:
+                yield from numbered_pairs(desks)
+            else:
+                yield from positioned_pairs(desks, distances.get(plan_id))
+
+    with transaction.atomic():
+        if locations is None:
+            WorkstationNeighbour.objects.all().delete()
+        else:
+            ids = workstations.values("id")
+            WorkstationNeighbour.objects.filter(
+                Q(workstation__in=ids) | Q(neighbour__in=ids)
+            ).delete()
+        return save_edges(pairs())
+
+
+def candidate_neighbours(workstation):
+    """id соседей стола по его положению или номеру"""
+    if is_positioned(workstation.floor_plan_id, workstation.x, workstation.y):
+        distance = (
+            FloorPlan.objects.filter(pk=workstation.floor_plan_id)
+            .values_list("neighbour_distance", flat=True)
+            .first()
+        )
+        if not distance or distance <= 0:
+            return []
+        x, y = workstation.x, workstation.y
+        nearby = (
+            Workstation.objects.filter(
+                floor_plan_id=workstation.floor_plan_id,
+                location=workstation.location,
+                x__range=(x - distance, x + distance),
+                y__range=(y - distance, y + distance),
+            )
+            .exclude(pk=workstation.pk)
+            .values_list("id", "x", "y")
+        )
+        return [pk for pk, nx, ny in nearby if math.dist((x, y), (nx, ny)) <= distance]
+
+    if workstation.table_index is None:
+        return []
+    return list(
+        Workstation.objects.filter(
+            unpositioned(),
+            location=workstation.location,
+            table_index__in=[workstation.table_index - 1, workstation.table_index + 1],
+        )
+        .exclude(pk=workstation.pk)
+        .values_list("id", flat=True)
+    )
+
+
+def update_neighbours(workstation):
+    """Пересчитывает рёбра одного стола индексированными запросами"""
+    with transaction.atomic():
+        WorkstationNeighbour.objects.filter(
+            Q(workstation=workstation) | Q(neighbour=workstation)
+        ).delete()
+        return save_edges(
+            (workstation.pk, pk) for pk in candidate_neighbours(workstation)
+        )
+
+
+def neighbour_ids(workstation):
+    """Подзапрос id соседей стола (объект или id)"""
+    return WorkstationNeighbour.objects.filter(workstation=workstation).values(
+        "neighbour_id"
+    )
+
+
+def neighbour_map(workstations=None):
+    """{id стола: [id соседей]} одним запросом; workstations — queryset или None"""
+    queryset = WorkstationNeighbour.objects.all()
+    if workstations is not None:
+        queryset = queryset.filter(workstation__in=workstations.values("id"))
+    result = defaultdict(list)
+    for workstation_id, neighbour_id in queryset.values_list(
+        "workstation_id", "neighbour_id"
+    ).iterator(chunk_size=10000):
+        result[workstation_id].append(neighbour_id)
+    return result
+
+
+def adjacency_conflicts(workstations=None):
+    """Пары id столов, где тестировщик и разработчик сидят по соседству"""
+    from employees.models import Employee, conflicting_role
+
+    roles = defaultdict(set)
+    for workstation_id, role in Employee.objects.filter(
+        role__in=[Employee.ROLE_TESTER, Employee.ROLE_DEVELOPER],
+        workstation__isnull=False,
+    ).values_list("workstation_id", "role"):
+        roles[workstation_id].add(role)
+
+    conflicts = []
+    for workstation_id, neighbours in neighbour_map(workstations).items():
+        for role in roles.get(workstation_id, ()):
+            opposite = conflicting_role(role)
+            conflicts += [
+                (workstation_id, neighbour)
+                for neighbour in neighbours
+                if workstation_id < neighbour and opposite in roles.get(neighbour, ())
+            ]
+    return conflicts
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+def fill_table_index(apps, schema_editor):
+    Workstation = apps.get_model("workstations", "Workstation")
+    workstations = list(Workstation.objects.only("id", "table_number"))
+    for workstation in workstations:
+        try:
+            workstation.table_index = int(str(workstation.table_number).strip())
+        except (ValueError, TypeError):
+            workstation.table_index = None
+    Workstation.objects.bulk_update(workstations, ["table_index"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workstations", "0002_alter_workstation_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workstation",
+            name="table_index",
+            field=models.IntegerField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                null=True,
+                verbose_name="Числовой номер стола",
+            ),
+        ),
+        migrations.RunPython(fill_table_index, migrations.RunPython.noop),
+    ]
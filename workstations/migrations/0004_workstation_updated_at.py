@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workstations", "0003_workstation_table_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workstation",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, verbose_name="Изменено"
+            ),
+        ),
+    ]
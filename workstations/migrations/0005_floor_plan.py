@@ -0,0 +1,171 @@
+# Generated by Django 5.2 on 2026-10-18 15:39
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Копия workstations.layout.numbered_pairs на момент миграции: миграция не
+# должна зависеть от дальнейших изменений кода приложения
+def numbered_pairs(desks):
+    """Пары столов без плана из (id, table_index): номера, отличающиеся на 1"""
+    by_index = defaultdict(list)
+    for pk, table_index in desks:
+        if table_index is not None:
+            by_index[table_index].append(pk)
+    for table_index, ids in by_index.items():
+        for b in by_index.get(table_index + 1, ()):
+            for a in ids:
+                yield a, b
+
+
+def build_neighbours(apps, schema_editor):
+    """Рёбра для существующих столов: номера ±1 в пределах местоположения"""
+    Workstation = apps.get_model("workstations", "Workstation")
+    WorkstationNeighbour = apps.get_model("workstations", "WorkstationNeighbour")
+    by_location = defaultdict(list)
+    for pk, location, table_index in Workstation.objects.values_list(
+        "id", "location", "table_index"
+    ):
+        by_location[location].append((pk, table_index))
+    WorkstationNeighbour.objects.bulk_create(
+        [
+            WorkstationNeighbour(workstation_id=x, neighbour_id=y)
+            for desks in by_location.values()
+            for a, b in numbered_pairs(desks)
+            for x, y in ((a, b), (b, a))
+        ],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workstations", "0004_workstation_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FloorPlan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=100, unique=True, verbose_name="Название"
+                    ),
+                ),
+                (
+                    "location",
+                    models.CharField(max_length=100, verbose_name="Местоположение"),
+                ),
+                (
+                    "neighbour_distance",
+                    models.FloatField(
+                        default=1.0,
+                        help_text="Столы на расстоянии не больше этого считаются соседними",
+                        verbose_name="Радиус соседства",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Изменён"),
+                ),
+            ],
+            options={
+                "verbose_name": "План этажа",
+                "verbose_name_plural": "Планы этажей",
+                "ordering": ["location", "name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="WorkstationNeighbour",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Соседство рабочих мест",
+                "verbose_name_plural": "Соседство рабочих мест",
+            },
+        ),
+        migrations.AddField(
+            model_name="workstation",
+            name="x",
+            field=models.FloatField(blank=True, null=True, verbose_name="X на плане"),
+        ),
+        migrations.AddField(
+            model_name="workstation",
+            name="y",
+            field=models.FloatField(blank=True, null=True, verbose_name="Y на плане"),
+        ),
+        migrations.AddField(
+            model_name="workstation",
+            name="floor_plan",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="workstations",
+                to="workstations.floorplan",
+                verbose_name="План этажа",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workstation",
+            index=models.Index(
+                fields=["floor_plan", "x", "y"], name="workstation_position_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workstation",
+            index=models.Index(
+                fields=["location", "table_index"], name="workstation_location_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="workstationneighbour",
+            name="neighbour",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="workstations.workstation",
+                verbose_name="Соседнее рабочее место",
+            ),
+        ),
+        migrations.AddField(
+            model_name="workstationneighbour",
+            name="workstation",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="neighbour_edges",
+                to="workstations.workstation",
+                verbose_name="Рабочее место",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="workstationneighbour",
+            constraint=models.UniqueConstraint(
+                fields=("workstation", "neighbour"), name="workstation_neighbour_uniq"
+            ),
+        ),
+        migrations.RunPython(build_neighbours, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,40 @@
 from django.db import models
 
 
+class FloorPlan(models.Model):
+    """План этажа: координаты столов и радиус соседства (workstations/layout.py)"""
+
+    name = models.CharField(max_length=100, unique=True, verbose_name="Название")
+    location = models.CharField(max_length=100, verbose_name="Местоположение")
+    neighbour_distance = models.FloatField(
+        default=1.0,
+        verbose_name="Радиус соседства",
+        help_text="Столы на расстоянии не больше этого считаются соседними",
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Изменён")
+
+    class Meta:
+        verbose_name = "План этажа"
+        verbose_name_plural = "Планы этажей"
+        ordering = ["location", "name"]
+
+    def __str__(self):
+        return f"{self.name} ({self.location})"
+
+
 class Workstation(models.Model):
     name = models.CharField(max_length=100, verbose_name="Название")
     table_number = models.CharField(
         max_length=20, verbose_name="Номер стола", unique=True
     )
+    # Числовой номер стола для индексированного поиска соседей
+    table_index = models.IntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name="Числовой номер стола",
+    )
     description = models.TextField(blank=True, verbose_name="Описание")
     location = models.CharField(max_length=100, verbose_name="Местоположение")
     is_active = models.BooleanField(default=True, verbose_name="Активно")
@@ -15,11 +44,100 @@ class Workstation(models.Model):
         blank=True, null=True, verbose_name="IP-адрес"
     )
     notes = models.TextField(blank=True, verbose_name="Заметки")
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name="Изменено"
+    )
+    # Положение стола на плане этажа; без плана соседи — столы
+    # с номером ±1 в том же местоположении
+    floor_plan = models.ForeignKey(
+        FloorPlan,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="workstations",
+        verbose_name="План этажа",
+    )
+    x = models.FloatField(null=True, blank=True, verbose_name="X на плане")
+    y = models.FloatField(null=True, blank=True, verbose_name="Y на плане")
 
     class Meta:
         verbose_name = "Рабочее место"
         verbose_name_plural = "Рабочие места"
         ordering = ["table_number"]
+        indexes = [
+            models.Index(
+                fields=["floor_plan", "x", "y"], name="workstation_position_idx"
+            ),
+            models.Index(
+                fields=["location", "table_index"], name="workstation_location_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.table_number} - {self.name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Состояние из базы для счётчиков справочника (employees/counters.py)
+        if {"location", "is_active"} <= instance.__dict__.keys():
+            instance._counter_state = (instance.location, instance.is_active)
+        # Состояние из базы для пересчёта графа соседства (layout.py)
+        if set(LAYOUT_FIELDS) <= instance.__dict__.keys():
+            instance._layout_state = instance.layout_state()
+        return instance
+
+    def layout_state(self):
+        return tuple(getattr(self, field) for field in LAYOUT_FIELDS)
+
+    @staticmethod
+    def parse_table_index(table_number):
+        """Числовое значение номера стола или None"""
+        try:
+            return int(str(table_number).strip())
+        except (ValueError, TypeError):
+            return None
+
+    def save(self, *args, **kwargs):
+        self.table_index = self.parse_table_index(self.table_number)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "table_number" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "table_index"}
+        super().save(*args, **kwargs)
+
+
+LAYOUT_FIELDS = ("location", "table_index", "floor_plan_id", "x", "y")
+
+
+class WorkstationNeighbour(models.Model):
+    """
+    Ребро графа соседства. Хранится в обе стороны, поэтому соседи стола —
+    один индексированный запрос по workstation.
+    """
+
+    # Индекс — уникальное ограничение (workstation, neighbour)
+    workstation = models.ForeignKey(
+        Workstation,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name="neighbour_edges",
+        verbose_name="Рабочее место",
+    )
+    neighbour = models.ForeignKey(
+        Workstation,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Соседнее рабочее место",
+    )
+
+    class Meta:
+        verbose_name = "Соседство рабочих мест"
+        verbose_name_plural = "Соседство рабочих мест"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["workstation", "neighbour"], name="workstation_neighbour_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.workstation_id} — {self.neighbour_id}"
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .layout import rebuild_neighbours, update_neighbours
+from .models import FloorPlan, Workstation
+
+
+@receiver(post_save, sender=Workstation)
+def update_workstation_neighbours(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    state = instance.layout_state()
+    if not created and getattr(instance, "_layout_state", None) == state:
+        return
+    update_neighbours(instance)
+    instance._layout_state = state
+
+
+@receiver(post_save, sender=FloorPlan)
+@receiver(post_delete, sender=FloorPlan)
+def rebuild_floor_plan_neighbours(sender, instance, raw=False, **kwargs):
+    # Радиус соседства или отвязанные от удалённого плана столы
+    if not raw:
+        rebuild_neighbours([instance.location])
@@ -1,3 +1,56 @@
+import os
+import tempfile
+
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-# Create your tests here.
+from employees.importing import import_floor_plan, read_records
+from employees.models import Employee
+
+from .layout import adjacency_conflicts, neighbour_map
+from .models import FloorPlan, Workstation
+
+
+class FloorPlanTests(TestCase):
+    def employee(self, position, workstation, n):
+        return Employee(
+            last_name=f"Сотрудник{n}",
+            first_name="Имя",
+            gender="M",
+            email=f"user{n}@example.com",
+            position=position,
+            workstation=workstation,
+        )
+
+    def test_numbered_tables_are_adjacent_only_within_location(self):
+        first = Workstation.objects.create(name="A", table_number="12", location="A")
+        second = Workstation.objects.create(name="B", table_number="13", location="B")
+        self.employee("Тестировщик", first, 1).save()
+        self.employee("Backend разработчик", second, 2).save()
+
+        third = Workstation.objects.create(name="C", table_number="11", location="A")
+        with self.assertRaises(ValidationError):
+            self.employee("Backend разработчик", third, 3).save()
+
+    def test_imported_grid_defines_neighbours(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write("# этаж 2\n101 102 .\n.   103 104\n")
+        self.addCleanup(os.remove, f.name)
+        report = import_floor_plan(read_records(f.name), "Этаж 2", location="Офис")
+        self.assertEqual((report.created, report.errors), (4, []))
+
+        desks = dict(Workstation.objects.values_list("table_number", "id"))
+        self.assertEqual(
+            sorted(neighbour_map()[desks["102"]]), sorted([desks["101"], desks["103"]])
+        )
+        # 101 и 103 — по диагонали, дальше радиуса соседства
+        self.employee("Тестировщик", Workstation(pk=desks["101"]), 1).save()
+        self.employee("Backend разработчик", Workstation(pk=desks["103"]), 2).save()
+        with self.assertRaises(ValidationError):
+            self.employee("Backend разработчик", Workstation(pk=desks["102"]), 3).save()
+
+        # Новый радиус делает диагональ соседством
+        plan = FloorPlan.objects.get()
+        plan.neighbour_distance = 1.5
+        plan.save()
+        self.assertEqual(len(adjacency_conflicts()), 1)